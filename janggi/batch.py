@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+여러 국면 일괄 이동 생성 / 공격 지도 (numpy)
+- 입력: (B, 10, 9) int8 배열. [b, row, col] = config.PIECE_CODES 번호, 초 = 양수, 한 = 음수, 0 = 빈 칸
+  좌표는 Board 와 같다 (row 0 = 초 쪽). board_array / stack_boards 로 Board 에서 만든다
+- legal_move_masks(arr) -> (B, 90, 90) bool: [b, from_sq, to_sq] = 그 칸의 기물이 to_sq 로 갈 수 있음
+  (양쪽 기물 모두, Board.get_legal_moves 와 같은 의사 합법 수: 자기 궁이 잡히는지는 보지 않는다)
+- attack_maps(arr) -> (B, 2, 90) bool: [b, 0 = 초 / 1 = 한, sq] = movement.is_square_attacked 와 같음
+- 차·포: 칸마다 광선(movement.RAYS, 궁성 대각선 포함)을 고정 길이로 채운 색인 표로 모아 한 번에 읽고,
+  광선을 따라 누적합(cumsum)으로 앞에 있는 기물 수를 세어 막힘·포다리(포는 포를 넘지도 잡지도 못함)를 판정
+- 마·상·궁·사·졸: 칸마다 (목적지, 다리) 표를 고정 길이로 채워 같은 방식으로 판정
+
+실행 예 (get_legal_moves 와 비교 + 속도):
+    python batch.py --positions 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+
+import config
+import movement
+from board import Board
+
+COLS = config.BOARD_COLS
+ROWS = config.BOARD_ROWS
+NUM_SQUARES = COLS * ROWS
+PAD = NUM_SQUARES  # 채움 칸: 평탄 배열 끝에 붙인 항상 빈 칸
+
+GENERAL = config.PIECE_CODES["general"]
+GUARD = config.PIECE_CODES["guard"]
+HORSE = config.PIECE_CODES["horse"]
+ELEPHANT = config.PIECE_CODES["elephant"]
+CHARIOT = config.PIECE_CODES["chariot"]
+CANNON = config.PIECE_CODES["cannon"]
+SOLDIER = config.PIECE_CODES["soldier"]
+
+
+def _pad_table(rows: list[list[tuple]], width: int) -> np.ndarray:
+    """칸별 가변 길이 목록 -> (90, 최대 길이, width) int 배열, 빈 자리는 PAD."""
+    longest = max(len(r) for r in rows)
+    out = np.full((NUM_SQUARES, longest, width), PAD, dtype=np.intp)
+    for sq, r in enumerate(rows):
+        for i, item in enumerate(r):
+            out[sq, i] = item
+    return out
+
+
+def _build_ray_table() -> np.ndarray:
+    """(90, 광선 수, 광선 길이) 목적지 칸. 빈 자리는 PAD."""
+    max_rays = max(len(rays) for rays in movement.RAYS)
+    max_len = max(len(ray) for rays in movement.RAYS for ray in rays)
+    out = np.full((NUM_SQUARES, max_rays, max_len), PAD, dtype=np.intp)
+    for sq, rays in enumerate(movement.RAYS):
+        for r, ray in enumerate(rays):
+            out[sq, r, : len(ray)] = [i for _, i in ray]
+    return out
+
+
+RAY_TABLE = _build_ray_table()
+# 마: (목적지, 다리), 상: (목적지, 첫 다리, 대각 중간)
+HORSE_TABLE = _pad_table([[(i, leg) for leg, _, i in moves] for moves in movement.HORSE_MOVES], 2)
+ELEPHANT_TABLE = _pad_table(
+    [[(i, l1, l2) for l1, l2, _, i in moves] for moves in movement.ELEPHANT_MOVES], 3
+)
+# 진영별 (목적지,) : [0] = 초, [1] = 한
+PALACE_TABLE = [
+    _pad_table([[(i,) for _, i in steps] for steps in movement.PALACE_MOVES[side]], 1)[..., 0]
+    for side in ("cho", "han")
+]
+SOLDIER_TABLE = [
+    _pad_table([[(i,) for _, i in steps] for steps in movement.SOLDIER_MOVES[side]], 1)[..., 0]
+    for side in ("cho", "han")
+]
+
+
+def board_array(board: Board) -> np.ndarray:
+    """Board -> (10, 9) int8."""
+    out = np.zeros(NUM_SQUARES, dtype=np.int8)
+    for p in board.pieces:
+        code = config.PIECE_CODES[p.piece_type]
+        out[p.row * COLS + p.col] = code if p.side == "cho" else -code
+    return out.reshape(ROWS, COLS)
+
+
+def stack_boards(boards) -> np.ndarray:
+    """Board 여러 개 -> (B, 10, 9) int8."""
+    return np.stack([board_array(b) for b in boards]) if boards else np.zeros((0, ROWS, COLS), np.int8)
+
+
+def _generate(arr: np.ndarray, want_moves: bool = True) -> tuple[np.ndarray | None, np.ndarray]:
+    """(B, 10, 9) -> (이동 가능 표 (B, 90, 90) 또는 None, 공격 지도 (B, 2, 90))."""
+    arr = np.asarray(arr, dtype=np.int8)
+    batch = arr.shape[0]
+    width = NUM_SQUARES + 1
+    flat = np.zeros((batch, width), dtype=np.int8)  # 끝 칸 = PAD (항상 빈 칸)
+    flat[:, :NUM_SQUARES] = arr.reshape(batch, NUM_SQUARES)
+    cells = flat.ravel()
+    moves = np.zeros(batch * NUM_SQUARES * NUM_SQUARES, dtype=bool) if want_moves else None
+    attacks = np.zeros(batch * 2 * NUM_SQUARES, dtype=bool)
+
+    # 모든 기물을 한 번에 모은 뒤 종류별로 나눈다
+    all_b, all_sq = np.nonzero(flat[:, :NUM_SQUARES])
+    all_code = flat[all_b, all_sq]
+    all_kind = np.abs(all_code)
+
+    def select(mask: np.ndarray):
+        """(국면 번호, 칸, 진영 부호, 국면 시작 위치) - 고른 기물만."""
+        b = all_b[mask]
+        return b, all_sq[mask], np.sign(all_code[mask]).astype(np.int8), b * width
+
+    def gather(base: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        """각 기물의 국면에서 targets 칸의 값 (int8)."""
+        return cells[base.reshape((-1,) + (1,) * (targets.ndim - 1)) + targets]
+
+    def mark(b, sq, mover, targets, ok) -> None:
+        """moves[b, sq, targets] = True, attacks[b, 진영, targets] = True (ok 인 자리만)."""
+        shape = (-1,) + (1,) * (targets.ndim - 1)
+        t = targets[ok]
+        if moves is not None:
+            base = np.broadcast_to(((b * NUM_SQUARES + sq) * NUM_SQUARES).reshape(shape), targets.shape)
+            moves[base[ok] + t] = True
+        side = np.broadcast_to(((b * 2 + (mover < 0)) * NUM_SQUARES).reshape(shape), targets.shape)
+        attacks[side[ok] + t] = True
+
+    def enterable(mover, targets, values) -> np.ndarray:
+        """목적지가 보드 안이고 빈 칸이거나 적 기물."""
+        return (targets != PAD) & (values * mover.reshape((-1,) + (1,) * (targets.ndim - 1)) <= 0)
+
+    # --- 차·포: 광선을 따라 앞에 있는 기물 수 (누적합) ---
+    b, sq, mover, base = select((all_kind == CHARIOT) | (all_kind == CANNON))
+    if len(b):
+        targets = RAY_TABLE[sq]  # (N, 광선, 길이)
+        values = gather(base, targets)
+        occupied = values != 0
+        before = np.cumsum(occupied, axis=-1, dtype=np.int8) - occupied
+        cannon_here = (values == CANNON) | (values == -CANNON)
+        cannons_before = np.cumsum(cannon_here, axis=-1, dtype=np.int8) - cannon_here
+        is_cannon = (np.abs(flat[b, sq]) == CANNON)[:, None, None]
+        # 차: 앞이 모두 비어야 / 포: 앞에 포가 아닌 기물 정확히 하나, 목적지는 빈 칸 또는 포가 아닌 적
+        ok = enterable(mover, targets, values) & np.where(
+            is_cannon,
+            (before == 1) & (cannons_before == 0) & ~cannon_here,
+            before == 0,
+        )
+        mark(b, sq, mover, targets, ok)
+
+    # --- 마: 다리가 비어 있어야 ---
+    b, sq, mover, base = select(all_kind == HORSE)
+    if len(b):
+        table = HORSE_TABLE[sq]
+        dest = table[..., 0]
+        ok = enterable(mover, dest, gather(base, dest)) & (gather(base, table[..., 1]) == 0)
+        mark(b, sq, mover, dest, ok)
+
+    # --- 상: 두 다리가 모두 비어 있어야 ---
+    b, sq, mover, base = select(all_kind == ELEPHANT)
+    if len(b):
+        table = ELEPHANT_TABLE[sq]
+        dest = table[..., 0]
+        ok = (
+            enterable(mover, dest, gather(base, dest))
+            & (gather(base, table[..., 1]) == 0)
+            & (gather(base, table[..., 2]) == 0)
+        )
+        mark(b, sq, mover, dest, ok)
+
+    # --- 궁·사 (궁성 안 한 칸), 졸·병: 진영별 표 ---
+    palace_piece = (all_kind == GENERAL) | (all_kind == GUARD)
+    soldier_piece = all_kind == SOLDIER
+    for side_index, is_side in ((0, all_code > 0), (1, all_code < 0)):
+        for piece_mask, tables in ((palace_piece, PALACE_TABLE), (soldier_piece, SOLDIER_TABLE)):
+            b, sq, mover, base = select(piece_mask & is_side)
+            if len(b):
+                dest = tables[side_index][sq]
+                mark(b, sq, mover, dest, enterable(mover, dest, gather(base, dest)))
+
+    if moves is not None:
+        moves = moves.reshape(batch, NUM_SQUARES, NUM_SQUARES)
+    return moves, attacks.reshape(batch, 2, NUM_SQUARES)
+
+
+def legal_move_masks(arr: np.ndarray) -> np.ndarray:
+    """(B, 10, 9) -> (B, 90, 90) bool 이동 가능 표. 양쪽 진영 기물 모두."""
+    return _generate(arr)[0]
+
+
+def attack_maps(arr: np.ndarray) -> np.ndarray:
+    """(B, 10, 9) -> (B, 2, 90) bool: [b, 0] = 초가 갈 수 있는 칸, [b, 1] = 한이 갈 수 있는 칸."""
+    return _generate(arr, want_moves=False)[1]
+
+
+def batch_moves(arr: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(이동 가능 표 (B, 90, 90), 공격 지도 (B, 2, 90)) 를 한 번에."""
+    return _generate(arr)
+
+
+def mask_to_moves(mask: np.ndarray) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+    """(90, 90) 표 하나 -> [((from_col, from_row), (to_col, to_row)), ...]."""
+    return [
+        ((int(f) % COLS, int(f) // COLS), (int(t) % COLS, int(t) // COLS))
+        for f, t in zip(*np.nonzero(mask))
+    ]
+
+
+def _random_board(rng: random.Random) -> Board:
+    """검사용: 무작위 기물 배치 (규칙상 나올 수 없는 배치도 포함)."""
+    types = list(config.PIECE_CODES)
+    setup = [
+        ((sq % COLS, sq // COLS), (rng.choice(types), rng.choice(("cho", "han"))))
+        for sq in rng.sample(range(NUM_SQUARES), rng.randint(2, 32))
+    ]
+    return Board(setup=setup)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Janggi batched move generation (numpy)")
+    parser.add_argument("--positions", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    boards = [_random_board(rng) for _ in range(args.positions)]
+    arr = stack_boards(boards)
+
+    start = time.perf_counter()
+    moves, attacks = batch_moves(arr)
+    batch_time = time.perf_counter() - start
+
+    # 같은 일을 국면마다 파이썬으로: 모든 기물의 get_legal_moves + 모든 칸의 is_square_attacked
+    start = time.perf_counter()
+    loop_moves = [
+        [(p.row * COLS + p.col, row * COLS + col) for p in board.pieces for col, row in movement.get_legal_moves(board, p)]
+        for board in boards
+    ]
+    moves_time = time.perf_counter() - start
+    start = time.perf_counter()
+    loop_attacks = [
+        [
+            [movement.is_square_attacked(board, sq % COLS, sq // COLS, side) for sq in range(NUM_SQUARES)]
+            for side in ("cho", "han")
+        ]
+        for board in boards
+    ]
+    attacks_time = time.perf_counter() - start
+
+    mismatches = 0
+    for b in range(len(boards)):
+        expected = np.zeros((NUM_SQUARES, NUM_SQUARES), dtype=bool)
+        if loop_moves[b]:
+            expected[tuple(np.array(loop_moves[b]).T)] = True
+        mismatches += not np.array_equal(expected, moves[b])
+        mismatches += not np.array_equal(np.array(loop_attacks[b], dtype=bool), attacks[b])
+
+    n = len(boards)
+    print(f"positions {n}  mismatches {mismatches}")
+    print(f"batch (moves + attacks)   {batch_time * 1000:8.1f}ms  {n / batch_time:9.0f} pos/s")
+    print(f"loop get_legal_moves      {moves_time * 1000:8.1f}ms  {n / moves_time:9.0f} pos/s")
+    print(f"loop is_square_attacked   {attacks_time * 1000:8.1f}ms  {n / attacks_time:9.0f} pos/s")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
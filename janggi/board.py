@@ -2,14 +2,29 @@
 """
 장기판 클래스 (Board)
 - 9x10 교차점 좌표계
-- 장기판 그리기 (선, 궁성 대각선)
 - 기물 목록 관리 및 클릭 좌표 → 교차점 변환
+- pygame 없이 import 가능 (그리기는 render.py)
 """
 
-import pygame
+import struct
+from array import array
+
 import config
-from piece import Piece
-from movement import get_legal_moves
+from piece import Piece, PieceType, side_of
+import bitboard
+import movement
+import zobrist
+from bitboard import Bitboards
+from cache import LRUCache
+
+# 이동 생성 엔진: 이름 -> get_legal_moves(board, piece) 함수
+MOVE_ENGINES = {
+    "mailbox": movement.get_legal_moves,
+    "bitboard": bitboard.get_legal_moves,
+}
+
+# history_bytes 헤더: 현재 수 번호, 기록된 수 개수 (다시 두기 꼬리 포함)
+_HISTORY_HEADER = struct.Struct("<II")
 
 
 class Board:
@@ -17,20 +32,139 @@ class Board:
     9x10 장기판.
     - 좌표: (col, row), col 0~8, row 0~9 (row 0 = 초 쪽, row 9 = 한 쪽)
     - 교차점에만 기물 배치
+    - squares: 90칸 평탄 배열 (index = row * BOARD_COLS + col), 칸 조회 O(1)
+    - codes: squares 와 나란한 칸 코드 리스트 (Piece.code: 종류 | 진영 << 3, 0 = 빈 칸).
+      이동 생성·공격 판정은 이 정수만 본다
+    - bitboards: 진영·기물별 90비트 비트보드 (bitboard 엔진용)
+    - engine: 이동 생성 엔진 이름 ("mailbox" | "bitboard")
+    - zobrist_key: 국면(기물 배치 + 둘 차례) 64비트 Zobrist 키, 이동·무르기 때 증분 갱신
+    - move_cache: (국면 키, 칸) -> 이동 목록, (국면 키, 진영) -> 장군 여부,
+      (국면 키, "strict", 칸) -> 완전 합법 수 목록. 이동·무르기 때 비움
+    - 수 기록: 나란한 array 버퍼 (출발 칸, 도착 칸, 잡은 기물 코드, 두기 직전 키) + 현재 수 번호.
+      무르기는 번호만 내리고 항목은 남겨 두어 다시 두기(redo)도 O(1). 무른 뒤 새 수를 두면 꼬리를 버린다
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        engine: str | None = None,
+        setup: list | None = None,
+        turn: str = "cho",
+    ):
+        """
+        Args:
+            engine: 이동 생성 엔진 이름 (None 이면 config.MOVE_ENGINE)
+            setup: config.INITIAL_SETUP 과 같은 형식의 배치 (None 이면 초기 배치)
+            turn: 둘 차례 ("cho" | "han")
+        """
+        self.engine: str = engine or config.MOVE_ENGINE
+        if self.engine not in MOVE_ENGINES:
+            raise ValueError(f"unknown move engine: {self.engine!r}")
+        self._generate = MOVE_ENGINES[self.engine]
         self.pieces: list[Piece] = []
-        self.current_turn: str = "cho"  # 초가 선
+        self.squares: list[Piece | None] = [None] * (config.BOARD_COLS * config.BOARD_ROWS)
+        self.codes = [0] * (config.BOARD_COLS * config.BOARD_ROWS)
+        self.current_turn: str = turn  # 기본: 초가 선
         self.game_over: str | None = None  # None | "cho" | "han" (승자)
-        self._history: list[dict] = []  # 무르기용: [{"piece", "from", "to", "captured"}]
-        self._setup_initial_pieces()
+        self._move_from = array("B")  # 수 기록: 출발 칸
+        self._move_to = array("B")  # 도착 칸
+        self._move_captured = array("B")  # 잡은 기물 칸 코드 (0 = 없음)
+        self._move_keys = array("Q")  # 각 수를 두기 직전 국면 키
+        self._ply = 0  # 둔 수의 개수. 기록의 _ply 번째 이후는 다시 두기용
+        self._captured: list[Piece] = []  # 잡힌 기물 스택 (잡은 수 순서, 다시 두기 꼬리 포함)
+        self._captures_applied = 0  # _captured 중 지금 보드에서 빠져 있는 개수
+        self._key_counts: dict[int, int] = {}  # 키 -> _move_keys[:_ply] 안의 등장 횟수 (반복 판정 O(1))
+        self.move_cache = LRUCache(config.MOVE_CACHE_SIZE)
+        self._setup_initial_pieces(setup)
 
-    def _setup_initial_pieces(self) -> None:
-        """config.INITIAL_SETUP 에 따라 기물 초기 배치."""
+    def _setup_initial_pieces(self, setup: list | None = None) -> None:
+        """setup (기본: config.INITIAL_SETUP) 에 따라 기물 초기 배치."""
         self.pieces.clear()
-        for (col, row), (piece_type, side) in config.INITIAL_SETUP:
+        for (col, row), (piece_type, side) in (config.INITIAL_SETUP if setup is None else setup):
             self.pieces.append(Piece(piece_type, side, col, row))
+        self._index_pieces()
+
+    def _index_pieces(self) -> None:
+        """pieces 목록으로 squares·codes·비트보드·Zobrist 키를 다시 만든다."""
+        self.squares = [None] * (config.BOARD_COLS * config.BOARD_ROWS)
+        self.codes = [0] * (config.BOARD_COLS * config.BOARD_ROWS)
+        for piece in self.pieces:
+            sq = piece.row * config.BOARD_COLS + piece.col
+            self.squares[sq] = piece
+            self.codes[sq] = piece.code
+        self.bitboards = Bitboards.from_pieces(self.pieces)
+        self._zobrist = zobrist.compute_key(self.pieces, self.current_turn)
+
+    @classmethod
+    def from_fen(cls, fen: str, engine: str | None = None) -> "Board":
+        """
+        FEN 비슷한 문자열로 국면 생성.
+        형식: "<row 0>/<row 1>/.../<row 9> <cho|han>"
+        - 각 행은 col 0 → 8 순서, 숫자는 연속 빈 칸 수
+        - 기물 글자는 config.PIECE_LETTERS, 대문자 = 초, 소문자 = 한
+        """
+        parts = fen.split()
+        rows = parts[0].split("/")
+        if len(rows) != config.BOARD_ROWS:
+            raise ValueError(f"FEN must have {config.BOARD_ROWS} rows: {fen!r}")
+        turn = parts[1] if len(parts) > 1 else "cho"
+        if turn not in ("cho", "han"):
+            raise ValueError(f"unknown side to move: {turn!r}")
+        letter_to_type = {v: k for k, v in config.PIECE_LETTERS.items()}
+        setup = []
+        for row, text in enumerate(rows):
+            col = 0
+            for ch in text:
+                if ch.isdigit():
+                    col += int(ch)
+                    continue
+                piece_type = letter_to_type.get(ch.lower())
+                if piece_type is None:
+                    raise ValueError(f"unknown piece letter {ch!r} in FEN")
+                setup.append(((col, row), (piece_type, "cho" if ch.isupper() else "han")))
+                col += 1
+            if col != config.BOARD_COLS:
+                raise ValueError(f"row {row} does not have {config.BOARD_COLS} columns: {text!r}")
+        return cls(engine=engine, setup=setup, turn=turn)
+
+    def to_fen(self) -> str:
+        """현재 국면을 from_fen 형식 문자열로."""
+        rows = []
+        for row in range(config.BOARD_ROWS):
+            text = ""
+            empty = 0
+            for col in range(config.BOARD_COLS):
+                p = self.squares[row * config.BOARD_COLS + col]
+                if p is None:
+                    empty += 1
+                    continue
+                if empty:
+                    text += str(empty)
+                    empty = 0
+                letter = config.PIECE_LETTERS[p.piece_type]
+                text += letter.upper() if p.side == "cho" else letter
+            if empty:
+                text += str(empty)
+            rows.append(text)
+        return "/".join(rows) + " " + self.current_turn
+
+    @property
+    def zobrist_key(self) -> int:
+        """현재 국면의 64비트 Zobrist 키 (기물 종류·진영·칸 + 둘 차례)."""
+        return self._zobrist
+
+    def repetition_count(self) -> int:
+        """현재 국면이 지금까지 둔 수들 직전 국면 중 몇 번 나왔는지."""
+        return self._key_counts.get(self._zobrist, 0)
+
+    @property
+    def ply(self) -> int:
+        """지금까지 둔 (무를 수 있는) 수의 개수."""
+        return self._ply
+
+    @property
+    def redo_count(self) -> int:
+        """무른 뒤 다시 둘 수 있는 수의 개수."""
+        return len(self._move_from) - self._ply
 
     def get_board_size_pixels(self) -> tuple[int, int]:
         """보드가 차지하는 픽셀 크기 (가로, 세로)."""
@@ -66,10 +200,9 @@ class Board:
         return (x, y)
 
     def get_piece_at(self, col: int, row: int) -> Piece | None:
-        """해당 교차점에 있는 기물 반환. 없으면 None."""
-        for p in self.pieces:
-            if p.col == col and p.row == row:
-                return p
+        """해당 교차점에 있는 기물 반환. 없으면 None (보드 밖도 None)."""
+        if 0 <= col < config.BOARD_COLS and 0 <= row < config.BOARD_ROWS:
+            return self.squares[row * config.BOARD_COLS + col]
         return None
 
     def get_piece_at_screen(self, px: int, py: int) -> Piece | None:
@@ -91,29 +224,72 @@ class Board:
             piece.selected = True
 
     def get_legal_moves(self, piece: Piece) -> list[tuple[int, int]]:
-        """기물의 합법적 이동 목적지 (col, row) 리스트."""
-        return get_legal_moves(self, piece)
+        """
+        기물의 합법적 이동 목적지 (col, row) 리스트 (선택된 엔진 사용).
+        같은 국면에서 다시 부르면 캐시된 리스트를 그대로 돌려주므로 수정하지 말 것.
+        """
+        key = (self._zobrist, piece.row * config.BOARD_COLS + piece.col)
+        moves = self.move_cache.get(key)
+        if moves is None:
+            moves = self._generate(self, piece)
+            self.move_cache.put(key, moves)
+        return moves
+
+    def king_safety(self, side: str):
+        """movement.king_safety 결과 (국면·진영별 캐시)."""
+        key = (self._zobrist, "safety", side)
+        safety = self.move_cache.get(key)
+        if safety is None:
+            safety = movement.king_safety(self, side)
+            self.move_cache.put(key, safety)
+        return safety
+
+    def get_strict_moves(self, piece: Piece) -> list[tuple[int, int]]:
+        """
+        get_legal_moves 중 자기 궁을 장군 상태로 남기지 않는 수만 (완전 합법 수, 캐시됨).
+        config.FACING_GENERALS_ILLEGAL 이면 빅장이 되는 수도 뺀다.
+        """
+        key = (self._zobrist, "strict", piece.row * config.BOARD_COLS + piece.col)
+        moves = self.move_cache.get(key)
+        if moves is None:
+            moves = movement.filter_moves(self, piece, self.get_legal_moves(piece), self.king_safety(piece.side))
+            self.move_cache.put(key, moves)
+        return moves
+
+    def has_strict_moves(self, side: str) -> bool:
+        """side 에게 완전 합법 수가 하나라도 있는지 (없으면 그 진영의 패배)."""
+        color = side_of(side)
+        return any(self.get_strict_moves(p) for p in self.pieces if p.color == color)
+
+    def resolve_no_moves(self) -> bool:
+        """
+        둘 차례에 완전 합법 수가 없으면 상대를 승자로 game_over 를 정한다 (궁 포착과 같은 게임 끝).
+        화면·대국에서 move_piece + switch_turn (또는 redo) 뒤에 부른다. 게임이 끝났으면 True.
+        """
+        if self.game_over is None and not self.has_strict_moves(self.current_turn):
+            self.game_over = "han" if self.current_turn == "cho" else "cho"
+        return self.game_over is not None
 
     def get_king(self, side: str) -> Piece | None:
-        """해당 진영의 궁(將/楚·漢) 기물 반환. 없으면 None."""
+        """해당 진영("cho" | "han" 또는 Side)의 궁(將/楚·漢) 기물 반환. 없으면 None."""
+        color = side_of(side)
         for p in self.pieces:
-            if p.piece_type == "general" and p.side == side:
+            if p.kind == PieceType.GENERAL and p.color == color:
                 return p
         return None
 
     def is_in_check(self, side: str) -> bool:
-        """해당 진영의 궁이 적에게 잡힐 수 있는 상태(장군)인지."""
-        king = self.get_king(side)
+        """해당 진영("cho" | "han" 또는 Side)의 궁이 적에게 잡힐 수 있는 상태(장군)인지."""
+        color = side_of(side)
+        king = self.get_king(color)
         if king is None:
             return False
-        enemy = "cho" if side == "han" else "han"
-        for p in self.pieces:
-            if p.side != enemy:
-                continue
-            moves = self.get_legal_moves(p)
-            if (king.col, king.row) in moves:
-                return True
-        return False
+        key = (self._zobrist, "check", int(color))  # 칸 번호 키 (zobrist, sq) 와 겹치지 않게
+        in_check = self.move_cache.get(key)
+        if in_check is None:
+            in_check = movement.is_square_attacked(self, king.col, king.row, color ^ 1)
+            self.move_cache.put(key, in_check)
+        return in_check
 
     def move_piece(self, piece: Piece, to_col: int, to_row: int) -> Piece | None:
         """
@@ -124,101 +300,159 @@ class Board:
         if self.game_over is not None:
             return None
         target = self.get_piece_at(to_col, to_row)
-        if target is not None and target.side == piece.side:
+        if target is not None and target.color == piece.color:
             return None
-        from_col, from_row = piece.col, piece.row
-        self._history.append({
-            "piece": piece,
-            "from": (from_col, from_row),
-            "to": (to_col, to_row),
-            "captured": target,
-        })
+        ply = self._ply
+        if ply < len(self._move_from):
+            # 무른 뒤 새 수: 다시 두기 꼬리를 버린다
+            del self._move_from[ply:]
+            del self._move_to[ply:]
+            del self._move_captured[ply:]
+            del self._move_keys[ply:]
+            del self._captured[self._captures_applied:]
+        from_sq = piece.row * config.BOARD_COLS + piece.col
+        to_sq = to_row * config.BOARD_COLS + to_col
+        self._move_from.append(from_sq)
+        self._move_to.append(to_sq)
+        self._move_keys.append(self._zobrist)
+        if target is None:
+            self._move_captured.append(0)
+        else:
+            self._move_captured.append(target.code)
+            self._captured.append(target)
+        self._apply(piece, from_sq, to_sq, target)
+        return target
+
+    def _apply(self, piece: Piece, from_sq: int, to_sq: int, target: Piece | None) -> None:
+        """기록된 수 하나를 보드에 반영 (move_piece·redo 공용). 턴은 넘기지 않는다."""
+        self.move_cache.clear()
+        key = self._zobrist
+        self._key_counts[key] = self._key_counts.get(key, 0) + 1
+        codes = self.codes
+        code = codes[from_sq]
+        keys = zobrist.CODE_KEYS[code]
+        key ^= keys[from_sq] ^ keys[to_sq]
         if target is not None:
             self.pieces.remove(target)
-        piece.set_position(to_col, to_row)
-        if target is not None and target.piece_type == "general":
+            self.bitboards.remove(target.kind, target.color, to_sq)
+            key ^= zobrist.CODE_KEYS[codes[to_sq]][to_sq]
+            self._captures_applied += 1
+        self._zobrist = key
+        self.squares[from_sq] = None
+        self.squares[to_sq] = piece
+        codes[from_sq] = 0
+        codes[to_sq] = code
+        self.bitboards.move(piece.kind, piece.color, from_sq, to_sq)
+        piece.set_position(to_sq % config.BOARD_COLS, to_sq // config.BOARD_COLS)
+        self._ply += 1
+        if target is not None and target.kind == PieceType.GENERAL:
             self.game_over = piece.side  # 포착한 쪽이 승자
-        return target
 
     def switch_turn(self) -> None:
         self.current_turn = "han" if self.current_turn == "cho" else "cho"
+        self._zobrist ^= zobrist.SIDE_KEY
 
     def undo(self) -> bool:
         """
         마지막 수 무르기. 성공 시 True.
         턴은 무른 쪽(방금 둔 쪽)으로 되돌린다. 게임 종료 상태에서도 무르기 가능.
+        무른 수는 기록에 남아 redo() 로 다시 둘 수 있다.
         """
-        if not self._history:
+        if self._ply == 0:
             return False
-        entry = self._history.pop()
-        piece = entry["piece"]
-        from_pos = entry["from"]
-        to_pos = entry["to"]
-        captured = entry["captured"]
-        piece.set_position(from_pos[0], from_pos[1])
+        self.move_cache.clear()
+        i = self._ply - 1
+        from_sq = self._move_from[i]
+        to_sq = self._move_to[i]
+        piece = self.squares[to_sq]
+        captured = None
+        if self._move_captured[i]:
+            self._captures_applied -= 1
+            captured = self._captured[self._captures_applied]
+        codes = self.codes
+        code = codes[to_sq]
+        captured_code = self._move_captured[i]
+        piece.set_position(from_sq % config.BOARD_COLS, from_sq // config.BOARD_COLS)
+        self.squares[from_sq] = piece
+        self.squares[to_sq] = captured
+        codes[from_sq] = code
+        codes[to_sq] = captured_code
+        self.bitboards.move(piece.kind, piece.color, to_sq, from_sq)
+        keys = zobrist.CODE_KEYS[code]
+        key = self._zobrist ^ keys[from_sq] ^ keys[to_sq]
         if captured is not None:
-            captured.set_position(to_pos[0], to_pos[1])
+            captured.set_position(to_sq % config.BOARD_COLS, to_sq // config.BOARD_COLS)
             self.pieces.append(captured)
+            self.bitboards.add(captured.kind, captured.color, to_sq)
+            key ^= zobrist.CODE_KEYS[captured_code][to_sq]
+        if self.current_turn != piece.side:
+            key ^= zobrist.SIDE_KEY
+        self._zobrist = key
+        prev = self._move_keys[i]
+        if self._key_counts[prev] == 1:
+            del self._key_counts[prev]
+        else:
+            self._key_counts[prev] -= 1
+        self._ply = i
         self.current_turn = piece.side
-        if captured is not None and captured.piece_type == "general":
-            self.game_over = None
+        self.game_over = None  # 게임은 마지막 수에서 끝나므로 그 전 국면은 진행 중 (궁 포착·둘 수 없음 모두)
         return True
 
-    def draw(self, surface: pygame.Surface, font: pygame.font.Font) -> None:
-        """보드(선, 궁성), 이동 가능 표시, 기물을 그린다."""
-        self._draw_board_lines(surface)
-        self._draw_palace_diagonals(surface)
-        self._draw_legal_moves(surface)
-        for p in self.pieces:
-            p.draw(surface, font)
-
-    def _draw_board_lines(self, surface: pygame.Surface) -> None:
-        """9x10 교차선 그리기."""
-        x0 = config.MARGIN_LEFT
-        y0 = config.MARGIN_TOP
-        # 세로선 9개
-        for c in range(config.BOARD_COLS):
-            x = x0 + c * config.CELL_WIDTH
-            pygame.draw.line(
-                surface, config.COLOR_LINE,
-                (x, y0),
-                (x, y0 + (config.BOARD_ROWS - 1) * config.CELL_HEIGHT),
-                2
-            )
-        # 가로선 10개
-        for r in range(config.BOARD_ROWS):
-            y = y0 + r * config.CELL_HEIGHT
-            pygame.draw.line(
-                surface, config.COLOR_LINE,
-                (x0, y),
-                (x0 + (config.BOARD_COLS - 1) * config.CELL_WIDTH, y),
-                2
-            )
-
-    def _draw_palace_diagonals(self, surface: pygame.Surface) -> None:
-        """양쪽 궁성(3x3) 안의 대각선 X 그리기."""
-        x0 = config.MARGIN_LEFT
-        y0 = config.MARGIN_TOP
-        # 궁성 왼쪽 위 ~ 오른쪽 아래, 오른쪽 위 ~ 왼쪽 아래
-        for base_row, row_count in [(0, 3), (7, 3)]:
-            # 궁성: col 3,4,5 / row base_row ~ base_row+2
-            left = x0 + 3 * config.CELL_WIDTH
-            right = x0 + 5 * config.CELL_WIDTH
-            top = y0 + base_row * config.CELL_HEIGHT
-            bottom = y0 + (base_row + 2) * config.CELL_HEIGHT
-            pygame.draw.line(surface, config.COLOR_PALACE_DIAG, (left, top), (right, bottom), 1)
-            pygame.draw.line(surface, config.COLOR_PALACE_DIAG, (right, top), (left, bottom), 1)
-
-    def _draw_legal_moves(self, surface: pygame.Surface) -> None:
-        """선택된 기물의 이동 가능 위치를 점/원으로 표시."""
-        selected = next((p for p in self.pieces if p.selected), None)
-        if selected is None:
-            return
-        moves = self.get_legal_moves(selected)
-        for col, row in moves:
-            x, y = self.intersection_to_screen(col, row)
-            target = self.get_piece_at(col, row)
-            if target is not None:
-                pygame.draw.circle(surface, config.COLOR_CAPTURE_HINT, (x, y), config.MOVE_DOT_RADIUS + 2, 2)
-            else:
-                pygame.draw.circle(surface, config.COLOR_MOVE_DOT, (x, y), config.MOVE_DOT_RADIUS)
+    def redo(self) -> bool:
+        """
+        무른 수를 다시 두기. 성공 시 True.
+        move_piece 뒤 switch_turn 한 것과 같은 상태가 된다 (궁을 잡아 끝나는 수면 턴은 그대로).
+        """
+        i = self._ply
+        if i >= len(self._move_from) or self.game_over is not None:
+            return False
+        from_sq = self._move_from[i]
+        to_sq = self._move_to[i]
+        piece = self.squares[from_sq]
+        target = self.squares[to_sq]
+        self._apply(piece, from_sq, to_sq, target)
+        if self.game_over is None:
+            self.switch_turn()
+        return True
+
+    def history_bytes(self) -> bytes:
+        """
+        수 기록 직렬화: 헤더 (현재 수 번호, 기록 수) + 출발 칸·도착 칸·잡은 기물 코드 배열을 그대로 이어 붙임.
+        다시 두기 꼬리도 들어간다. 국면 키는 다시 두며 계산되므로 넣지 않는다.
+        """
+        return (
+            _HISTORY_HEADER.pack(self._ply, len(self._move_from))
+            + self._move_from.tobytes()
+            + self._move_to.tobytes()
+            + self._move_captured.tobytes()
+        )
+
+    def load_history(self, data: bytes) -> None:
+        """
+        history_bytes 결과를 이 보드에서 다시 둔다. 보드는 기록을 만든 보드의 시작 국면(ply 0)이어야 한다.
+        모든 수를 둔 뒤 저장된 수 번호까지 물러, 무른 수들은 redo() 로 다시 둘 수 있다.
+        """
+        if self._ply or len(self._move_from):
+            raise ValueError("load_history needs a board with no moves")
+        ply, count = _HISTORY_HEADER.unpack_from(data, 0)
+        off = _HISTORY_HEADER.size
+        if len(data) != off + 3 * count or ply > count:
+            raise ValueError("history data has the wrong size")
+        from_sqs = data[off: off + count]
+        to_sqs = data[off + count: off + 2 * count]
+        codes = data[off + 2 * count: off + 3 * count]
+        for from_sq, to_sq, code in zip(from_sqs, to_sqs, codes):
+            if self.game_over is not None:
+                raise ValueError(f"history continues after the game ended at ply {self._ply}")
+            piece = self.squares[from_sq] if from_sq < len(self.squares) else None
+            target = self.squares[to_sq] if to_sq < len(self.squares) else piece
+            if piece is None or (target is not None and target.color == piece.color):
+                raise ValueError(f"history does not match the board at ply {self._ply}")
+            if (0 if target is None else target.code) != code:
+                raise ValueError(f"history does not match the board at ply {self._ply}")
+            self.move_piece(piece, to_sq % config.BOARD_COLS, to_sq // config.BOARD_COLS)
+            if self.game_over is None:
+                self.switch_turn()
+        while self._ply > ply:
+            self.undo()
+
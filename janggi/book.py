@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+정석 책 (opening book): 국면 키(Board.zobrist_key) -> 그 국면에서 둔 수들의 대국 수·점수
+- 대국 데이터베이스(gamerecord.py)를 한 대국씩 읽어 GameRecord.replay (Board.move_piece) 로 처음 max_plies 수까지 두며 센다
+- 점수 = 그 수를 둔 쪽 기준 (승 1, 무·결과 없음 0.5, 패 0). min_games 판 미만인 수는 버린다
+- 파일: 헤더 | 버킷 표 | 항목 (키 순, 같은 키는 대국 수 많은 순). mmap 으로 연다
+    항목 = 18바이트 (키 u64 | 수 u16 | 대국 수 u32 | 점수×2 u32), 수 = from_sq << 8 | to_sq (posindex 와 같음)
+    버킷 표 = 키 위 bucket_bits 비트 -> 그 버킷 첫 항목 번호 (u32, 2^bits + 1 개). 찾기는 표 두 칸 + 버킷 안 몇 항목 (O(1))
+- 책에서 꺼낸 수는 현재 국면의 완전 합법 수인지 확인하고 쓴다 (키 충돌 대비)
+- search.Searcher(book=...) 는 책에 수가 있으면 탐색하지 않고 바로 돌려준다. main.py 는 B 키로 책 수를 보여 준다
+
+실행 예:
+    python book.py build games.jgdb games.jgbk --plies 20 --min-games 2
+    python book.py probe games.jgbk --moves "c3c4 c6c5"
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import random
+import struct
+import sys
+import time
+from dataclasses import dataclass
+
+import config
+from board import Board
+from gamerecord import GameDatabase
+
+COLS = config.BOARD_COLS
+
+MAGIC = b"JGBK"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sHHQ")  # magic, 버전, 버킷 비트 수, 항목 수
+ENTRY = struct.Struct("<QHII")  # 키, 수, 대국 수, 점수×2
+MAX_BUCKET_BITS = 24
+
+_BUCKET = struct.Struct("<I")
+_BUCKET_PAIR = struct.Struct("<II")
+_POINTS = {"cho": {"cho": 2, "han": 0}, "han": {"cho": 0, "han": 2}}  # [둔 쪽][결과] -> 점수×2 (나머지 1)
+
+
+@dataclass
+class BookMove:
+    """책의 수 하나. score = 둔 쪽 기준 평균 점수 (0~1)."""
+
+    move: tuple[tuple[int, int], tuple[int, int]]
+    games: int
+    score: float
+
+
+def _decode(move: int) -> tuple[tuple[int, int], tuple[int, int]]:
+    f, t = move >> 8, move & 0xFF
+    return (f % COLS, f // COLS), (t % COLS, t // COLS)
+
+
+def count_moves(db: GameDatabase, max_plies: int = 20, engine: str | None = None) -> dict[tuple[int, int], list[int]]:
+    """대국마다 처음 max_plies 수: {(키, 수): [대국 수, 점수×2]}."""
+    counts: dict[tuple[int, int], list[int]] = {}
+    for n, game in enumerate(db):
+        result = db.result(n)
+        for ply, (board, from_sq, to_sq) in enumerate(game.replay(engine)):
+            if ply >= max_plies:
+                break
+            k = (board.zobrist_key, from_sq << 8 | to_sq)
+            entry = counts.get(k)
+            if entry is None:
+                entry = counts[k] = [0, 0]
+            entry[0] += 1
+            entry[1] += _POINTS[board.current_turn].get(result, 1)
+    return counts
+
+
+def bucket_bits_for(count: int) -> int:
+    """항목 수에 맞는 버킷 비트 수 (버킷 하나에 평균 1개 이하)."""
+    return max(1, min(MAX_BUCKET_BITS, count.bit_length()))
+
+
+def write_book(out_path: str, counts: dict[tuple[int, int], list[int]], min_games: int = 1) -> int:
+    """count_moves 결과를 책 파일로. 쓴 항목 수를 돌려준다."""
+    entries = sorted(
+        (key, -games, move, points)
+        for (key, move), (games, points) in counts.items()
+        if games >= min_games
+    )
+    bits = bucket_bits_for(len(entries))
+    shift = 64 - bits
+    starts = [0] * ((1 << bits) + 1)
+    for key, _, _, _ in entries:
+        starts[(key >> shift) + 1] += 1
+    for b in range(1, len(starts)):
+        starts[b] += starts[b - 1]
+    pack = ENTRY.pack
+    with open(out_path, "wb") as f:
+        f.write(FILE_HEADER.pack(MAGIC, VERSION, bits, len(entries)))
+        f.write(struct.pack(f"<{len(starts)}I", *starts))
+        f.write(b"".join(pack(key, move, -neg_games, points) for key, neg_games, move, points in entries))
+    return len(entries)
+
+
+def build_book(
+    db_path: str,
+    out_path: str,
+    max_plies: int = 20,
+    min_games: int = 2,
+    engine: str | None = None,
+) -> int:
+    """db_path 의 대국으로 out_path 책을 만든다. 항목 수를 돌려준다."""
+    with GameDatabase(db_path) as db:
+        counts = count_moves(db, max_plies, engine)
+    return write_book(out_path, counts, min_games)
+
+
+class OpeningBook:
+    """mmap 으로 연 정석 책 (읽기 전용)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, bits, count = FILE_HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"not an opening book: {path!r}")
+        if version != VERSION:
+            raise ValueError(f"unsupported opening book version {version}: {path!r}")
+        self._count = count
+        self._shift = 64 - bits
+        self._table = FILE_HEADER.size
+        self._entries = self._table + ((1 << bits) + 1) * _BUCKET.size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def lookup(self, key: int) -> list[BookMove]:
+        """key 국면의 책 수 (대국 수 많은 순). 합법인지는 보지 않는다."""
+        data = self._data
+        lo, hi = _BUCKET_PAIR.unpack_from(data, self._table + (key >> self._shift) * _BUCKET.size)
+        unpack = ENTRY.unpack_from
+        out = []
+        for i in range(lo, hi):
+            k, move, games, points = unpack(data, self._entries + i * ENTRY.size)
+            if k > key:
+                break
+            if k == key:
+                out.append(BookMove(_decode(move), games, points / (2 * games)))
+        return out
+
+    def probe(self, board: Board) -> list[BookMove]:
+        """board 국면의 책 수 중 완전 합법 수만 (대국 수 많은 순)."""
+        if board.game_over is not None:
+            return []
+        out = []
+        for bm in self.lookup(board.zobrist_key):
+            (fc, fr), to = bm.move
+            piece = board.get_piece_at(fc, fr)
+            if piece is not None and piece.side == board.current_turn and to in board.get_strict_moves(piece):
+                out.append(bm)
+        return out
+
+    def choose(self, board: Board, rng: random.Random | None = None) -> BookMove | None:
+        """둘 책 수: rng 가 없으면 대국 수가 가장 많은 수, 있으면 대국 수 비례 무작위. 없으면 None."""
+        moves = self.probe(board)
+        if not moves:
+            return None
+        if rng is None:
+            return moves[0]
+        return rng.choices(moves, weights=[bm.games for bm in moves])[0]
+
+    def close(self) -> None:
+        self._data.close()
+        self._file.close()
+
+    def __enter__(self) -> "OpeningBook":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Janggi opening book")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("build", help="데이터베이스로 책 만들기")
+    p.add_argument("db")
+    p.add_argument("out")
+    p.add_argument("--plies", type=int, default=20, help="대국마다 처음 몇 수까지 (기본 20)")
+    p.add_argument("--min-games", type=int, default=2, help="이보다 적게 둔 수는 버림 (기본 2)")
+    p = sub.add_parser("probe", help="국면의 책 수")
+    p.add_argument("book")
+    p.add_argument("--fen", help="국면 (기본: 초기 배치)")
+    p.add_argument("--moves", default="", help="시작 국면에서 둘 수들, 예: \"c3c4 c6c5\"")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        count = build_book(args.db, args.out, max_plies=args.plies, min_games=args.min_games)
+        elapsed = time.perf_counter() - start
+        print(f"book {count} moves -> {args.out}  time {elapsed:.1f}s")
+        return 0
+
+    from perft import apply_moves, format_move
+
+    board = Board.from_fen(args.fen) if args.fen else Board()
+    bad = apply_moves(board, args.moves)
+    if bad is not None:
+        print(f"illegal move: {bad}")
+        return 1
+
+    with OpeningBook(args.book) as book:
+        key = board.zobrist_key
+        start = time.perf_counter()
+        rounds = 10000
+        for _ in range(rounds):
+            book.lookup(key)
+        elapsed = (time.perf_counter() - start) / rounds
+        moves = book.probe(board)
+        print(f"entries {len(book)}  moves {len(moves)}  lookup {elapsed * 1e6:.2f}us")
+        for bm in moves:
+            print(f"{format_move(bm.move)}  games {bm.games:6d}  score {bm.score:.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
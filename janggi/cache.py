@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+크기 제한 LRU 캐시
+- Board 의 국면별 이동 목록 / 장군 여부 캐시에 사용
+- 가득 차면 가장 오래 쓰지 않은 항목부터 제거
+- 적중/실패/제거 횟수 통계
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """최대 maxsize 개 항목을 보관하는 LRU 캐시."""
+
+    def __init__(self, maxsize: int):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def get(self, key, default=None):
+        """키에 해당하는 값. 적중하면 최근 사용으로 옮긴다."""
+        value = self._data.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key, value) -> None:
+        """값 저장. 용량을 넘으면 가장 오래된 항목 제거."""
+        data = self._data
+        data[key] = value
+        data.move_to_end(key)
+        if len(data) > self.maxsize:
+            data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """항목만 비운다 (통계는 유지)."""
+        self._data.clear()
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> dict:
+        """적중/실패/제거 횟수, 적중률, 현재 크기."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
@@ -38,6 +38,24 @@ COLOR_TEXT = (40, 35, 30)
 COLOR_CHECK = (180, 50, 50)
 COLOR_GAME_OVER = (80, 20, 20)
 
+# 화면 갱신: 아무 입력이 없을 때 event.wait 로 잠드는 최대 시간 (ms)
+IDLE_WAIT_MS = 1000
+
+# 이동 생성 엔진: "mailbox" (칸 배열 탐색, 가장 빠름) | "bitboard" (90비트 정수 비트보드, CPython 에서는 더 느림: bitboard.py 참고)
+MOVE_ENGINE = "mailbox"
+
+# 빅장: 두 궁이 같은 세로줄에서 사이에 기물 없이 마주 보게 되는 수를 금지할지 (완전 합법 수 생성에서만)
+FACING_GENERALS_ILLEGAL = False
+
+# Board 의 국면별 이동 목록 캐시 최대 항목 수 (LRU)
+MOVE_CACHE_SIZE = 256
+
+# 탐색용 트랜스포지션 테이블 기본 크기 (MB)
+TT_SIZE_MB = 16
+
+# 정석 책 파일 (book.py build 로 만든 것). 이 파일이 있으면 게임 화면에서 B 키로 책 수를 본다
+BOOK_PATH = "book.jgbk"
+
 # 궁성 범위 (열, 행). 한쪽 궁성 3x3
 PALACE_COLS = (3, 4, 5)   # col 3,4,5
 PALACE_TOP_ROWS = (0, 1, 2)   # Cho 궁성
@@ -57,6 +75,28 @@ PIECE_HANJA = {
     "soldier_cho": "卒",
 }
 
+# 국면 문자열(FEN)용 기물 글자. 초 = 대문자, 한 = 소문자
+PIECE_LETTERS = {
+    "general": "k",
+    "guard": "a",
+    "horse": "n",
+    "elephant": "b",
+    "chariot": "r",
+    "cannon": "c",
+    "soldier": "p",
+}
+
+# 일괄 이동 생성(batch.py)용 기물 번호. 초 = 양수, 한 = 음수, 0 = 빈 칸
+PIECE_CODES = {
+    "general": 1,
+    "guard": 2,
+    "horse": 3,
+    "elephant": 4,
+    "chariot": 5,
+    "cannon": 6,
+    "soldier": 7,
+}
+
 # 초기 배치: (col, row) -> (piece_type, side)
 # side: "han" | "cho"
 # piece_type: general, guard, horse, elephant, chariot, cannon, soldier
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+한자/한글 폰트 찾기 + 디스크 캐시
+- 처음 한 번만 후보를 찾아본다: Windows 폰트 파일 → SysFont 이름 → 시스템 폰트 목록
+  (SysFont·get_fonts 는 Linux 에서 fc-list 를 실행하므로 느리다)
+- 찾은 폰트 파일 경로를 CACHE_PATH (JSON) 에 저장하고, 다음 실행부터는 그 파일을 바로 연다
+- 캐시는 폰트 폴더들 (하위 폴더·fontconfig 캐시 포함) 의 수정 시각이 바뀌면 (폰트 설치·삭제) 무효
+- 같은 실행 안에서는 크기마다 찾지 않고 같은 파일로 pygame.font.Font(path, size) 만 만든다
+
+시작 시간 비교 (캐시 없이 찾기 / 캐시 사용):
+    python fonts.py
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+
+import pygame
+
+CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "janggi", "font.json")
+
+# 찾는 순서대로
+WINDOWS_FONT_FILES = [
+    "malgun.ttf",
+    "malgunbd.ttf",
+    "gulim.ttc",
+    "batang.ttc",
+    "batangche.ttc",
+    "gungsuh.ttc",
+    "gungsuhche.ttc",
+    "dotum.ttc",
+    "dotumche.ttc",
+]
+SYSFONT_NAMES = [
+    "Malgun Gothic",
+    "malgun",
+    "맑은 고딕",
+    "Gulim",
+    "gulim",
+    "굴림",
+    "Batang",
+    "batang",
+    "바탕",
+    "Gungsuh",
+    "궁서",
+    "Dotum",
+    "돋움",
+    "NanumGothic",
+    "나눔고딕",
+    "AppleGothic",
+]
+NAME_HINTS = ("malgun", "gulim", "batang", "gothic", "gungsuh", "dotum")
+
+_resolved: dict[str, str | None] = {}  # 이 실행에서 찾은 경로 ("path" -> 경로 또는 None = 기본 폰트)
+
+
+def _windows_font_dir() -> str:
+    return os.path.join(os.environ.get("WINDIR", "C:\\Windows"), "Fonts")
+
+
+def _font_dirs() -> list[str]:
+    """폰트가 설치되는 폴더들 (있는 것만 캐시 무효화 판단에 쓴다)."""
+    home = os.path.expanduser("~")
+    return [
+        _windows_font_dir(),
+        os.path.join(os.environ.get("LOCALAPPDATA", ""), "Microsoft", "Windows", "Fonts"),
+        "/usr/share/fonts",
+        "/usr/local/share/fonts",
+        os.path.join(home, ".fonts"),
+        os.path.join(home, ".local", "share", "fonts"),
+        "/Library/Fonts",
+        "/System/Library/Fonts",
+        os.path.join(home, "Library", "Fonts"),
+    ]
+
+
+def _walk_dirs(root: str):
+    """root 와 그 아래 모든 폴더 (파일은 보지 않는다). 못 여는 폴더는 건너뛴다."""
+    stack = [root]
+    while stack:
+        d = stack.pop()
+        yield d
+        try:
+            with os.scandir(d) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+        except OSError:
+            continue
+
+
+def font_dir_signature() -> list:
+    """
+    [(폴더, 수정 시각), ...] - 폰트를 설치·삭제하면 바뀐다.
+    /usr/share/fonts/truetype/nanum/ 처럼 하위 폴더에 설치해도 그 폴더 시각이 바뀌므로
+    폰트 폴더 아래 모든 하위 폴더와 fontconfig 캐시 폴더까지 본다.
+    """
+    home = os.path.expanduser("~")
+    roots = _font_dirs() + ["/var/cache/fontconfig", os.path.join(home, ".cache", "fontconfig")]
+    sig = []
+    for root in roots:
+        for d in _walk_dirs(root):
+            try:
+                sig.append([d, os.stat(d).st_mtime_ns])
+            except OSError:
+                continue
+    return sig
+
+
+def can_render_hanja(font: pygame.font.Font) -> bool:
+    """폰트가 한자(漢)를 제대로 그릴 수 있는지 확인."""
+    try:
+        s = font.render("漢", True, (0, 0, 0))
+        return s.get_width() >= 8 and s.get_height() >= 8
+    except Exception:
+        return False
+
+
+def _usable(path: str | None) -> bool:
+    if not path or not os.path.isfile(path):
+        return False
+    try:
+        return can_render_hanja(pygame.font.Font(path, 24))
+    except Exception:
+        return False
+
+
+def find_hanja_font_path() -> str | None:
+    """
+    한자를 그릴 수 있는 폰트 파일 경로를 찾는다 (느림: 캐시 없이 매번 찾아봄).
+    못 찾으면 None (pygame 기본 폰트).
+    """
+    # 1) Windows Fonts 폴더의 TTF/TTC 파일
+    font_dir = _windows_font_dir()
+    for name in WINDOWS_FONT_FILES:
+        path = os.path.join(font_dir, name)
+        if _usable(path):
+            return path
+
+    # 2) 한글/한자 폰트 이름 -> 파일
+    for name in SYSFONT_NAMES:
+        try:
+            path = pygame.font.match_font(name)
+        except Exception:
+            continue
+        if _usable(path):
+            return path
+
+    # 3) 시스템 폰트 목록에서 이름에 gothic/gulim/malgun/batang 등이 들어간 것
+    try:
+        for name in pygame.font.get_fonts():
+            if any(hint in name.lower() for hint in NAME_HINTS):
+                path = pygame.font.match_font(name)
+                if _usable(path):
+                    return path
+    except Exception:
+        pass
+
+    return None
+
+
+def _load_cache(signature: list) -> tuple[bool, str | None]:
+    """(캐시가 유효한지, 경로)."""
+    try:
+        with open(CACHE_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return False, None
+    if data.get("signature") != signature:
+        return False, None
+    path = data.get("path")
+    if path is not None and not os.path.isfile(path):
+        return False, None
+    return True, path
+
+
+def _save_cache(signature: list, path: str | None) -> None:
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        tmp = CACHE_PATH + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"signature": signature, "path": path}, f)
+        os.replace(tmp, CACHE_PATH)
+    except OSError:
+        pass  # 캐시는 없어도 동작한다
+
+
+def hanja_font_path(use_cache: bool = True) -> str | None:
+    """한자 폰트 파일 경로 (디스크 캐시 → 없거나 무효면 찾아서 저장). None = 기본 폰트."""
+    if "path" in _resolved:
+        return _resolved["path"]
+    signature = font_dir_signature()
+    valid, path = _load_cache(signature) if use_cache else (False, None)
+    if not valid:
+        path = find_hanja_font_path()
+        if use_cache:
+            _save_cache(signature, path)
+    _resolved["path"] = path
+    return path
+
+
+def get_hanja_font(size: int) -> pygame.font.Font:
+    """
+    한자/한글을 지원하는 size 크기 폰트.
+    찾은 폰트 파일을 크기마다 다시 열기만 한다 (없으면 기본 폰트, 한자는 깨질 수 있음).
+    """
+    path = hanja_font_path()
+    if path is not None:
+        try:
+            return pygame.font.Font(path, size)
+        except Exception:
+            pass
+    return pygame.font.Font(None, size)
+
+
+def main() -> int:
+    pygame.init()
+    start = time.perf_counter()
+    path = find_hanja_font_path()
+    for size in (28, 18):
+        pygame.font.Font(path, size)
+    cold = time.perf_counter() - start
+    signature = font_dir_signature()
+    _save_cache(signature, path)
+    _resolved.clear()
+    start = time.perf_counter()
+    for size in (28, 18):
+        get_hanja_font(size)
+    warm = time.perf_counter() - start
+    print(f"font {path or '(pygame default)'}")
+    print(f"cold (search) {cold * 1000:.1f}ms  warm (cache) {warm * 1000:.1f}ms  cache {CACHE_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,401 @@
+# -*- coding: utf-8 -*-
+"""
+장기 대국 기록 이진 형식 + mmap 대국 데이터베이스
+- 대국 하나 = 머리 8바이트 + (시작 배치 45바이트, 기본 배치가 아닐 때만) + 수마다 2바이트 (from_sq, to_sq)
+    머리: 대국 번호 u32 | 플래그 u8 | 끝난 이유 u8 | 수 개수 u16  (리틀 엔디언)
+    플래그: bit0 = 시작 배치 있음, bit1 = 한이 먼저 둠, bit2~3 = 결과 (0 무승부, 1 초, 2 한, 3 모름)
+    시작 배치: 90칸을 4비트씩 (0 = 빈 칸, 1~7 = 초 기물, 9~15 = 한 기물, 번호는 config.PIECE_CODES)
+    칸 번호 sq = row * 9 + col
+- 데이터베이스 = 파일 머리(b"JGDB", 버전) + 대국 기록을 이어 붙인 파일 (<이름>)
+  + 각 대국 시작 위치 u64 배열 (<이름>.idx). 읽을 때는 둘 다 mmap 이라 전체를 읽어 들이지 않는다
+- GameDatabase: db[n] (n 번째 대국, O(1)), for g in db (순서대로 스트리밍), len(db)
+- GameWriter: 대국을 하나씩 추가 (selfplay.py 출력). 열 때 잘린 꼬리를 정리하고 색인을 맞춘다
+
+실행 예:
+    python gamerecord.py convert games.jsonl games.jgdb
+    python gamerecord.py info games.jgdb
+    python gamerecord.py show games.jgdb 42
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from dataclasses import dataclass
+
+import config
+from board import Board
+
+COLS = config.BOARD_COLS
+NUM_SQUARES = config.BOARD_COLS * config.BOARD_ROWS
+
+MAGIC = b"JGDB"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sHH")  # magic, version, 예약
+GAME_HEADER = struct.Struct("<IBBH")  # 대국 번호, 플래그, 끝난 이유, 수 개수
+SETUP_BYTES = NUM_SQUARES // 2
+INDEX_ENTRY = struct.Struct("<Q")
+
+FLAG_SETUP = 1
+FLAG_HAN_FIRST = 2
+RESULTS = ("draw", "cho", "han", None)  # 플래그 bit2~3 값 -> 결과
+REASONS = ("capture", "no_moves", "repetition", "max_plies", "unknown")
+
+# 기물 종류 <-> 4비트 코드 (1~7 초, +8 = 한)
+_TYPE_CODES = config.PIECE_CODES
+_CODE_TYPES = {code: piece_type for piece_type, code in _TYPE_CODES.items()}
+_INITIAL_FEN = Board().to_fen()
+
+
+@dataclass
+class GameRecord:
+    """대국 하나. moves = [(from_sq, to_sq), ...], setup = 45바이트 배치 (None 이면 config.INITIAL_SETUP)."""
+
+    game_id: int
+    result: str | None
+    reason: str
+    moves: list[tuple[int, int]]
+    setup: bytes | None = None
+    turn: str = "cho"
+
+    @property
+    def fen(self) -> str:
+        """시작 국면 (Board.from_fen 형식)."""
+        if self.setup is None and self.turn == "cho":
+            return _INITIAL_FEN
+        return self.start_board().to_fen()
+
+    def start_board(self, engine: str | None = None) -> Board:
+        """시작 국면의 Board."""
+        return Board(engine=engine, setup=decode_setup(self.setup) if self.setup is not None else None, turn=self.turn)
+
+    def replay(self, engine: str | None = None):
+        """
+        시작부터 수를 두어 가며 (board, from_sq, to_sq) 를 낸다.
+        board 는 그 수를 두기 직전 국면 (한 Board 를 계속 쓰므로 다음으로 넘어가면 바뀐다).
+        """
+        board = self.start_board(engine)
+        squares = board.squares
+        for from_sq, to_sq in self.moves:
+            yield board, from_sq, to_sq
+            board.move_piece(squares[from_sq], to_sq % COLS, to_sq // COLS)
+            if board.game_over is not None:
+                return
+            board.switch_turn()
+
+
+def encode_setup(board: Board) -> bytes:
+    """Board 의 배치 -> 45바이트 (칸마다 4비트)."""
+    out = bytearray(SETUP_BYTES)
+    for sq, p in enumerate(board.squares):
+        if p is None:
+            continue
+        code = _TYPE_CODES[p.piece_type] | (8 if p.side == "han" else 0)
+        out[sq >> 1] |= code << (4 * (sq & 1))
+    return bytes(out)
+
+
+def decode_setup(data: bytes) -> list:
+    """45바이트 배치 -> config.INITIAL_SETUP 형식."""
+    setup = []
+    for sq in range(NUM_SQUARES):
+        code = (data[sq >> 1] >> (4 * (sq & 1))) & 15
+        if code:
+            setup.append(((sq % COLS, sq // COLS), (_CODE_TYPES[code & 7], "han" if code & 8 else "cho")))
+    return setup
+
+
+def encode_game(
+    moves,
+    result: str | None,
+    game_id: int = 0,
+    fen: str | None = None,
+    reason: str = "unknown",
+) -> bytes:
+    """
+    대국 하나를 이진 기록으로.
+    Args:
+        moves: [(from_sq, to_sq), ...]
+        result: "cho" | "han" | "draw" | None (모름)
+        fen: 시작 국면 (None 이거나 초기 배치·초 선이면 배치를 저장하지 않음)
+    """
+    if len(moves) > 0xFFFF:
+        raise ValueError(f"too many moves: {len(moves)}")
+    flags = RESULTS.index(result) << 2
+    setup = b""
+    if fen is not None and fen != _INITIAL_FEN:
+        board = Board.from_fen(fen)
+        if board.current_turn == "han":
+            flags |= FLAG_HAN_FIRST
+        if board.to_fen().split()[0] != _INITIAL_FEN.split()[0]:
+            flags |= FLAG_SETUP
+            setup = encode_setup(board)
+    body = bytearray(2 * len(moves))
+    body[0::2] = bytes(m[0] for m in moves)
+    body[1::2] = bytes(m[1] for m in moves)
+    return GAME_HEADER.pack(game_id, flags, REASONS.index(reason), len(moves)) + setup + bytes(body)
+
+
+def record_size(buf, offset: int) -> int | None:
+    """offset 에서 시작하는 기록의 바이트 수. buf 안에 머리가 다 없으면 None."""
+    if offset + GAME_HEADER.size > len(buf):
+        return None
+    _, flags, _, count = GAME_HEADER.unpack_from(buf, offset)
+    return GAME_HEADER.size + (SETUP_BYTES if flags & FLAG_SETUP else 0) + 2 * count
+
+
+def decode_game(buf, offset: int = 0) -> GameRecord:
+    """buf[offset:] 의 이진 기록 하나를 GameRecord 로."""
+    game_id, flags, reason, count = GAME_HEADER.unpack_from(buf, offset)
+    pos = offset + GAME_HEADER.size
+    setup = None
+    if flags & FLAG_SETUP:
+        setup = bytes(buf[pos:pos + SETUP_BYTES])
+        pos += SETUP_BYTES
+    body = buf[pos:pos + 2 * count]
+    return GameRecord(
+        game_id=game_id,
+        result=RESULTS[(flags >> 2) & 3],
+        reason=REASONS[reason] if reason < len(REASONS) else "unknown",
+        moves=list(zip(body[0::2], body[1::2])),
+        setup=setup,
+        turn="han" if flags & FLAG_HAN_FIRST else "cho",
+    )
+
+
+def index_path(path: str) -> str:
+    return path + ".idx"
+
+
+class GameWriter:
+    """
+    데이터베이스에 대국을 추가. 기록을 먼저 쓰고 색인을 나중에 쓴다 (각각 flush).
+    열 때 색인에 없는 완전한 기록은 색인에 더하고, 잘린 꼬리 기록은 잘라 낸다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, "wb") as f:
+                f.write(FILE_HEADER.pack(MAGIC, VERSION, 0))
+            open(index_path(path), "wb").close()
+        else:
+            _check_header(path)
+            self._recover()
+        self._db = open(path, "ab")
+        self._idx = open(index_path(path), "ab")
+        self._end = os.path.getsize(path)
+
+    def _recover(self) -> None:
+        """색인과 기록 파일을 완전한 대국까지로 맞춘다 (꼬리만 살펴본다)."""
+        idx = index_path(self.path)
+        if not os.path.exists(idx):
+            open(idx, "wb").close()
+        count = os.path.getsize(idx) // INDEX_ENTRY.size
+        added = []
+        with open(idx, "rb") as fi, open(self.path, "rb") as fd, \
+                mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            # 색인 끝에서부터, 파일 안에 다 들어 있는 기록을 가리키는 항목까지 되돌아간다
+            pos = FILE_HEADER.size
+            while count:
+                fi.seek((count - 1) * INDEX_ENTRY.size)
+                (off,) = INDEX_ENTRY.unpack(fi.read(INDEX_ENTRY.size))
+                size = record_size(data, off)
+                if size is not None and off + size <= len(data):
+                    pos = off + size
+                    break
+                count -= 1
+            # 색인 뒤에 붙어 있는 완전한 기록은 색인에 더한다
+            while True:
+                size = record_size(data, pos)
+                if size is None or pos + size > len(data):
+                    break
+                added.append(pos)
+                pos += size
+        with open(self.path, "r+b") as f:
+            f.truncate(pos)
+        with open(idx, "r+b") as f:
+            f.truncate(count * INDEX_ENTRY.size)
+            f.seek(0, os.SEEK_END)
+            f.write(b"".join(INDEX_ENTRY.pack(o) for o in added))
+
+    def write(self, record: dict) -> None:
+        """selfplay.play_game 형식 dict 하나를 추가."""
+        self.write_bytes(encode_game(
+            record["moves"], record["result"], game_id=record["game"],
+            fen=record.get("fen"), reason=record.get("reason", "unknown"),
+        ))
+
+    def write_bytes(self, data: bytes) -> None:
+        self._db.write(data)
+        self._db.flush()
+        self._idx.write(INDEX_ENTRY.pack(self._end))
+        self._idx.flush()
+        self._end += len(data)
+
+    def close(self) -> None:
+        self._db.close()
+        self._idx.close()
+
+    def __enter__(self) -> "GameWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _check_header(path: str) -> None:
+    with open(path, "rb") as f:
+        head = f.read(FILE_HEADER.size)
+    if len(head) < FILE_HEADER.size:
+        raise ValueError(f"not a game database: {path!r}")
+    magic, version, _ = FILE_HEADER.unpack(head)
+    if magic != MAGIC:
+        raise ValueError(f"not a game database: {path!r}")
+    if version != VERSION:
+        raise ValueError(f"unsupported game database version {version}: {path!r}")
+
+
+def build_index(path: str) -> int:
+    """기록 파일을 처음부터 훑어 색인을 다시 만든다. 대국 수를 돌려준다."""
+    _check_header(path)
+    offsets = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        pos = FILE_HEADER.size
+        while True:
+            size = record_size(data, pos)
+            if size is None or pos + size > len(data):
+                break
+            offsets.append(pos)
+            pos += size
+    with open(index_path(path), "wb") as f:
+        f.write(b"".join(INDEX_ENTRY.pack(o) for o in offsets))
+    return len(offsets)
+
+
+class GameDatabase:
+    """mmap 으로 연 대국 데이터베이스 (읽기 전용). 색인이 없으면 만든다."""
+
+    def __init__(self, path: str):
+        self.path = path
+        _check_header(path)
+        if not os.path.exists(index_path(path)):
+            build_index(path)
+        self._db_file = open(path, "rb")
+        self._data = mmap.mmap(self._db_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._idx_file = open(index_path(path), "rb")
+        idx_size = os.path.getsize(index_path(path))
+        self._count = idx_size // INDEX_ENTRY.size
+        # 빈 파일은 mmap 할 수 없다
+        self._index = (
+            mmap.mmap(self._idx_file.fileno(), 0, access=mmap.ACCESS_READ) if idx_size else b""
+        )
+
+    def __len__(self) -> int:
+        return self._count
+
+    def offset(self, n: int) -> int:
+        if n < 0:
+            n += self._count
+        if not 0 <= n < self._count:
+            raise IndexError(f"game index out of range: {n}")
+        return INDEX_ENTRY.unpack_from(self._index, n * INDEX_ENTRY.size)[0]
+
+    def __getitem__(self, n: int) -> GameRecord:
+        """n 번째로 저장된 대국 (대국 번호가 아니라 저장 순서)."""
+        return decode_game(self._data, self.offset(n))
+
+    def __iter__(self):
+        """저장 순서대로 대국을 하나씩 (색인 없이 기록 파일을 차례로 읽는다)."""
+        data = self._data
+        pos = FILE_HEADER.size
+        for _ in range(self._count):
+            yield decode_game(data, pos)
+            pos += record_size(data, pos)
+
+    def result(self, n: int) -> str | None:
+        """n 번째 대국의 결과 (머리만 읽는다)."""
+        return RESULTS[(self._data[self.offset(n) + 4] >> 2) & 3]
+
+    def game_ids(self) -> list[int]:
+        """저장된 대국 번호들 (머리만 읽는다)."""
+        data = self._data
+        unpack = GAME_HEADER.unpack_from
+        return [unpack(data, self.offset(n))[0] for n in range(self._count)]
+
+    def close(self) -> None:
+        self._data.close()
+        self._db_file.close()
+        if self._index:
+            self._index.close()
+        self._idx_file.close()
+
+    def __enter__(self) -> "GameDatabase":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def load_done_ids(path: str) -> set[int]:
+    """데이터베이스에 이미 있는 대국 번호 (잘린 꼬리는 GameWriter 가 열 때 정리)."""
+    if not os.path.exists(path):
+        return set()
+    GameWriter(path).close()  # 색인·꼬리 정리
+    with GameDatabase(path) as db:
+        return set(db.game_ids())
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Janggi binary game database")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("convert", help="selfplay JSON Lines -> 데이터베이스 (이어 붙임)")
+    p.add_argument("src")
+    p.add_argument("dst")
+    p = sub.add_parser("info", help="대국 수, 크기, 결과 통계")
+    p.add_argument("db")
+    p = sub.add_parser("show", help="n 번째 대국 출력")
+    p.add_argument("db")
+    p.add_argument("n", type=int)
+    p = sub.add_parser("reindex", help="색인 다시 만들기")
+    p.add_argument("db")
+    args = parser.parse_args(argv)
+
+    if args.command == "convert":
+        count = 0
+        with open(args.src, encoding="utf-8") as src, GameWriter(args.dst) as writer:
+            for line in src:
+                if line.strip():
+                    writer.write(json.loads(line))
+                    count += 1
+        print(f"converted {count} games -> {args.dst} ({os.path.getsize(args.dst)} bytes)")
+    elif args.command == "reindex":
+        print(f"indexed {build_index(args.db)} games")
+    elif args.command == "info":
+        with GameDatabase(args.db) as db:
+            results = {}
+            plies = 0
+            for game in db:
+                results[game.result] = results.get(game.result, 0) + 1
+                plies += len(game.moves)
+            size = os.path.getsize(args.db)
+            print(f"games {len(db)}  plies {plies}  bytes {size}  bytes/ply {size / max(plies, 1):.2f}")
+            print("results " + "  ".join(f"{k}: {v}" for k, v in sorted(results.items(), key=str)))
+    elif args.command == "show":
+        from perft import square_name
+        with GameDatabase(args.db) as db:
+            game = db[args.n]
+        print(f"game {game.game_id}  result {game.result}  reason {game.reason}  plies {len(game.moves)}")
+        print(f"fen {game.fen}")
+        print(" ".join(
+            square_name(f % COLS, f // COLS) + square_name(t % COLS, t // COLS) for f, t in game.moves
+        ))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+핫패스 계측 (호출 수·벽시계 시간)
+- enable() 이 등록된 함수를 시간 재는 래퍼로 바꿔 끼우고, disable() 이 원래 함수로 되돌린다.
+  꺼져 있을 때는 원래 함수 그대로라 비용이 없다 (main 의 프레임 기록만 enabled 확인 한 번)
+- 기본 대상: movement.get_legal_moves·bitboard.get_legal_moves (기물 종류별 "movegen.<종류>"),
+  Board.is_in_check, Board.get_piece_at. render.py 는 그리기 단계 ("draw.*"), main.py 는 안내 영역을 register() 로 더한다
+- 시간은 포함 시간 (안에서 부른 다른 계측 함수 시간도 들어감)
+- Board / Searcher 는 만들 때 이동 생성 함수를 잡아 두므로, 켜기 전에 만든 Board 는 enable(board) 로 넘겨야 한다
+  (Searcher 는 켠 뒤에 만든 것만 잡힌다)
+- record_frame(ms): main 루프의 화면 갱신 한 번에 걸린 시간
+- dump(path): .csv 면 CSV (항목별 한 줄 + frame 한 줄), 아니면 JSON (항목 + 프레임 시간 전체)
+
+실행 예 (화면 없이 작업을 돌려 계측 결과 출력·저장):
+    python instrument.py --perft 3
+    python instrument.py --search 4 --out profile.json
+    python instrument.py --perft 3 --legal --out profile.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import statistics
+import sys
+import time
+from collections import deque
+
+import bitboard
+import board as board_module
+import movement
+from board import Board
+from piece import TYPE_NAMES
+
+MAX_FRAMES = 100000  # 보관할 최근 프레임 시간 개수
+
+enabled = False
+_stats: dict[str, list[int]] = {}  # 이름 -> [호출 수, 합계 ns, 최대 ns]
+_frames: deque[float] = deque(maxlen=MAX_FRAMES)  # ms
+_targets: list[tuple[object, str, str, bool]] = []  # (소유자, 속성, 이름, 기물 종류별)
+_patches: list[tuple[object, str, object]] = []  # 되돌릴 (소유자, 속성, 원래 값)
+
+
+def register(owner, attr: str, label: str, per_piece: bool = False) -> None:
+    """
+    계측 대상 추가. owner 는 모듈·클래스·dict (dict 면 attr 은 키).
+    per_piece 면 fn(board, piece) 로 보고 이름 뒤에 ".<기물 종류>" 를 붙여 따로 센다.
+    켜져 있는 동안 등록하면 다음 enable() 부터 적용.
+    """
+    if any(o is owner and a == attr for o, a, _, _ in _targets):
+        return
+    _targets.append((owner, attr, label, per_piece))
+
+
+def _get(owner, attr: str):
+    return owner[attr] if isinstance(owner, dict) else getattr(owner, attr)
+
+
+def _set(owner, attr: str, value) -> None:
+    if isinstance(owner, dict):
+        owner[attr] = value
+    else:
+        setattr(owner, attr, value)
+
+
+def _add(label: str, ns: int) -> None:
+    s = _stats.get(label)
+    if s is None:
+        s = _stats[label] = [0, 0, 0]
+    s[0] += 1
+    s[1] += ns
+    if ns > s[2]:
+        s[2] = ns
+
+
+def _timed(label: str, func):
+    clock = time.perf_counter_ns
+
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _add(label, clock() - start)
+
+    wrapper.__wrapped__ = func
+    return wrapper
+
+
+def _timed_per_piece(label: str, func):
+    clock = time.perf_counter_ns
+    labels = tuple(f"{label}.{name}" for name in TYPE_NAMES)
+
+    def wrapper(board, piece):
+        start = clock()
+        try:
+            return func(board, piece)
+        finally:
+            _add(labels[piece.kind], clock() - start)
+
+    wrapper.__wrapped__ = func
+    return wrapper
+
+
+def enable(*boards: Board) -> None:
+    """계측 켜기. boards: 이미 만들어 둔 Board (이동 생성 함수를 다시 잡게 한다)."""
+    global enabled
+    if enabled:
+        return
+    for owner, attr, label, per_piece in _targets:
+        original = _get(owner, attr)
+        _patches.append((owner, attr, original))
+        _set(owner, attr, (_timed_per_piece if per_piece else _timed)(label, original))
+    for b in boards:
+        _patches.append((b, "_generate", b._generate))
+        b._generate = board_module.MOVE_ENGINES[b.engine]
+    enabled = True
+
+
+def disable() -> None:
+    """계측 끄기: 바꿔 낀 함수를 모두 원래대로 (모은 값은 reset() 전까지 남는다)."""
+    global enabled
+    while _patches:
+        owner, attr, original = _patches.pop()
+        _set(owner, attr, original)
+    enabled = False
+
+
+def reset() -> None:
+    """모은 값 지우기."""
+    _stats.clear()
+    _frames.clear()
+
+
+def record_frame(ms: float) -> None:
+    """화면 갱신 한 번에 걸린 시간 (main 루프). 꺼져 있으면 무시."""
+    if enabled:
+        _frames.append(ms)
+
+
+def snapshot() -> list[dict]:
+    """항목별 {name, calls, total_ms, mean_us, max_us}, 합계 시간 큰 순."""
+    rows = [
+        {
+            "name": name,
+            "calls": calls,
+            "total_ms": total / 1e6,
+            "mean_us": total / calls / 1e3,
+            "max_us": longest / 1e3,
+        }
+        for name, (calls, total, longest) in _stats.items()
+    ]
+    rows.sort(key=lambda row: row["total_ms"], reverse=True)
+    return rows
+
+
+def frame_summary() -> dict | None:
+    """프레임 시간 (ms) 요약: count, mean, p50, p95, max. 기록이 없으면 None."""
+    if not _frames:
+        return None
+    frames = sorted(_frames)
+    return {
+        "count": len(frames),
+        "mean": statistics.fmean(frames),
+        "p50": frames[len(frames) // 2],
+        "p95": frames[min(len(frames) - 1, int(len(frames) * 0.95))],
+        "max": frames[-1],
+    }
+
+
+def dump(path: str) -> None:
+    """모은 값을 파일로: 확장자가 .csv 면 CSV, 아니면 JSON."""
+    rows = snapshot()
+    frames = frame_summary()
+    if path.lower().endswith(".csv"):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["name", "calls", "total_ms", "mean_us", "max_us"])
+            for row in rows:
+                writer.writerow([row["name"], row["calls"], f"{row['total_ms']:.3f}", f"{row['mean_us']:.3f}", f"{row['max_us']:.3f}"])
+            if frames is not None:
+                # 프레임도 같은 열 단위로 한 줄 (합계 ms, 평균·최대 us)
+                writer.writerow(["frame", frames["count"], f"{frames['mean'] * frames['count']:.3f}",
+                                 f"{frames['mean'] * 1000:.3f}", f"{frames['max'] * 1000:.3f}"])
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"stats": rows, "frames": frames, "frames_ms": list(_frames)}, f, indent=1)
+
+
+def format_table(rows: list[dict] | None = None, limit: int | None = None) -> list[str]:
+    """표 형태의 줄 목록 (콘솔·오버레이용)."""
+    rows = snapshot() if rows is None else rows
+    lines = [f"{'name':<22} {'calls':>9} {'total ms':>10} {'avg us':>8}"]
+    for row in rows[:limit]:
+        lines.append(f"{row['name']:<22} {row['calls']:>9} {row['total_ms']:>10.1f} {row['mean_us']:>8.2f}")
+    frames = frame_summary()
+    if frames is not None:
+        lines.append(
+            f"frame x{frames['count']}  mean {frames['mean']:.2f}ms  p95 {frames['p95']:.2f}ms  max {frames['max']:.2f}ms"
+        )
+    return lines
+
+
+register(movement, "get_legal_moves", "movegen", per_piece=True)
+register(bitboard, "get_legal_moves", "movegen", per_piece=True)
+for _engine in board_module.MOVE_ENGINES:
+    register(board_module.MOVE_ENGINES, _engine, "movegen", per_piece=True)
+register(Board, "is_in_check", "board.is_in_check")
+register(Board, "get_piece_at", "board.get_piece_at")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Janggi hot-path instrumentation")
+    work = parser.add_mutually_exclusive_group(required=True)
+    work.add_argument("--perft", type=int, metavar="DEPTH", help="perft 를 이 깊이까지")
+    work.add_argument("--search", type=int, metavar="DEPTH", help="탐색을 이 깊이까지")
+    parser.add_argument("--legal", action="store_true", help="perft: 완전 합법 수만")
+    parser.add_argument("--fen", help="시작 국면 (기본: 초기 배치)")
+    parser.add_argument("--engine", choices=sorted(board_module.MOVE_ENGINES), default=None)
+    parser.add_argument("--out", help="결과 파일 (.json | .csv)")
+    args = parser.parse_args(argv)
+
+    import perft
+    import search
+
+    enable()
+    try:
+        board = Board.from_fen(args.fen, engine=args.engine) if args.fen else Board(engine=args.engine)
+        start = time.perf_counter()
+        if args.perft is not None:
+            nodes = perft.perft(board, args.perft, args.legal)
+            print(f"perft {args.perft}  nodes {nodes}")
+        else:
+            result = search.Searcher(board, max_depth=args.search).search()
+            print(f"search {args.search}  nodes {result.nodes}")
+        elapsed = time.perf_counter() - start
+    finally:
+        disable()
+    print(f"time {elapsed:.3f}s (계측 포함)")
+    for line in format_table():
+        print(line)
+    if args.out:
+        dump(args.out)
+        print(f"saved {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
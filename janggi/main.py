@@ -3,109 +3,53 @@
 장기 게임 메인 진입점
 - 초/한 턴 시스템, 포착 시 보드에서 제거
 - 장군(Check) 표시, 왕 잡히면 게임 종료 메시지
-- 무르기(U 키) 히스토리
+- 둘 수 있는 수는 완전 합법 수 (Board.get_strict_moves): 자기 궁을 장군 상태로 두는 수는 둘 수 없고,
+  둘 수 있는 수가 하나도 없는 쪽은 패배 (수를 둔 곳에서 Board.resolve_no_moves 로 game_over 를 정한다)
+- 무르기(U 키) / 다시 두기(R 키) 히스토리
+- 화면: 입력이나 상태 변화가 있을 때만 다시 그린다. 할 일이 없으면 pygame.event.wait 로 잠든다
+- F3: 프레임 시간 / CPU 사용률 표시 켜고 끄기
+- F4: 계측 (instrument: 이동 생성·장군 판정·그리기 단계 호출 수와 시간, 프레임 시간) 켜고 끄기 + 표 패널
+- F5: 모은 계측 값을 현재 폴더에 janggi_profile_<시각>.json / .csv 로 저장
+- B: 정석 책 (config.BOOK_PATH 파일이 있을 때) 의 이 국면 수를 무르기 안내 자리에 표시 켜고 끄기
 """
 
 import os
 import sys
+import time
 import pygame
 import config
+import fonts
+import instrument
+import render
 from board import Board
+from book import OpeningBook
+from perft import format_move
 
+BOOK_MOVES_SHOWN = 3  # 안내 줄에 보여 줄 책 수 개수
 
-def _can_render_hanja(font: pygame.font.Font) -> bool:
-    """폰트가 한자(漢)를 제대로 그릴 수 있는지 확인."""
-    try:
-        s = font.render("漢", True, (0, 0, 0))
-        return s.get_width() >= 8 and s.get_height() >= 8
-    except Exception:
-        return False
 
-
-def _get_hanja_font(size: int) -> pygame.font.Font:
-    """
-    한자/한글을 지원하는 폰트를 찾아 반환.
-    Windows 폰트 경로 → SysFont 이름 순으로 시도.
-    """
-    # 1) Windows Fonts 폴더에서 TTF/TTC 파일 직접 로드 (가장 확실)
-    windir = os.environ.get("WINDIR", "C:\\Windows")
-    font_dir = os.path.join(windir, "Fonts")
-    font_files = [
-        "malgun.ttf",
-        "malgunbd.ttf",
-        "gulim.ttc",
-        "batang.ttc",
-        "batangche.ttc",
-        "gungsuh.ttc",
-        "gungsuhche.ttc",
-        "dotum.ttc",
-        "dotumche.ttc",
-    ]
-    for name in font_files:
-        path = os.path.join(font_dir, name)
-        if os.path.isfile(path):
-            try:
-                f = pygame.font.Font(path, size)
-                if _can_render_hanja(f):
-                    return f
-            except Exception:
-                continue
-
-    # 2) SysFont로 한글/한자 폰트 이름 여러 가지 시도
-    names = [
-        "Malgun Gothic",
-        "malgun",
-        "맑은 고딕",
-        "Gulim",
-        "gulim",
-        "굴림",
-        "Batang",
-        "batang",
-        "바탕",
-        "Gungsuh",
-        "궁서",
-        "Dotum",
-        "돋움",
-        "NanumGothic",
-        "나눔고딕",
-        "AppleGothic",
-    ]
-    for name in names:
-        try:
-            f = pygame.font.SysFont(name, size)
-            if _can_render_hanja(f):
-                return f
-        except Exception:
-            continue
-
-    # 3) 시스템 폰트 목록에서 이름에 gothic/gulim/malgun/batang 포함된 것 시도
-    try:
-        for name in pygame.font.get_fonts():
-            low = name.lower()
-            if "malgun" in low or "gulim" in low or "batang" in low or "gothic" in low or "gungsuh" in low or "dotum" in low:
-                try:
-                    f = pygame.font.SysFont(name, size)
-                    if _can_render_hanja(f):
-                        return f
-                except Exception:
-                    continue
-    except Exception:
-        pass
-
-    # 4) 마지막: 기본 폰트 (한자는 깨질 수 있음)
-    return pygame.font.Font(None, size)
-
-
-def draw_info(screen: pygame.Surface, font: pygame.font.Font, board: Board, info_font: pygame.font.Font | None = None) -> None:
-    """상단에 턴/장군/게임종료 문구 표시."""
+def draw_info(
+    screen: pygame.Surface,
+    font: pygame.font.Font,
+    board: Board,
+    info_font: pygame.font.Font | None = None,
+    book: OpeningBook | None = None,
+) -> None:
+    """상단에 턴/장군/게임종료 문구 표시. book 이 있으면 무르기 안내 대신 이 국면의 책 수 (많이 둔 순)."""
     if info_font is None:
         info_font = font
     y = 8
     if board.game_over is not None:
         winner = "초(楚)" if board.game_over == "cho" else "한(漢)"
-        text = info_font.render(f"{winner} 승리! 왕을 잡았습니다. 게임 종료.", True, config.COLOR_GAME_OVER)
+        loser_side = "han" if board.game_over == "cho" else "cho"
+        if board.get_king(loser_side) is None:
+            message = f"{winner} 승리! 왕을 잡았습니다. 게임 종료."
+        else:
+            loser = "한(漢)" if loser_side == "han" else "초(楚)"
+            message = f"{loser}: 둘 수 있는 수가 없습니다. {winner} 승리! 게임 종료."
+        text = info_font.render(message, True, config.COLOR_GAME_OVER)
         screen.blit(text, (config.MARGIN_LEFT, y))
-        text2 = info_font.render("창을 닫거나 새 게임을 시작하세요.", True, config.COLOR_TEXT)
+        text2 = info_font.render("창을 닫거나 새 게임을 시작하세요.  (U: 무르기)", True, config.COLOR_TEXT)
         screen.blit(text2, (config.MARGIN_LEFT, y + 22))
         return
     turn_label = "초(楚) 차례" if board.current_turn == "cho" else "한(漢) 차례"
@@ -114,8 +58,36 @@ def draw_info(screen: pygame.Surface, font: pygame.font.Font, board: Board, info
     if board.is_in_check(board.current_turn):
         check_text = info_font.render("  [ 장군! ]", True, config.COLOR_CHECK)
         screen.blit(check_text, (config.MARGIN_LEFT + text.get_width() + 8, y))
-    undo_hint = info_font.render("  (U: 무르기)", True, config.COLOR_TEXT)
-    screen.blit(undo_hint, (config.MARGIN_LEFT + 220, y))
+    if book is not None:
+        moves = " ".join(format_move(bm.move) for bm in book.probe(board)[:BOOK_MOVES_SHOWN]) or "없음"
+        hint = info_font.render(f"  정석: {moves}", True, config.COLOR_TEXT)
+    else:
+        hint = info_font.render("  (U: 무르기, R: 다시 두기)", True, config.COLOR_TEXT)
+    screen.blit(hint, (config.MARGIN_LEFT + 220, y))
+
+
+def _play(board: Board, piece, col: int, row: int) -> None:
+    """수를 두고 차례를 넘긴다. 궁을 잡았거나 넘겨받은 쪽이 둘 수 없으면 game_over 가 정해진다."""
+    board.move_piece(piece, col, row)
+    if board.game_over is None:
+        board.switch_turn()
+        board.resolve_no_moves()
+    board.clear_selection()
+
+
+def _wait_events(overlays: list) -> list:
+    """
+    이벤트가 올 때까지 잠들었다가 쌓인 이벤트를 모두 돌려준다.
+    표시 값을 갱신해야 할 때(overlay 켜짐)는 그때까지만, 아니면 config.IDLE_WAIT_MS 까지 기다린다.
+    """
+    timeout = config.IDLE_WAIT_MS
+    for overlay in overlays:
+        if overlay.enabled:
+            timeout = min(timeout, int(overlay.seconds_until_update() * 1000) + 1)
+    event = pygame.event.wait(timeout)
+    events = [] if event.type == pygame.NOEVENT else [event]
+    events.extend(pygame.event.get())
+    return events
 
 
 def main() -> None:
@@ -131,20 +103,64 @@ def main() -> None:
     screen.fill(config.COLOR_BOARD_BG)
 
     font_size = 28
-    font = _get_hanja_font(font_size)
-    info_font = _get_hanja_font(18)
+    font = fonts.get_hanja_font(font_size)
+    info_font = fonts.get_hanja_font(18)
 
     board = Board()
-    clock = pygame.time.Clock()
+    book = OpeningBook(config.BOOK_PATH) if config.BOOK_PATH and os.path.exists(config.BOOK_PATH) else None
+    show_book = False
+    # 안내 문구: y=8 한 줄, 게임 종료 시 y=30 에 한 줄 더
+    renderer = render.BoardRenderer(
+        (screen_w, screen_h), font,
+        info_height=30 + info_font.get_linesize(),
+        draw_info=lambda surface, b: draw_info(surface, font, b, info_font, book if show_book else None),
+    )
+    overlay_h = info_font.get_linesize()
+    overlay = render.PerfOverlay(
+        info_font, pygame.Rect(0, screen_h - overlay_h, screen_w, overlay_h)
+    )
+    # 계측 표: 안내 영역 바로 아래, 상위 12개 + 머리글·프레임 줄
+    stats_top = 30 + info_font.get_linesize()
+    stats_h = min(14 * info_font.get_linesize() + 4, screen_h - overlay_h - stats_top)
+    stats_overlay = render.InstrumentOverlay(info_font, pygame.Rect(8, stats_top, screen_w - 16, stats_h))
+    overlays = [overlay, stats_overlay]
     running = True
 
     while running:
-        for event in pygame.event.get():
+        for event in _wait_events(overlays):
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                renderer.invalidate()
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_u:
+                    board.clear_selection()
                     board.undo()
+                elif event.key == pygame.K_r:
+                    board.clear_selection()
+                    if board.redo():
+                        board.resolve_no_moves()
+                elif event.key == pygame.K_F3:
+                    overlay.toggle()
+                    renderer.redraw_rect(screen, board, overlay.rect)
+                    pygame.display.update(overlay.rect)
+                elif event.key == pygame.K_F4:
+                    stats_overlay.toggle()
+                    if stats_overlay.enabled:
+                        instrument.enable(board)
+                    else:
+                        instrument.disable()
+                        renderer.redraw_rect(screen, board, stats_overlay.rect)
+                        pygame.display.update(stats_overlay.rect)
+                elif event.key == pygame.K_b and book is not None:
+                    show_book = not show_book
+                    renderer.redraw_rect(screen, board, renderer.info_rect)
+                    pygame.display.update(renderer.info_rect)
+                elif event.key == pygame.K_F5:
+                    base = time.strftime("janggi_profile_%Y%m%d_%H%M%S")
+                    for ext in (".json", ".csv"):
+                        instrument.dump(base + ext)
+                    print(f"saved {base}.json, {base}.csv")
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 if board.game_over is not None:
                     continue
@@ -157,20 +173,14 @@ def main() -> None:
                     if selected.side != board.current_turn:
                         board.clear_selection()
                         continue
-                    moves = board.get_legal_moves(selected)
+                    moves = board.get_strict_moves(selected)
                     if intersection and intersection in moves:
-                        board.move_piece(selected, intersection[0], intersection[1])
-                        if board.game_over is None:
-                            board.switch_turn()
-                        board.clear_selection()
+                        _play(board, selected, intersection[0], intersection[1])
                     elif clicked_piece is not None:
                         if clicked_piece.side == board.current_turn:
                             board.select_piece(clicked_piece)
                         elif (clicked_piece.col, clicked_piece.row) in moves:
-                            board.move_piece(selected, clicked_piece.col, clicked_piece.row)
-                            if board.game_over is None:
-                                board.switch_turn()
-                            board.clear_selection()
+                            _play(board, selected, clicked_piece.col, clicked_piece.row)
                         else:
                             board.clear_selection()
                     else:
@@ -181,15 +191,28 @@ def main() -> None:
                     else:
                         board.clear_selection()
 
-        screen.fill(config.COLOR_BOARD_BG)
-        draw_info(screen, font, board, info_font)
-        board.draw(screen, font)
-        pygame.display.flip()
-        clock.tick(60)
-
+        # 바뀐 칸·안내 영역만 다시 그려 그 사각형만 화면에 보낸다
+        start = time.perf_counter()
+        rects = renderer.render(screen, board)
+        for o in overlays:
+            if o.enabled and (o.update() or any(o.rect.colliderect(r) for r in rects)):
+                renderer.redraw_rect(screen, board, o.rect)
+                o.draw(screen)
+                rects.append(o.rect)
+        if rects:
+            pygame.display.update(rects)
+            ms = (time.perf_counter() - start) * 1000
+            overlay.record_frame(ms)
+            instrument.record_frame(ms)
+
+    if book is not None:
+        book.close()
     pygame.quit()
     sys.exit(0)
 
 
+instrument.register(sys.modules[__name__], "draw_info", "draw.info")
+
+
 if __name__ == "__main__":
     main()
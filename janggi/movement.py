@@ -9,7 +9,9 @@
 from __future__ import annotations
 
 import config
-from piece import Piece
+from piece import CODE_SIDE_BIT, CODE_TYPE_MASK, SIDE_NAMES, Piece, PieceType, side_of
+
+COLS = config.BOARD_COLS
 
 # 타입: Board는 순환 참조 방지를 위해 문자열로 (또는 get_piece_at 등만 사용)
 
@@ -76,239 +78,556 @@ def _get_palace_all_neighbors(col: int, row: int, side: str) -> list[tuple[int,
     return list(s)
 
 
+# ---------------------------------------------------------------------------
+# 칸별 이동 테이블 (import 시 한 번 계산)
+# - 칸 번호 sq = row * COLS + col
+# - 각 항목의 목적지는 (pos, sq) 쌍: pos 는 미리 만든 (col, row) 튜플이라 이동 생성 중 새 객체를 만들지 않음
+# ---------------------------------------------------------------------------
+
+ROWS = config.BOARD_ROWS
+NUM_SQUARES = COLS * ROWS
+SQ_POS: list[tuple[int, int]] = [(sq % COLS, sq // COLS) for sq in range(NUM_SQUARES)]
+
+
+def _target(col: int, row: int) -> tuple[tuple[int, int], int]:
+    sq = row * COLS + col
+    return (SQ_POS[sq], sq)
+
+
+def _build_rays() -> list[tuple]:
+    """차·포 광선: 가로(-1, +1), 세로(-1, +1), 지나는 궁성 대각선의 양방향 순."""
+    table = []
+    for sq in range(NUM_SQUARES):
+        c, r = SQ_POS[sq]
+        rays = []
+        for dc, dr in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            ray = []
+            nc, nr = c + dc, r + dr
+            while _is_in_bounds(nc, nr):
+                ray.append(_target(nc, nr))
+                nc, nr = nc + dc, nr + dr
+            if ray:
+                rays.append(tuple(ray))
+        for line in PALACE_DIAGONALS_CHO + PALACE_DIAGONALS_HAN:
+            if (c, r) not in line:
+                continue
+            idx = line.index((c, r))
+            for ray in (line[idx - 1::-1] if idx > 0 else [], line[idx + 1:]):
+                if ray:
+                    rays.append(tuple(_target(nc, nr) for nc, nr in ray))
+        table.append(tuple(rays))
+    return table
+
+
+def _build_horse_moves() -> list[tuple]:
+    """마: (다리 칸, 목적지 pos, 목적지 칸). 보드 밖 다리·목적지는 미리 제외."""
+    steps = [
+        (2, 1), (2, -1), (-2, 1), (-2, -1),
+        (1, 2), (1, -2), (-1, 2), (-1, -2),
+    ]
+    leg = [
+        (1, 0), (1, 0), (-1, 0), (-1, 0),
+        (0, 1), (0, -1), (0, 1), (0, -1),
+    ]
+    table = []
+    for sq in range(NUM_SQUARES):
+        c, r = SQ_POS[sq]
+        out = []
+        for (dc, dr), (lc, lr) in zip(steps, leg):
+            if _is_in_bounds(c + lc, r + lr) and _is_in_bounds(c + dc, r + dr):
+                out.append(((r + lr) * COLS + c + lc,) + _target(c + dc, r + dr))
+        table.append(tuple(out))
+    return table
+
+
+def _build_elephant_moves() -> list[tuple]:
+    """상: (첫 다리 칸, 대각 중간 칸, 목적지 pos, 목적지 칸)."""
+    steps = [
+        (2, 3), (2, -3), (-2, 3), (-2, -3),
+        (3, 2), (3, -2), (-3, 2), (-3, -2),
+    ]
+    leg1 = [
+        (0, 1), (0, -1), (0, 1), (0, -1),
+        (1, 0), (1, 0), (-1, 0), (-1, 0),
+    ]
+    leg2_mid = [
+        (1, 2), (1, -2), (-1, 2), (-1, -2),
+        (1, 1), (1, -1), (-1, 1), (-1, -1),
+    ]
+    table = []
+    for sq in range(NUM_SQUARES):
+        c, r = SQ_POS[sq]
+        out = []
+        for (dc, dr), (l1c, l1r), (l2c, l2r) in zip(steps, leg1, leg2_mid):
+            if not _is_in_bounds(c + dc, r + dr):
+                continue
+            out.append(
+                ((r + l1r) * COLS + c + l1c, (r + l2r) * COLS + c + l2c) + _target(c + dc, r + dr)
+            )
+        table.append(tuple(out))
+    return table
+
+
+def _build_palace_moves() -> dict[str, list[tuple]]:
+    """궁·사: 진영별 궁성 내 직선+대각선 한 칸 이웃."""
+    table = {}
+    for side in ("cho", "han"):
+        per_sq = []
+        for sq in range(NUM_SQUARES):
+            c, r = SQ_POS[sq]
+            cands = _get_palace_orthogonal_neighbors(c, r, side)
+            cands += [p for p in _get_palace_diagonal_neighbors(c, r, side) if p not in cands]
+            per_sq.append(tuple(_target(nc, nr) for nc, nr in cands))
+        table[side] = per_sq
+    return table
+
+
+def _build_soldier_moves() -> dict[str, list[tuple]]:
+    """졸/병: 옆 1, 전진 1, 적 궁성 대각선 위에서는 대각 전진 1."""
+    table = {}
+    for side in ("cho", "han"):
+        # 초: 전진 = row 증가 (아래)
+        dr = 1 if side == "cho" else -1
+        enemy_palace_diags = PALACE_DIAGONALS_HAN if side == "cho" else PALACE_DIAGONALS_CHO
+        diag_points = {pt for line in enemy_palace_diags for pt in line}
+        per_sq = []
+        for sq in range(NUM_SQUARES):
+            c, r = SQ_POS[sq]
+            cands = [(c - 1, r), (c + 1, r), (c, r + dr)]
+            if (c, r) in diag_points:
+                cands += [p for p in ((c + 1, r + dr), (c - 1, r + dr)) if p in diag_points]
+            per_sq.append(tuple(_target(nc, nr) for nc, nr in cands if _is_in_bounds(nc, nr)))
+        table[side] = per_sq
+    return table
+
+
+RAYS = _build_rays()
+HORSE_MOVES = _build_horse_moves()
+ELEPHANT_MOVES = _build_elephant_moves()
+PALACE_MOVES = _build_palace_moves()
+SOLDIER_MOVES = _build_soldier_moves()
+# 진영 번호 (Side) 로 찾는 같은 테이블
+PALACE_MOVES_BY_COLOR = (PALACE_MOVES["cho"], PALACE_MOVES["han"])
+SOLDIER_MOVES_BY_COLOR = (SOLDIER_MOVES["cho"], SOLDIER_MOVES["han"])
+
+# 칸 코드 (board.codes) 해석용
+SIDE_BIT = CODE_SIDE_BIT
+TYPE_MASK = CODE_TYPE_MASK
+GENERAL, GUARD, HORSE, ELEPHANT, CHARIOT, CANNON, SOLDIER = (int(t) for t in PieceType)
+# 칸 코드 -> bool 표 (진영 번호로 고름). 안쪽 루프에서 비트 연산 대신 튜플 인덱스 한 번
+ENEMY_BY_COLOR = tuple(tuple(c != 0 and c & SIDE_BIT != color << 3 for c in range(16)) for color in (0, 1))
+TARGET_BY_COLOR = tuple(tuple(c == 0 or enemy[c] for c in range(16)) for enemy in ENEMY_BY_COLOR)  # 빈 칸 또는 적
+CANNON_PREY_BY_COLOR = tuple(tuple(enemy[c] and c & TYPE_MASK != CANNON for c in range(16)) for enemy in ENEMY_BY_COLOR)
+IS_CANNON = tuple(c & TYPE_MASK == CANNON for c in range(16))
+
+
 def get_legal_moves(board, piece: Piece) -> list[tuple[int, int]]:
     """
     기물의 합법적 이동 목적지 (col, row) 리스트 반환.
     아군이 있는 칸은 제외. 빈 칸 또는 적 기물이 있는 칸만 포함.
+    칸은 board.codes (칸 코드: 종류 | 진영 << 3, 0 = 빈 칸) 로만 본다.
     """
-    get_at = board.get_piece_at
-    side = piece.side
-    enemy = "cho" if side == "han" else "han"
-    c, r = piece.col, piece.row
+    codes = board.codes  # 평탄 배열: index = row * COLS + col
+    sq = piece.row * COLS + piece.col
+    color = piece.color
+    kind = piece.kind
     moves: list[tuple[int, int]] = []
 
-    def add_if_ok(col: int, row: int) -> None:
-        if not _is_in_bounds(col, row):
-            return
-        p = get_at(col, row)
-        if p is None:
-            moves.append((col, row))
-        elif p.side == enemy:
-            moves.append((col, row))  # 포착 가능
-
-    # --- 궁 (將/楚·漢) ---
-    if piece.piece_type == "general":
-        for nc, nr in _get_palace_all_neighbors(c, r, side):
-            add_if_ok(nc, nr)
-        return moves
-
-    # --- 사 (士) ---
-    if piece.piece_type == "guard":
-        for nc, nr in _get_palace_all_neighbors(c, r, side):
-            add_if_ok(nc, nr)
-        return moves
-
     # --- 차 (車): 직선(가로·세로) + 궁성 내 대각선 ---
-    if piece.piece_type == "chariot":
-        # 가로
-        for dc in (-1, 1):
-            nc, nr = c + dc, r
-            while _is_in_bounds(nc, nr):
-                p = get_at(nc, nr)
-                if p is None:
-                    moves.append((nc, nr))
-                    nc += dc
-                else:
-                    if p.side == enemy:
-                        moves.append((nc, nr))
-                    break
-        # 세로
-        for dr in (-1, 1):
-            nc, nr = c, r + dr
-            while _is_in_bounds(nc, nr):
-                p = get_at(nc, nr)
-                if p is None:
-                    moves.append((nc, nr))
-                    nr += dr
+    if kind == CHARIOT:
+        enemy = ENEMY_BY_COLOR[color]
+        for ray in RAYS[sq]:
+            for pos, i in ray:
+                c = codes[i]
+                if not c:
+                    moves.append(pos)
                 else:
-                    if p.side == enemy:
-                        moves.append((nc, nr))
-                    break
-        # 궁성 대각선 (양쪽 궁성 모두)
-        for diag_line in PALACE_DIAGONALS_CHO + PALACE_DIAGONALS_HAN:
-            if (c, r) not in diag_line:
-                continue
-            idx = diag_line.index((c, r))
-            # 한 방향
-            for i in range(idx - 1, -1, -1):
-                nc, nr = diag_line[i]
-                p = get_at(nc, nr)
-                if p is None:
-                    moves.append((nc, nr))
-                else:
-                    if p.side == enemy:
-                        moves.append((nc, nr))
-                    break
-            # 반대 방향
-            for i in range(idx + 1, len(diag_line)):
-                nc, nr = diag_line[i]
-                p = get_at(nc, nr)
-                if p is None:
-                    moves.append((nc, nr))
-                else:
-                    if p.side == enemy:
-                        moves.append((nc, nr))
+                    if enemy[c]:
+                        moves.append(pos)
                     break
         return moves
 
     # --- 포 (包): 정확히 한 기물을 넘은 뒤, 그 방향으로 빈 칸은 모두 착지 가능. 첫 번째 적(비포)은 포착 가능. 포는 넘을 수 없고 포는 잡을 수 없음 ---
-    if piece.piece_type == "cannon":
-        # 가로: 한 기물을 넘은 다음, 그 뒤로 빈 칸은 모두 이동 가능, 적(비포) 한 개는 포착 가능
-        for dc in (-1, 1):
-            pos = c + dc
-            hurdle = None  # 넘은 기물 위치 (정확히 하나여야 함)
-            while _is_in_bounds(pos, r):
-                p = get_at(pos, r)
-                if p is None:
-                    if hurdle is not None:
-                        moves.append((pos, r))
-                    pos += dc
-                    continue
-                if hurdle is None:
-                    if p.piece_type == "cannon":
-                        break
-                    hurdle = (pos, r)
-                    pos += dc
-                    continue
-                if p.side == enemy and p.piece_type != "cannon":
-                    moves.append((pos, r))
-                break
-        # 세로
-        for dr in (-1, 1):
-            pos = r + dr
-            hurdle = None
-            while _is_in_bounds(c, pos):
-                p = get_at(c, pos)
-                if p is None:
-                    if hurdle is not None:
-                        moves.append((c, pos))
-                    pos += dr
+    # 궁성 대각선도 같은 광선 규칙: 끝에서는 (중심, 반대 끝) 광선이라 중심의 비포 기물을 넘어야 하고,
+    # 중심에서는 광선 길이가 1이라 이동할 수 없다.
+    if kind == CANNON:
+        prey = CANNON_PREY_BY_COLOR[color]
+        for ray in RAYS[sq]:
+            jumped = False  # 넘은 기물이 있는지 (정확히 하나여야 함)
+            for pos, i in ray:
+                c = codes[i]
+                if not c:
+                    if jumped:
+                        moves.append(pos)
                     continue
-                if hurdle is None:
-                    if p.piece_type == "cannon":
+                if not jumped:
+                    if IS_CANNON[c]:
                         break
-                    hurdle = (c, pos)
-                    pos += dr
+                    jumped = True
                     continue
-                if p.side == enemy and p.piece_type != "cannon":
-                    moves.append((c, pos))
+                if prey[c]:
+                    moves.append(pos)
                 break
-        # 궁성 대각선: 중심에 정확히 한 기물이 있을 때만 반대쪽 끝으로 이동/포착
-        for diag_line in PALACE_DIAGONALS_CHO + PALACE_DIAGONALS_HAN:
-            if (c, r) not in diag_line:
-                continue
-            idx = diag_line.index((c, r))
-            if len(diag_line) != 3:
-                continue
-            # 포는 궁성 대각선에서 끝에 있을 때만 이동: (끝) - (중심) - (끝). 중심에 정확히 1개 기물
-            center = diag_line[1]
-            pc = get_at(center[0], center[1])
-            if pc is None:
-                continue
-            if pc.piece_type == "cannon":
-                continue
-            # 중심에 비포 기물 1개 있음 -> 반대 끝으로 이동/포착 가능
-            if idx == 0:
-                target_pos = diag_line[2]
-            elif idx == 2:
-                target_pos = diag_line[0]
-            else:
-                continue
-            target = get_at(target_pos[0], target_pos[1])
-            if target is None:
-                moves.append(target_pos)
-            elif target.side == enemy and target.piece_type != "cannon":
-                moves.append(target_pos)
         return moves
 
     # --- 마 (馬): 1직선 + 1대각선, 첫 걸음에 기물 있으면 그 방향 불가 ---
-    if piece.piece_type == "horse":
-        # 8방: (dc,dr) 최종 이동. 다리: (dc//2, dr//2) 또는 한쪽 0
-        steps = [
-            (2, 1), (2, -1), (-2, 1), (-2, -1),
-            (1, 2), (1, -2), (-1, 2), (-1, -2),
-        ]
-        leg = [
-            (1, 0), (1, 0), (-1, 0), (-1, 0),
-            (0, 1), (0, -1), (0, 1), (0, -1),
-        ]
-        for k, ((dc, dr), (lc, lr)) in enumerate(zip(steps, leg)):
-            leg_c, leg_r = c + lc, r + lr
-            if not _is_in_bounds(leg_c, leg_r):
-                continue
-            if get_at(leg_c, leg_r) is not None:
-                continue
-            nc, nr = c + dc, r + dr
-            if not _is_in_bounds(nc, nr):
-                continue
-            p = get_at(nc, nr)
-            if p is not None and p.side == side:
+    if kind == HORSE:
+        target = TARGET_BY_COLOR[color]
+        for leg, pos, i in HORSE_MOVES[sq]:
+            if codes[leg]:
                 continue
-            moves.append((nc, nr))
+            if target[codes[i]]:
+                moves.append(pos)
         return moves
 
     # --- 상 (象): 1직선 + 2대각선(2×3 직사각형 반대 꼭지), 첫 걸음·대각 중간에 기물 있으면 불가 ---
-    if piece.piece_type == "elephant":
-        # 8방: (±2,±3), (±3,±2). 첫 걸음 직선 1, 그 다음 대각 2칸
-        steps = [
-            (2, 3), (2, -3), (-2, 3), (-2, -3),
-            (3, 2), (3, -2), (-3, 2), (-3, -2),
-        ]
-        leg1 = [
-            (0, 1), (0, -1), (0, 1), (0, -1),
-            (1, 0), (1, 0), (-1, 0), (-1, 0),
-        ]
-        leg2_mid = [
-            (1, 2), (1, -2), (-1, 2), (-1, -2),
-            (1, 1), (1, -1), (-1, 1), (-1, -1),
-        ]
-        for (dc, dr), (l1c, l1r), (l2c, l2r) in zip(steps, leg1, leg2_mid):
-            if not _is_in_bounds(c + dc, r + dr):
-                continue
-            if get_at(c + l1c, r + l1r) is not None:
+    if kind == ELEPHANT:
+        target = TARGET_BY_COLOR[color]
+        for leg1, leg2, pos, i in ELEPHANT_MOVES[sq]:
+            if codes[leg1] or codes[leg2]:
                 continue
-            if get_at(c + l2c, r + l2r) is not None:
+            if target[codes[i]]:
+                moves.append(pos)
+        return moves
+
+    # --- 궁 (將/楚·漢), 사 (士): 궁성 내 한 칸 / 졸·병: 옆·전진 한 칸 ---
+    if kind == GENERAL or kind == GUARD:
+        steps = PALACE_MOVES_BY_COLOR[color][sq]
+    elif kind == SOLDIER:
+        steps = SOLDIER_MOVES_BY_COLOR[color][sq]
+    else:
+        return []
+    target = TARGET_BY_COLOR[color]
+    for pos, i in steps:
+        if target[codes[i]]:
+            moves.append(pos)  # 빈 칸 또는 포착 가능
+    return moves
+
+
+# ---------------------------------------------------------------------------
+# 역방향 공격 테이블: 목적지 칸 -> 그 칸으로 올 수 있는 출발 칸 (이동 테이블을 뒤집어 만듦)
+# 차·포 광선은 대칭이라 RAYS 를 그대로 쓴다.
+# ---------------------------------------------------------------------------
+
+
+def _invert_steps(table: list[tuple]) -> list[tuple]:
+    inv: list[list[int]] = [[] for _ in range(NUM_SQUARES)]
+    for origin, steps in enumerate(table):
+        for _, dest in steps:
+            inv[dest].append(origin)
+    return [tuple(origins) for origins in inv]
+
+
+def _build_leaper_attacks() -> tuple[list[tuple], list[tuple]]:
+    """목적지 -> 마 (출발, 다리), 상 (출발, 첫 다리, 대각 중간)."""
+    horse: list[list[tuple]] = [[] for _ in range(NUM_SQUARES)]
+    elephant: list[list[tuple]] = [[] for _ in range(NUM_SQUARES)]
+    for origin in range(NUM_SQUARES):
+        for leg, _, dest in HORSE_MOVES[origin]:
+            horse[dest].append((origin, leg))
+        for leg1, leg2, _, dest in ELEPHANT_MOVES[origin]:
+            elephant[dest].append((origin, leg1, leg2))
+    return [tuple(x) for x in horse], [tuple(x) for x in elephant]
+
+
+HORSE_ATTACKS, ELEPHANT_ATTACKS = _build_leaper_attacks()
+PALACE_ATTACKS = {side: _invert_steps(PALACE_MOVES[side]) for side in ("cho", "han")}
+SOLDIER_ATTACKS = {side: _invert_steps(SOLDIER_MOVES[side]) for side in ("cho", "han")}
+
+
+PALACE_ATTACKS_BY_COLOR = (PALACE_ATTACKS["cho"], PALACE_ATTACKS["han"])
+SOLDIER_ATTACKS_BY_COLOR = (SOLDIER_ATTACKS["cho"], SOLDIER_ATTACKS["han"])
+
+
+def is_square_attacked(board, col: int, row: int, by_side: str) -> bool:
+    """
+    by_side ("cho" | "han" 또는 Side) 의 기물 중 하나라도 (col, row)로 이동(포착)할 수 있는지.
+    get_legal_moves 를 모든 적 기물에 돌리는 것과 같은 결과를, 목적지에서 거꾸로 찾아본다.
+    첫 공격자를 찾으면 바로 True. board.codes 만 본다.
+    """
+    color = side_of(by_side)
+    return _attacked(board.codes, row * COLS + col, color << 3, color)
+
+
+def _attacked(codes, t: int, by: int, color: int) -> bool:
+    """is_square_attacked 본체. by = 공격하는 진영의 칸 코드 진영 비트 (0 | SIDE_BIT)."""
+    c = codes[t]
+    if c and c & SIDE_BIT == by:
+        return False  # 아군이 있는 칸으로는 이동 불가
+    target_is_cannon = c & TYPE_MASK == CANNON
+    chariot = CHARIOT | by
+    cannon = CANNON | by
+
+    # 차: 광선의 첫 기물 / 포: 첫 기물(비포)을 사이에 두고 두 번째 기물
+    for ray in RAYS[t]:
+        screened = False
+        for _, i in ray:
+            c = codes[i]
+            if not c:
                 continue
-            nc, nr = c + dc, r + dr
-            p = get_at(nc, nr)
-            if p is not None and p.side == side:
+            if not screened:
+                if c == chariot:
+                    return True
+                if c & TYPE_MASK == CANNON:
+                    break  # 포는 포를 넘을 수 없음
+                screened = True
                 continue
-            moves.append((nc, nr))
-        return moves
+            if c == cannon and not target_is_cannon:
+                return True
+            break
+
+    # 마: 출발 칸에 적 마가 있고 다리가 비어 있으면
+    horse = HORSE | by
+    for origin, leg in HORSE_ATTACKS[t]:
+        if codes[origin] == horse and not codes[leg]:
+            return True
+
+    # 상: 출발 칸에 적 상이 있고 두 다리가 모두 비어 있으면
+    elephant = ELEPHANT | by
+    for origin, leg1, leg2 in ELEPHANT_ATTACKS[t]:
+        if codes[origin] == elephant and not codes[leg1] and not codes[leg2]:
+            return True
+
+    # 졸/병
+    soldier = SOLDIER | by
+    for origin in SOLDIER_ATTACKS_BY_COLOR[color][t]:
+        if codes[origin] == soldier:
+            return True
+
+    # 궁·사: 궁성 내 한 칸
+    general = GENERAL | by
+    guard = GUARD | by
+    for origin in PALACE_ATTACKS_BY_COLOR[color][t]:
+        c = codes[origin]
+        if c == general or c == guard:
+            return True
+
+    return False
+
+
+# ---------------------------------------------------------------------------
+# 완전 합법 수 (자기 궁을 잡히게 두는 수 제외)
+# - 둘 때마다 두고/무르며 확인하지 않고, 궁 칸에서 "이 칸이 바뀌면 장군 여부가 바뀔 수 있는" 칸 집합을 한 번 구한다
+#   차·포 광선: 궁에서 세 번째 기물까지에 적 차·포(빅장 금지면 궁도)가 있으면 그 구간 전체
+#     (한 수로 광선 위 기물 순서는 하나가 들어오거나 빠지거나 바뀔 뿐이라, 공격자는 처음 세 기물 안에 있어야 한다)
+#   마·상: 궁을 노리는 적 마·상의 자리와 다리 / 졸·사: 궁을 노리는 기물 자리
+# - 출발·도착 칸이 그 집합에 없는 수는 장군 여부를 바꾸지 못한다: 지금 장군이 아니면 합법, 장군이면 불법
+# - 궁 자신의 수: 적 기물이 (막는 기물을 무시하고) 닿을 수 있는 궁성 칸으로 가는 수만 확인한다
+# - 확인이 필요한 수만 칸 배열을 잠시 고쳐 is_square_attacked 로 본다
+# ---------------------------------------------------------------------------
+
+
+def _mask(squares) -> int:
+    out = 0
+    for sq in squares:
+        out |= 1 << sq
+    return out
 
-    # --- 졸/병 ---
-    if piece.piece_type == "soldier":
-        if side == "cho":
-            # 초: 전진 = row 증가 (아래)
-            forward_drs = [1]
-            fwd_diag = [(1, 1), (-1, 1)]
-        else:
-            forward_drs = [-1]
-            fwd_diag = [(1, -1), (-1, -1)]
-        # 직선: 전진 1, 옆 1
-        for dc, dr in [(-1, 0), (1, 0)] + [(0, d) for d in forward_drs]:
-            nc, nr = c + dc, r + dr
-            add_if_ok(nc, nr)
-        # 적 궁성 안에서는 대각선 전진 1칸 (궁성 대각선 위에서만)
-        enemy_palace_diags = PALACE_DIAGONALS_HAN if side == "cho" else PALACE_DIAGONALS_CHO
-        if (c, r) in [pt for line in enemy_palace_diags for pt in line]:
-            for dc, dr in fwd_diag:
-                nc, nr = c + dc, r + dr
-                if not _is_in_bounds(nc, nr):
-                    continue
-                if (nc, nr) not in [pt for line in enemy_palace_diags for pt in line]:
+
+def _build_origin_masks() -> tuple:
+    """
+    칸 -> 그 칸을 (막는 기물을 무시하면) 칠 수 있는 출발 칸 비트 마스크 (Board.bitboards 와 같은 비트 순서).
+    광선은 RAYS 와 나란한 광선별 마스크와 전체 합. 졸·궁성 마스크는 진영 번호로 고른다.
+    """
+    ray_masks = [tuple(_mask(i for _, i in ray) for ray in RAYS[sq]) for sq in range(NUM_SQUARES)]
+    line = [_mask(i for ray in RAYS[sq] for _, i in ray) for sq in range(NUM_SQUARES)]
+    horse = [_mask(origin for origin, _ in HORSE_ATTACKS[sq]) for sq in range(NUM_SQUARES)]
+    elephant = [_mask(origin for origin, _, _ in ELEPHANT_ATTACKS[sq]) for sq in range(NUM_SQUARES)]
+    soldier = tuple([_mask(SOLDIER_ATTACKS[side][sq]) for sq in range(NUM_SQUARES)] for side in SIDE_NAMES)
+    palace = tuple([_mask(PALACE_ATTACKS[side][sq]) for sq in range(NUM_SQUARES)] for side in SIDE_NAMES)
+    return ray_masks, line, horse, elephant, soldier, palace
+
+
+RAY_MASKS, LINE_MASKS, HORSE_ORIGINS, ELEPHANT_ORIGINS, SOLDIER_ORIGINS, PALACE_ORIGINS = _build_origin_masks()
+
+
+def _may_attack(by_type: list[int], enemy_color: int, sq: int) -> bool:
+    """
+    enemy_color 기물 중 sq 를 칠 수 있는 자리에 있는 것이 있는지 (막는 기물 무시, 비트 AND 몇 번).
+    by_type = 그 진영의 종류 번호별 비트보드 (Bitboards.by_type[enemy_color]).
+    """
+    return bool(
+        (by_type[CHARIOT] | by_type[CANNON]) & LINE_MASKS[sq]
+        or by_type[HORSE] & HORSE_ORIGINS[sq]
+        or by_type[ELEPHANT] & ELEPHANT_ORIGINS[sq]
+        or by_type[SOLDIER] & SOLDIER_ORIGINS[enemy_color][sq]
+        or (by_type[GUARD] | by_type[GENERAL]) & PALACE_ORIGINS[enemy_color][sq]
+    )
+
+
+def _generals_facing(codes, king_sq: int) -> bool:
+    """궁 칸에서 세로로 처음 만나는 기물이 (상대) 궁인지 (빅장)."""
+    for ray in RAYS[king_sq]:
+        if ray[0][1] % COLS != king_sq % COLS:
+            continue  # 세로 광선만
+        for _, i in ray:
+            c = codes[i]
+            if c:
+                if c & TYPE_MASK == GENERAL:
+                    return True
+                break
+    return False
+
+
+def _king_exposed(codes, king_sq: int, enemy_color: int) -> bool:
+    if _attacked(codes, king_sq, enemy_color << 3, enemy_color):
+        return True
+    return config.FACING_GENERALS_ILLEGAL and _generals_facing(codes, king_sq)
+
+
+def king_safety(board, side: str) -> tuple[int, bool, set, list[int]] | None:
+    """
+    side ("cho" | "han" 또는 Side) 궁의 (칸, 지금 장군인지, 민감한 칸 (col, row) 집합, 적 종류별 비트보드).
+    궁이 없으면 None. filter_moves 에 넘긴다. 국면이 바뀌면 다시 구해야 한다.
+    적 기물 위치는 board.bitboards 로 보고, 궁과 줄이 맞거나 궁을 노릴 수 있는 자리의 기물만 살펴본다.
+    """
+    color = side_of(side)
+    enemy_color = color ^ 1
+    bb = board.bitboards
+    kings = bb.by_type[color][GENERAL]
+    if not kings:
+        return None
+    king_sq = kings.bit_length() - 1
+    by_type = bb.by_type[enemy_color]
+    codes = board.codes
+    by = enemy_color << 3
+    chariot, cannon, general = CHARIOT | by, CANNON | by, GENERAL | by
+    facing = config.FACING_GENERALS_ILLEGAL
+    sensitive: set[tuple[int, int]] = set()
+
+    sliders = by_type[CHARIOT] | by_type[CANNON]
+    if facing:
+        sliders |= by_type[GENERAL]
+    if sliders & LINE_MASKS[king_sq]:
+        for ray, mask in zip(RAYS[king_sq], RAY_MASKS[king_sq]):
+            if not sliders & mask:
+                continue
+            count = 0
+            danger = False
+            for n, (_, i) in enumerate(ray):
+                c = codes[i]
+                if not c:
                     continue
-                add_if_ok(nc, nr)
+                if c == chariot or c == cannon or (facing and c == general):
+                    danger = True
+                count += 1
+                if count == 3:
+                    break
+            if danger:
+                sensitive.update([pos for pos, _ in ray[: n + 1]])
+
+    if by_type[HORSE] & HORSE_ORIGINS[king_sq]:
+        horse = HORSE | by
+        for origin, leg in HORSE_ATTACKS[king_sq]:
+            if codes[origin] == horse:
+                sensitive.add(SQ_POS[origin])
+                sensitive.add(SQ_POS[leg])
+    if by_type[ELEPHANT] & ELEPHANT_ORIGINS[king_sq]:
+        elephant = ELEPHANT | by
+        for origin, leg1, leg2 in ELEPHANT_ATTACKS[king_sq]:
+            if codes[origin] == elephant:
+                sensitive.add(SQ_POS[origin])
+                sensitive.add(SQ_POS[leg1])
+                sensitive.add(SQ_POS[leg2])
+    # 졸·사·궁은 막을 수 없어 잡아야만 풀린다
+    soldier, guard = SOLDIER | by, GUARD | by
+    for origin in SOLDIER_ATTACKS_BY_COLOR[enemy_color][king_sq]:
+        if codes[origin] == soldier:
+            sensitive.add(SQ_POS[origin])
+    for origin in PALACE_ATTACKS_BY_COLOR[enemy_color][king_sq]:
+        c = codes[origin]
+        if c == guard or c == general:
+            sensitive.add(SQ_POS[origin])
+
+    in_check = (facing or _may_attack(by_type, enemy_color, king_sq)) and _king_exposed(codes, king_sq, enemy_color)
+    return king_sq, in_check, sensitive, by_type
+
+
+def filter_moves(board, piece: Piece, moves: list[tuple[int, int]], safety) -> list[tuple[int, int]]:
+    """
+    의사 합법 목적지 moves 중 자기 궁을 장군 상태로 두지 않는 것만. safety = king_safety(board, piece.side).
+    상대 궁을 잡는 수는 (게임이 끝나므로) 항상 남긴다. 걸러낼 것이 없으면 moves 를 그대로 돌려준다.
+    확인이 필요한 수는 board.codes 를 잠시 고쳐 본다.
+    """
+    if safety is None or not moves:
         return moves
+    king_sq, in_check, sensitive, by_type = safety
+    codes = board.codes
+    from_sq = piece.row * COLS + piece.col
+    code = codes[from_sq]
+    enemy_color = piece.color ^ 1
+
+    if code & TYPE_MASK == GENERAL:
+        facing = config.FACING_GENERALS_ILLEGAL
+        out = []
+        for pos in moves:
+            to_sq = pos[1] * COLS + pos[0]
+            captured = codes[to_sq]
+            if captured & TYPE_MASK == GENERAL or not (facing or _may_attack(by_type, enemy_color, to_sq)):
+                out.append(pos)  # 상대 궁 포착, 또는 어떤 적 기물도 닿을 수 없는 칸
+                continue
+            codes[from_sq] = 0
+            codes[to_sq] = code
+            exposed = _king_exposed(codes, to_sq, enemy_color)
+            codes[to_sq] = captured
+            codes[from_sq] = code
+            if not exposed:
+                out.append(pos)
+        return out
+
+    touches_from = (piece.col, piece.row) in sensitive
+    if not touches_from and sensitive.isdisjoint(moves):
+        if not in_check:
+            return moves  # 흔한 경우: 궁과 관계없는 기물
+        # 장군을 풀 수 없는 기물: 상대 궁을 잡는 수만
+        return [pos for pos in moves if codes[pos[1] * COLS + pos[0]] & TYPE_MASK == GENERAL]
+    out = []
+    for pos in moves:
+        to_sq = pos[1] * COLS + pos[0]
+        captured = codes[to_sq]
+        if captured & TYPE_MASK == GENERAL:
+            out.append(pos)
+            continue
+        if not touches_from and pos not in sensitive:
+            if not in_check:
+                out.append(pos)
+            continue
+        codes[from_sq] = 0
+        codes[to_sq] = code
+        exposed = _king_exposed(codes, king_sq, enemy_color)
+        codes[to_sq] = captured
+        codes[from_sq] = code
+        if not exposed:
+            out.append(pos)
+    return out
+
 
-    return []
+def get_strict_moves(board, side: str, generate=get_legal_moves) -> list[tuple[Piece, tuple[int, int]]]:
+    """side 의 모든 완전 합법 수 [(기물, (col, row)), ...]. generate = 의사 합법 이동 생성 함수."""
+    color = side_of(side)
+    safety = king_safety(board, color)
+    if safety is None:
+        return [(p, dest) for p in board.pieces if p.color == color for dest in generate(board, p)]
+    in_check, sensitive = safety[1], safety[2]
+    if not in_check and not sensitive:
+        # 장군도 아니고 궁을 노리는 줄도 없음: 궁의 수만 확인
+        return [
+            (p, dest)
+            for p in board.pieces
+            if p.color == color
+            for dest in (
+                generate(board, p) if p.kind != GENERAL else filter_moves(board, p, generate(board, p), safety)
+            )
+        ]
+    out = []
+    for p in board.pieces:
+        if p.color != color:
+            continue
+        moves = generate(board, p)
+        # filter_moves 의 빠른 경로를 호출 없이 먼저 본다
+        if in_check or p.kind == GENERAL or (
+            sensitive and ((p.col, p.row) in sensitive or not sensitive.isdisjoint(moves))
+        ):
+            moves = filter_moves(board, p, moves, safety)
+        out += [(p, dest) for dest in moves]
+    return out
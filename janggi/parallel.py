@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+병렬 탐색 (Lazy SMP, 프로세스 풀)
+- 워커 프로세스들이 같은 루트 국면(Board.to_fen)을 동시에 탐색하고,
+  공유 메모리 위의 트랜스포지션 테이블 하나를 함께 읽고 쓴다 (tt.TranspositionTable 의 XOR 검증으로 락 없음)
+- 보조 워커는 시작 깊이를 어긋나게 하고 히스토리 점수를 워커마다 다른 난수로 채워 다른 가지부터 탐색한다
+- 주 워커(0번)가 끝나면 stop 이벤트로 나머지를 멈추고, 가장 깊이까지 끝낸 결과를 고른다
+- 풀과 공유 메모리는 ParallelSearcher 가 만들어 여러 번 재사용한다 (close() 로 정리)
+
+벤치마크 (워커 수별 깊이 도달 시간, 노드/초, 1워커 대비 속도 향상):
+    python parallel.py --bench --workers 1,2,4,8 --depth 6
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import time
+from multiprocessing import shared_memory
+
+import config
+from board import MOVE_ENGINES, Board
+from perft import format_move
+from search import Searcher, SearchResult
+from tt import TranspositionTable
+
+# 워커 프로세스 전역 (풀 initializer 에서 설정)
+_shm = None
+_tt: TranspositionTable | None = None
+_stop = None
+
+
+def _init_worker(shm_name: str, stop_event) -> None:
+    global _shm, _tt, _stop
+    # 워커는 부모의 resource_tracker 를 같이 쓰므로 등록을 따로 지우지 않는다 (해제는 부모가 unlink)
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    _tt = TranspositionTable(buffer=_shm.buf)
+    _stop = stop_event
+
+
+def _search_task(
+    fen: str,
+    engine: str,
+    worker_id: int,
+    age: int,
+    max_depth: int,
+    time_limit: float | None,
+    node_limit: int | None,
+) -> dict:
+    board = Board.from_fen(fen, engine=engine)
+    _tt.age = age
+    _tt.reset_stats()
+    helper = worker_id > 0
+    searcher = Searcher(
+        board,
+        max_depth=max_depth,
+        time_limit=time_limit,
+        node_limit=node_limit,
+        tt=_tt,
+        stop_event=_stop,
+        start_depth=1 + (worker_id % 2) if helper else 1,
+        history_seed=worker_id if helper else None,
+    )
+    result = searcher.search()
+    if not helper:
+        _stop.set()  # 주 워커가 끝나면 모두 멈춘다
+    return {
+        "worker": worker_id,
+        "move": result.move,
+        "score": result.score,
+        "depth": result.depth,
+        "pv": result.pv,
+        "nodes": searcher.nodes,
+        "tt_probes": _tt.probes,
+        "tt_hits": _tt.hits,
+    }
+
+
+class ParallelSearcher:
+    """프로세스 풀 + 공유 트랜스포지션 테이블로 Lazy SMP 탐색."""
+
+    def __init__(self, workers: int | None = None, hash_mb: float = config.TT_SIZE_MB):
+        self.workers = workers or os.cpu_count() or 1
+        self._shm = shared_memory.SharedMemory(create=True, size=TranspositionTable.bytes_for(hash_mb))
+        self.tt = TranspositionTable(buffer=self._shm.buf)
+        self._stop = mp.Event()
+        self._pool = mp.Pool(self.workers, initializer=_init_worker, initargs=(self._shm.name, self._stop))
+        self.last_stats: list[dict] = []
+
+    def clear_hash(self) -> None:
+        self.tt.clear()
+
+    def search(
+        self,
+        board: Board,
+        max_depth: int = 64,
+        time_limit: float | None = None,
+        node_limit: int | None = None,
+    ) -> SearchResult:
+        """
+        board 의 현재 국면을 모든 워커로 탐색. board 자체는 바꾸지 않는다.
+        node_limit 는 워커마다 적용된다. 결과의 nodes 는 전체 워커 합계.
+        """
+        start = time.perf_counter()
+        fen = board.to_fen()
+        self._stop.clear()
+        self.tt.new_search()
+        pending = [
+            self._pool.apply_async(
+                _search_task,
+                (fen, board.engine, wid, self.tt.age, max_depth, time_limit, node_limit),
+            )
+            for wid in range(self.workers)
+        ]
+        stats = [p.get() for p in pending]
+        self.last_stats = stats
+        best = max(stats, key=lambda s: (s["move"] is not None, s["depth"], s["worker"] == 0))
+        return SearchResult(
+            move=best["move"],
+            score=best["score"],
+            depth=best["depth"],
+            pv=best["pv"],
+            nodes=sum(s["nodes"] for s in stats),
+            elapsed=time.perf_counter() - start,
+        )
+
+    def close(self) -> None:
+        self._pool.close()
+        self._pool.join()
+        self.tt = None
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> "ParallelSearcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def benchmark(worker_counts: list[int], depth: int, fen: str | None, engine: str, hash_mb: float) -> None:
+    """워커 수별로 같은 국면을 depth 까지 탐색해 시간·노드/초·속도 향상을 출력."""
+    base_time = None
+    for n in worker_counts:
+        with ParallelSearcher(workers=n, hash_mb=hash_mb) as ps:
+            board = Board.from_fen(fen, engine=engine) if fen else Board(engine=engine)
+            result = ps.search(board, max_depth=depth)
+            elapsed = result.elapsed
+            if base_time is None:
+                base_time = elapsed
+            nps = result.nodes / max(elapsed, 1e-9)
+            print(
+                f"workers {n:3d}  depth {result.depth:2d}  time {elapsed:8.2f}s  nodes {result.nodes:10d}  "
+                f"nps {nps:9.0f}  speedup {base_time / max(elapsed, 1e-9):5.2f}x  "
+                f"best {format_move(result.move) if result.move else '-'}"
+            )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Janggi Lazy SMP parallel search")
+    parser.add_argument("--fen", help="시작 국면 (기본: 초기 배치)")
+    parser.add_argument("--workers", default=str(os.cpu_count() or 1), help="워커 수, --bench 에서는 쉼표 목록")
+    parser.add_argument("--depth", type=int, default=64)
+    parser.add_argument("--time", type=float, default=None, help="제한 시간 (초)")
+    parser.add_argument("--hash", type=float, default=config.TT_SIZE_MB, help="공유 TT 크기 (MB)")
+    parser.add_argument("--engine", choices=sorted(MOVE_ENGINES), default=config.MOVE_ENGINE)
+    parser.add_argument("--bench", action="store_true", help="워커 수별 깊이 도달 시간 비교")
+    args = parser.parse_args(argv)
+    counts = [int(x) for x in args.workers.split(",")]
+
+    if args.bench:
+        depth = args.depth if args.depth != 64 else 6
+        benchmark(counts, depth, args.fen, args.engine, args.hash)
+        return 0
+
+    if args.time is None and args.depth == 64:
+        args.time = 5.0
+    board = Board.from_fen(args.fen, engine=args.engine) if args.fen else Board(engine=args.engine)
+    with ParallelSearcher(workers=counts[0], hash_mb=args.hash) as ps:
+        result = ps.search(board, max_depth=args.depth, time_limit=args.time)
+        for s in ps.last_stats:
+            rate = s["tt_hits"] / s["tt_probes"] if s["tt_probes"] else 0.0
+            print(f"worker {s['worker']:3d}  depth {s['depth']:2d}  nodes {s['nodes']:9d}  tt hit {rate:.1%}")
+    if result.move is None:
+        print("bestmove (none)")
+        return 1
+    nps = result.nodes / max(result.elapsed, 1e-9)
+    pv = " ".join(format_move(m) for m in result.pv)
+    print(f"bestmove {format_move(result.move)}  score {result.score}  depth {result.depth}  nps {nps:.0f}  pv {pv}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
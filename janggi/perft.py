@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+장기 perft (이동 생성 검증·벤치마크)
+- perft(board, depth): depth 수 앞까지의 말단 국면 수
+- divide(board, depth): 첫 수별 말단 국면 수
+- Board.move_piece / Board.undo 로 두고 무른다 (화면 없이 실행)
+- 궁을 잡아 게임이 끝난 국면은 더 전개하지 않는다
+- --legal: 자기 궁을 장군 상태로 두는 수를 뺀 완전 합법 수만 센다 (movement.get_strict_moves)
+
+실행 예:
+    python perft.py --depth 3
+    python perft.py --depth 2 --divide --fen "<FEN>"
+    python perft.py --depth 3 --engine bitboard --verify
+    python perft.py --depth 3 --legal --verify
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+import config
+import movement
+from board import MOVE_ENGINES, Board
+from piece import side_of
+
+# 초기 배치(config.INITIAL_SETUP, 초 선)에서의 기준 값: depth -> 말단 국면 수
+KNOWN_COUNTS = {
+    1: 31,
+    2: 961,
+    3: 30415,
+    4: 962896,
+    5: 31480184,
+}
+# --legal (완전 합법 수) 기준 값
+KNOWN_LEGAL_COUNTS = {
+    1: 31,
+    2: 961,
+    3: 30415,
+    4: 962184,
+    5: 31422348,
+}
+
+
+def square_name(col: int, row: int) -> str:
+    """(col, row) -> "a0" ~ "i9" (열 문자 + 행 숫자)."""
+    return "abcdefghi"[col] + str(row)
+
+
+def format_move(move: tuple[tuple[int, int], tuple[int, int]]) -> str:
+    (fc, fr), (tc, tr) = move
+    return square_name(fc, fr) + square_name(tc, tr)
+
+
+def parse_square(text: str) -> tuple[int, int]:
+    """"a0" ~ "i9" -> (col, row). square_name 의 반대. 형식이 틀리면 ValueError."""
+    if len(text) != 2 or text[0] not in "abcdefghi" or text[1] not in "0123456789":
+        raise ValueError(f"bad square: {text!r}")
+    return "abcdefghi".index(text[0]), int(text[1])
+
+
+def parse_move(text: str) -> tuple[tuple[int, int], tuple[int, int]]:
+    """"c3c4" -> ((col, row), (col, row)). format_move 의 반대. 형식이 틀리면 ValueError."""
+    if len(text) != 4:
+        raise ValueError(f"bad move: {text!r}")
+    return parse_square(text[:2]), parse_square(text[2:])
+
+
+def apply_moves(board: Board, text: str) -> str | None:
+    """
+    "c3c4 c6c5 ..." 를 board 에 차례로 둔다. 둘 차례 진영의 기물이 엄격 합법수로만 움직인다.
+    잘못된 수 (형식·상대 기물·불법·게임이 끝난 뒤의 수) 를 만나면 그 수를 돌려주고 멈춘다. 다 두면 None.
+    """
+    for move in text.split():
+        if board.game_over is not None:
+            return move
+        try:
+            (fc, fr), (tc, tr) = parse_move(move)
+        except ValueError:
+            return move
+        piece = board.get_piece_at(fc, fr)
+        if piece is None or piece.side != board.current_turn or (tc, tr) not in board.get_strict_moves(piece):
+            return move
+        board.move_piece(piece, tc, tr)
+        if board.game_over is None:
+            board.switch_turn()
+    return None
+
+
+def generate_moves(board: Board, legal: bool = False) -> list[tuple]:
+    """
+    둘 차례 진영의 (기물, (col, row)) 목록. 캐시를 거치지 않고 엔진을 직접 호출.
+    legal 이면 자기 궁을 장군 상태로 두는 수는 뺀다.
+    """
+    generate = MOVE_ENGINES[board.engine]
+    side = board.current_turn
+    if legal:
+        return movement.get_strict_moves(board, side, generate)
+    color = side_of(side)
+    return [(p, dest) for p in board.pieces if p.color == color for dest in generate(board, p)]
+
+
+def perft(board: Board, depth: int, legal: bool = False) -> int:
+    """depth 수 뒤의 말단 국면 수."""
+    if depth == 0:
+        return 1
+    if board.game_over is not None:
+        return 0
+    moves = generate_moves(board, legal)
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for piece, (col, row) in moves:
+        board.move_piece(piece, col, row)
+        if board.game_over is None:
+            board.switch_turn()
+        nodes += perft(board, depth - 1, legal)
+        board.undo()
+    return nodes
+
+
+def divide(board: Board, depth: int, legal: bool = False) -> list[tuple[tuple, int]]:
+    """첫 수별 말단 국면 수: [((from, to), nodes), ...]."""
+    out = []
+    for piece, (col, row) in generate_moves(board, legal):
+        move = ((piece.col, piece.row), (col, row))
+        board.move_piece(piece, col, row)
+        if board.game_over is None:
+            board.switch_turn()
+        out.append((move, perft(board, depth - 1, legal)))
+        board.undo()
+    return out
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Janggi perft / move generation benchmark")
+    parser.add_argument("--depth", type=int, default=3, help="최대 깊이 (기본 3)")
+    parser.add_argument("--fen", help="시작 국면 (기본: config.INITIAL_SETUP, 초 선)")
+    parser.add_argument("--engine", choices=sorted(MOVE_ENGINES), default=config.MOVE_ENGINE)
+    parser.add_argument("--divide", action="store_true", help="최대 깊이에서 첫 수별 개수 출력")
+    parser.add_argument("--legal", action="store_true", help="완전 합법 수만 세기 (자기 궁 장군 제외)")
+    parser.add_argument("--verify", action="store_true", help="KNOWN_COUNTS 와 비교 (초기 배치만)")
+    args = parser.parse_args(argv)
+
+    board = Board.from_fen(args.fen, engine=args.engine) if args.fen else Board(engine=args.engine)
+    print(f"engine={args.engine}  legal={args.legal}  fen={board.to_fen()}")
+    known = KNOWN_LEGAL_COUNTS if args.legal else KNOWN_COUNTS
+
+    if args.divide:
+        start = time.perf_counter()
+        results = divide(board, args.depth, args.legal)
+        elapsed = time.perf_counter() - start
+        for move, nodes in sorted(results, key=lambda item: format_move(item[0])):
+            print(f"{format_move(move)}: {nodes}")
+        total = sum(nodes for _, nodes in results)
+        print(f"moves {len(results)}  nodes {total}  time {elapsed:.3f}s  nps {total / max(elapsed, 1e-9):.0f}")
+        return 0
+
+    failed = False
+    for depth in range(1, args.depth + 1):
+        start = time.perf_counter()
+        nodes = perft(board, depth, args.legal)
+        elapsed = time.perf_counter() - start
+        line = f"depth {depth}  nodes {nodes:>10}  time {elapsed:8.3f}s  nps {nodes / max(elapsed, 1e-9):10.0f}"
+        if args.verify and not args.fen and depth in known:
+            ok = nodes == known[depth]
+            failed |= not ok
+            line += "  OK" if ok else f"  MISMATCH (expected {known[depth]})"
+        print(line)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
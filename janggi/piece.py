@@ -1,36 +1,104 @@
 # -*- coding: utf-8 -*-
 """
 장기 기물 클래스 (Piece)
-- 한자(한자) 또는 간단한 이미지로 렌더링
-- 선택 상태 표시
+- 종류·진영·위치·선택 상태
+- 종류·진영은 작은 정수 (PieceType, Side). piece_type / side 문자열은 읽기 전용 호환 속성
+- 칸 코드: kind | color << 3 (초 1~7, 한 9~15, 0 = 빈 칸). Board.codes 와 gamerecord 배치 코드가 같은 값
+- pygame 없이 import 가능 (그리기는 render.py)
 """
 
-import pygame
+from enum import IntEnum
+
 import config
 
 
+class PieceType(IntEnum):
+    """기물 종류 번호 (config.PIECE_CODES 와 같은 값)."""
+
+    GENERAL = 1
+    GUARD = 2
+    HORSE = 3
+    ELEPHANT = 4
+    CHARIOT = 5
+    CANNON = 6
+    SOLDIER = 7
+
+
+class Side(IntEnum):
+    """진영 번호. 초가 선."""
+
+    CHO = 0
+    HAN = 1
+
+
+# 번호 -> 문자열 (호환 속성용). TYPE_NAMES[0] 은 빈 칸
+TYPE_NAMES = (None,) + tuple(t.name.lower() for t in PieceType)
+SIDE_NAMES = ("cho", "han")
+
+# 문자열 또는 번호 -> 번호
+_TYPES = {name: PieceType(code) for name, code in config.PIECE_CODES.items()}
+_TYPES.update({t: t for t in PieceType})
+_SIDES = {"cho": Side.CHO, "han": Side.HAN, Side.CHO: Side.CHO, Side.HAN: Side.HAN}
+
+CODE_SIDE_BIT = 8  # 칸 코드에서 한(漢) 표시 비트
+CODE_TYPE_MASK = 7
+
+
+def piece_type_of(value) -> PieceType:
+    """"chariot" 같은 문자열이나 번호 -> PieceType."""
+    return _TYPES[value]
+
+
+def side_of(value) -> Side:
+    """"cho" / "han" 또는 번호 -> Side."""
+    return _SIDES[value]
+
+
+def piece_code(kind: int, color: int) -> int:
+    """(종류, 진영) -> 칸 코드."""
+    return kind | color << 3
+
+
 class Piece:
     """단일 기물을 표현하는 클래스."""
 
-    def __init__(self, piece_type: str, side: str, col: int, row: int):
+    __slots__ = ("kind", "color", "col", "row", "selected")
+
+    def __init__(self, piece_type, side, col: int, row: int):
         """
         Args:
-            piece_type: general, guard, horse, elephant, chariot, cannon, soldier
-            side: "han" | "cho"
+            piece_type: PieceType 또는 general, guard, horse, elephant, chariot, cannon, soldier
+            side: Side 또는 "han" | "cho"
             col, row: 보드 좌표 (0~8, 0~9)
         """
-        self.piece_type = piece_type
-        self.side = side
+        # 열거형 멤버가 아닌 int 로 저장: 비교가 정수 비교 그대로 (이동 생성 안쪽 루프에서 읽는다)
+        self.kind: int = int(_TYPES[piece_type])
+        self.color: int = int(_SIDES[side])
         self.col = col
         self.row = row
         self.selected = False
 
+    @property
+    def piece_type(self) -> str:
+        """종류 문자열 (호환용, 예: "chariot")."""
+        return TYPE_NAMES[self.kind]
+
+    @property
+    def side(self) -> str:
+        """진영 문자열 (호환용, "cho" | "han")."""
+        return SIDE_NAMES[self.color]
+
+    @property
+    def code(self) -> int:
+        """칸 코드 (kind | color << 3)."""
+        return self.kind | self.color << 3
+
     def get_hanja(self) -> str:
         """기물 종류와 진영에 맞는 한자 반환."""
-        if self.piece_type == "general":
-            return config.PIECE_HANJA["general_han" if self.side == "han" else "general_cho"]
-        if self.piece_type == "soldier":
-            return config.PIECE_HANJA["soldier_han" if self.side == "han" else "soldier_cho"]
+        if self.kind == PieceType.GENERAL:
+            return config.PIECE_HANJA["general_han" if self.color == Side.HAN else "general_cho"]
+        if self.kind == PieceType.SOLDIER:
+            return config.PIECE_HANJA["soldier_han" if self.color == Side.HAN else "soldier_cho"]
         return config.PIECE_HANJA.get(self.piece_type, "?")
 
     def get_screen_pos(self) -> tuple:
@@ -50,32 +118,3 @@ class Piece:
         """보드 상 위치 변경 (이동 시 사용)."""
         self.col = col
         self.row = row
-
-    def draw(self, surface: pygame.Surface, font: pygame.font.Font) -> None:
-        """
-        기물을 화면에 그린다.
-        - 원형 배경 + 한자 텍스트
-        - 선택 시 테두리(노란 원) 표시
-        """
-        cx, cy = self.get_screen_pos()
-        r = config.PIECE_RADIUS
-
-        if self.side == "han":
-            bg_color = config.COLOR_HAN_PIECE_BG
-            text_color = config.COLOR_HAN_PIECE_TEXT
-        else:
-            bg_color = config.COLOR_CHO_PIECE_BG
-            text_color = config.COLOR_CHO_PIECE_TEXT
-
-        # 배경 원
-        pygame.draw.circle(surface, bg_color, (cx, cy), r)
-        pygame.draw.circle(surface, config.COLOR_LINE, (cx, cy), r, 2)
-
-        # 한자 텍스트
-        text = font.render(self.get_hanja(), True, text_color)
-        rect = text.get_rect(center=(cx, cy))
-        surface.blit(text, rect)
-
-        # 선택 효과: 노란 테두리
-        if self.selected:
-            pygame.draw.circle(surface, config.COLOR_SELECTED, (cx, cy), r + 3, 3)
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+국면 색인: 국면 키(Board.zobrist_key) -> 그 국면이 나온 (대국, 수 번호, 다음 수)
+- 대국 데이터베이스(gamerecord.py)를 한 번 훑으며 GameRecord.replay 로 두어 가며 항목을 만든다
+- 항목 = 16바이트 (키 u64 | 대국 u32 | 수 번호 u16 | 다음 수 u16), 키 순으로 정렬해 파일에 저장
+    대국 = 데이터베이스 저장 순서 (GameDatabase[n]), 다음 수 = from_sq << 8 | to_sq (마지막 국면은 NO_MOVE)
+- 만들기: 메모리에 run_size 개씩 모아 정렬한 조각 파일을 쓰고, heapq.merge 로 합친다 (외부 정렬)
+- 찾기: mmap 한 파일에서 이분 탐색. 그 국면에 이른 대국들과 다음 수별 대국 수·결과 통계
+
+실행 예:
+    python posindex.py build games.jgdb games.jgpi
+    python posindex.py query games.jgdb games.jgpi --moves "c3c4 c6c5"
+    python posindex.py query games.jgdb games.jgpi --fen "<FEN>"
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+
+import config
+from board import Board
+from gamerecord import GameDatabase
+
+COLS = config.BOARD_COLS
+
+MAGIC = b"JGPI"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sHHQ")  # magic, 버전, 예약, 항목 수
+ENTRY = struct.Struct("<QIHH")  # 키, 대국, 수 번호, 다음 수
+NO_MOVE = 0xFFFF
+
+_KEY = struct.Struct("<Q")
+
+
+def _write_run(entries: list[tuple], tmpdir: str) -> str:
+    entries.sort()
+    fd, path = tempfile.mkstemp(suffix=".run", dir=tmpdir)
+    with os.fdopen(fd, "wb") as f:
+        pack = ENTRY.pack
+        f.write(b"".join(pack(*e) for e in entries))
+    return path
+
+
+def _read_run(path: str, chunk: int = 1 << 16):
+    """조각 파일의 항목을 순서대로 (chunk 개씩 읽는다)."""
+    size = ENTRY.size
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(size * chunk)
+            if not data:
+                return
+            yield from ENTRY.iter_unpack(data)
+
+
+def iter_entries(db: GameDatabase, engine: str | None = None):
+    """데이터베이스의 모든 대국을 두어 가며 (키, 대국, 수 번호, 다음 수) 를 낸다."""
+    for n, game in enumerate(db):
+        board = None
+        ply = 0
+        for board, from_sq, to_sq in game.replay(engine):
+            yield board.zobrist_key, n, ply, from_sq << 8 | to_sq
+            ply += 1
+        if board is None:
+            board = game.start_board(engine)  # 수가 없는 대국
+        # 마지막 수를 둔 뒤의 국면 (replay 가 끝나면 board 는 그 국면)
+        yield board.zobrist_key, n, ply, NO_MOVE
+
+
+def build_index(
+    db_path: str,
+    out_path: str,
+    run_size: int = 1 << 20,
+    tmpdir: str | None = None,
+    engine: str | None = None,
+) -> int:
+    """
+    db_path 의 대국으로 out_path 국면 색인을 만든다. 항목 수를 돌려준다.
+    메모리에는 run_size 개 항목만 두고, 넘치면 정렬한 조각 파일로 내보낸 뒤 마지막에 합친다.
+    """
+    tmpdir = tmpdir or os.path.dirname(os.path.abspath(out_path))
+    runs = []
+    buf = []
+    try:
+        with GameDatabase(db_path) as db:
+            for entry in iter_entries(db, engine):
+                buf.append(entry)
+                if len(buf) >= run_size:
+                    runs.append(_write_run(buf, tmpdir))
+                    buf = []
+        buf.sort()
+        merged = heapq.merge(*(_read_run(p) for p in runs), buf)
+        count = 0
+        pack = ENTRY.pack
+        with open(out_path, "wb") as f:
+            f.write(FILE_HEADER.pack(MAGIC, VERSION, 0, 0))
+            batch = []
+            for entry in merged:
+                batch.append(pack(*entry))
+                if len(batch) >= 1 << 16:
+                    f.write(b"".join(batch))
+                    count += len(batch)
+                    batch = []
+            f.write(b"".join(batch))
+            count += len(batch)
+            f.seek(0)
+            f.write(FILE_HEADER.pack(MAGIC, VERSION, 0, count))
+    finally:
+        for p in runs:
+            os.remove(p)
+    return count
+
+
+class PositionIndex:
+    """mmap 으로 연 국면 색인 (읽기 전용)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count = FILE_HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"not a position index: {path!r}")
+        if version != VERSION:
+            raise ValueError(f"unsupported position index version {version}: {path!r}")
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _key_at(self, i: int) -> int:
+        return _KEY.unpack_from(self._data, FILE_HEADER.size + i * ENTRY.size)[0]
+
+    def _lower_bound(self, key: int) -> int:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def lookup(self, key: int, limit: int | None = None) -> list[tuple[int, int, int]]:
+        """key 국면의 [(대국, 수 번호, 다음 수), ...] (대국·수 번호 순). limit 개까지."""
+        data = self._data
+        unpack = ENTRY.unpack_from
+        i = self._lower_bound(key)
+        out = []
+        while i < self._count and (limit is None or len(out) < limit):
+            k, game, ply, move = unpack(data, FILE_HEADER.size + i * ENTRY.size)
+            if k != key:
+                break
+            out.append((game, ply, move))
+            i += 1
+        return out
+
+    def next_move_stats(self, key: int, db: GameDatabase | None = None) -> dict[int, dict]:
+        """
+        key 국면에서 둔 다음 수별 통계: {다음 수: {"games": n, "cho": 승, "han": 승, "draw": 무}}.
+        db 가 없으면 "games" 만 센다. 다음 수 NO_MOVE = 그 국면에서 끝난 대국.
+        """
+        stats: dict[int, dict] = {}
+        for game, _, move in self.lookup(key):
+            s = stats.setdefault(move, {"games": 0, "cho": 0, "han": 0, "draw": 0})
+            s["games"] += 1
+            if db is not None:
+                result = db.result(game)
+                if result is not None:
+                    s[result] += 1
+        return stats
+
+    def close(self) -> None:
+        self._data.close()
+        self._file.close()
+
+    def __enter__(self) -> "PositionIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def format_next_move(move: int) -> str:
+    if move == NO_MOVE:
+        return "(end)"
+    from perft import square_name
+    f, t = move >> 8, move & 0xFF
+    return square_name(f % COLS, f // COLS) + square_name(t % COLS, t // COLS)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Janggi position index over a game database")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("build", help="데이터베이스로 국면 색인 만들기")
+    p.add_argument("db")
+    p.add_argument("out")
+    p.add_argument("--run-size", type=int, default=1 << 20, help="정렬 조각 하나의 항목 수")
+    p = sub.add_parser("query", help="국면에 이른 대국과 다음 수 통계")
+    p.add_argument("db")
+    p.add_argument("index")
+    p.add_argument("--fen", help="국면 (기본: 초기 배치)")
+    p.add_argument("--moves", default="", help="시작 국면에서 둘 수들, 예: \"c3c4 c6c5\"")
+    p.add_argument("--games", type=int, default=10, help="출력할 대국 수")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        count = build_index(args.db, args.out, run_size=args.run_size)
+        elapsed = time.perf_counter() - start
+        print(f"indexed {count} positions -> {args.out}  time {elapsed:.1f}s")
+        return 0
+
+    from perft import apply_moves
+
+    board = Board.from_fen(args.fen) if args.fen else Board()
+    bad = apply_moves(board, args.moves)
+    if bad is not None:
+        print(f"illegal move: {bad}")
+        return 1
+
+    with GameDatabase(args.db) as db, PositionIndex(args.index) as index:
+        start = time.perf_counter()
+        hits = index.lookup(board.zobrist_key)
+        stats = index.next_move_stats(board.zobrist_key, db)
+        elapsed = time.perf_counter() - start
+        print(f"positions {len(hits)}  games {len({g for g, _, _ in hits})}  time {elapsed * 1000:.2f}ms")
+        for move, s in sorted(stats.items(), key=lambda item: -item[1]["games"]):
+            print(f"{format_next_move(move):6s}  games {s['games']:6d}  cho {s['cho']:6d}  han {s['han']:6d}  draw {s['draw']:6d}")
+        for game, ply, _ in hits[: args.games]:
+            print(f"game {db[game].game_id}  ply {ply}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,408 @@
+# -*- coding: utf-8 -*-
+"""
+장기 화면 그리기 (pygame)
+- 장기판 (선, 궁성 대각선), 선택한 기물의 이동 가능 표시, 기물(원 + 한자)
+- Board / Piece / movement 는 pygame 없이 쓸 수 있도록 그리기 코드는 이 모듈에만 둔다
+- PieceSprites: (종류, 진영, 선택) 별 완성된 기물 그림을 SRCALPHA Surface 로 미리 만들어 두고 blit 한 번으로 그린다
+  (폰트 크기나 config.PIECE_RADIUS 가 바뀌면 다시 만든다)
+- PerfOverlay: 프레임 시간·초당 화면 갱신 수·프로세스 CPU 사용률 표시 (확인용, main 에서 F3 으로 켜고 끔)
+- InstrumentOverlay: instrument 계측 표 (항목별 호출 수·시간) 반투명 패널 (main 에서 F4 로 켜고 끔).
+  그리기 단계 (draw.snapshot / draw.rect / draw.piece) 는 이 모듈 끝에서 instrument.register 로 등록
+- BoardRenderer: 변하지 않는 판(배경·선·궁성 X)은 Surface 에 한 번만 그려 두고,
+  바뀐 칸(기물·선택·이동 표시)과 상단 안내 영역만 다시 그려 그 사각형들을 돌려준다 (display.update 용)
+"""
+
+from __future__ import annotations
+
+import time
+
+import pygame
+import config
+import instrument
+from board import Board
+from piece import SIDE_NAMES, TYPE_NAMES, Piece
+
+
+def draw_piece(surface: pygame.Surface, piece: Piece, font: pygame.font.Font) -> None:
+    """
+    기물을 화면에 그린다.
+    - 원형 배경 + 한자 텍스트
+    - 선택 시 테두리(노란 원) 표시
+    """
+    _draw_piece_at(surface, piece, font, piece.get_screen_pos())
+
+
+def _draw_piece_at(surface: pygame.Surface, piece: Piece, font: pygame.font.Font, center: tuple[int, int]) -> None:
+    """기물을 center 를 중심으로 그린다 (화면 또는 PieceSprites 그림)."""
+    cx, cy = center
+    r = config.PIECE_RADIUS
+
+    if piece.side == "han":
+        bg_color = config.COLOR_HAN_PIECE_BG
+        text_color = config.COLOR_HAN_PIECE_TEXT
+    else:
+        bg_color = config.COLOR_CHO_PIECE_BG
+        text_color = config.COLOR_CHO_PIECE_TEXT
+
+    # 배경 원
+    pygame.draw.circle(surface, bg_color, (cx, cy), r)
+    pygame.draw.circle(surface, config.COLOR_LINE, (cx, cy), r, 2)
+
+    # 한자 텍스트
+    text = font.render(piece.get_hanja(), True, text_color)
+    rect = text.get_rect(center=(cx, cy))
+    surface.blit(text, rect)
+
+    # 선택 효과: 노란 테두리
+    if piece.selected:
+        pygame.draw.circle(surface, config.COLOR_SELECTED, (cx, cy), r + 3, 3)
+
+
+class PieceSprites:
+    """
+    기물 그림 캐시. 키 = (piece_type, side, selected), 값 = 원·한자·선택 테두리까지 그린 SRCALPHA Surface.
+    그림의 중심이 기물 중심이다 (draw_piece 와 같은 픽셀).
+    """
+
+    def __init__(self, font: pygame.font.Font):
+        self.font = font
+        self._sprites: dict[tuple[str, str, bool], pygame.Surface] = {}
+        self._signature = None
+        self.rebuild()
+
+    def _current_signature(self) -> tuple:
+        return (id(self.font), self.font.get_height(), config.PIECE_RADIUS)
+
+    def set_font(self, font: pygame.font.Font) -> None:
+        self.font = font
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """모든 (종류, 진영, 선택) 그림을 새로 만든다."""
+        self._sprites = {
+            (piece_type, side, selected): self._render(Piece(piece_type, side, 0, 0), selected)
+            for piece_type in TYPE_NAMES[1:]
+            for side in SIDE_NAMES
+            for selected in (False, True)
+        }
+        self._signature = self._current_signature()
+
+    def _render(self, piece: Piece, selected: bool) -> pygame.Surface:
+        r = config.PIECE_RADIUS
+        c = r + 3  # 선택 테두리 반지름까지
+        sprite = pygame.Surface((2 * c + 1, 2 * c + 1), pygame.SRCALPHA)
+        piece.selected = selected
+        _draw_piece_at(sprite, piece, self.font, (c, c))
+        # 화면 형식으로 바꿔 두면 blit 이 빠르다 (화면이 아직 없으면 그대로)
+        return sprite.convert_alpha() if pygame.display.get_surface() is not None else sprite
+
+    def is_stale(self) -> bool:
+        """폰트나 config.PIECE_RADIUS 가 그림을 만든 뒤 바뀌었는지."""
+        return self._signature != self._current_signature()
+
+    def get(self, piece_type: str, side: str, selected: bool) -> pygame.Surface:
+        if self.is_stale():
+            self.rebuild()
+        return self._sprites[(piece_type, side, selected)]
+
+    def blit(self, surface: pygame.Surface, piece: Piece) -> None:
+        """기물 하나를 blit 한 번으로 그린다."""
+        sprite = self.get(piece.piece_type, piece.side, piece.selected)
+        c = sprite.get_width() // 2
+        cx, cy = piece.get_screen_pos()
+        surface.blit(sprite, (cx - c, cy - c))
+
+
+def draw_board(
+    surface: pygame.Surface,
+    board: Board,
+    font: pygame.font.Font,
+    sprites: PieceSprites | None = None,
+) -> None:
+    """보드(선, 궁성), 이동 가능 표시, 기물을 그린다. sprites 가 있으면 기물은 캐시된 그림으로."""
+    _draw_board_lines(surface)
+    _draw_palace_diagonals(surface)
+    _draw_legal_moves(surface, board)
+    for p in board.pieces:
+        if sprites is not None:
+            sprites.blit(surface, p)
+        else:
+            draw_piece(surface, p, font)
+
+
+def _draw_board_lines(surface: pygame.Surface) -> None:
+    """9x10 교차선 그리기."""
+    x0 = config.MARGIN_LEFT
+    y0 = config.MARGIN_TOP
+    # 세로선 9개
+    for c in range(config.BOARD_COLS):
+        x = x0 + c * config.CELL_WIDTH
+        pygame.draw.line(
+            surface, config.COLOR_LINE,
+            (x, y0),
+            (x, y0 + (config.BOARD_ROWS - 1) * config.CELL_HEIGHT),
+            2
+        )
+    # 가로선 10개
+    for r in range(config.BOARD_ROWS):
+        y = y0 + r * config.CELL_HEIGHT
+        pygame.draw.line(
+            surface, config.COLOR_LINE,
+            (x0, y),
+            (x0 + (config.BOARD_COLS - 1) * config.CELL_WIDTH, y),
+            2
+        )
+
+
+def _draw_palace_diagonals(surface: pygame.Surface) -> None:
+    """양쪽 궁성(3x3) 안의 대각선 X 그리기."""
+    x0 = config.MARGIN_LEFT
+    y0 = config.MARGIN_TOP
+    # 궁성 왼쪽 위 ~ 오른쪽 아래, 오른쪽 위 ~ 왼쪽 아래
+    for base_row, row_count in [(0, 3), (7, 3)]:
+        # 궁성: col 3,4,5 / row base_row ~ base_row+2
+        left = x0 + 3 * config.CELL_WIDTH
+        right = x0 + 5 * config.CELL_WIDTH
+        top = y0 + base_row * config.CELL_HEIGHT
+        bottom = y0 + (base_row + 2) * config.CELL_HEIGHT
+        pygame.draw.line(surface, config.COLOR_PALACE_DIAG, (left, top), (right, bottom), 1)
+        pygame.draw.line(surface, config.COLOR_PALACE_DIAG, (right, top), (left, bottom), 1)
+
+
+def _draw_legal_moves(surface: pygame.Surface, board: Board) -> None:
+    """선택된 기물의 이동 가능 위치를 점/원으로 표시."""
+    selected = next((p for p in board.pieces if p.selected), None)
+    if selected is None:
+        return
+    moves = board.get_strict_moves(selected)
+    for col, row in moves:
+        x, y = board.intersection_to_screen(col, row)
+        target = board.get_piece_at(col, row)
+        if target is not None:
+            pygame.draw.circle(surface, config.COLOR_CAPTURE_HINT, (x, y), config.MOVE_DOT_RADIUS + 2, 2)
+        else:
+            pygame.draw.circle(surface, config.COLOR_MOVE_DOT, (x, y), config.MOVE_DOT_RADIUS)
+
+
+class BoardRenderer:
+    """
+    정적인 판 Surface 캐시 + 바뀐 사각형(dirty rect)만 다시 그리기.
+    render() 가 돌려준 사각형만 pygame.display.update(rects) 로 화면에 보내면 된다.
+    """
+
+    def __init__(self, size: tuple[int, int], font: pygame.font.Font, info_height: int = 0, draw_info=None):
+        """
+        Args:
+            size: 화면 크기 (가로, 세로)
+            font: 기물 한자 폰트
+            info_height: 화면 위쪽 안내 영역 높이 (픽셀). 안내 내용이 바뀌면 이 영역을 다시 그린다
+            draw_info: draw_info(surface, board) - 안내 영역 그리기 함수 (None 이면 없음)
+        """
+        self.size = size
+        self.font = font
+        self.sprites = PieceSprites(font)
+        self.draw_info = draw_info
+        self.info_rect = pygame.Rect(0, 0, size[0], info_height)
+        self.background = pygame.Surface(size).convert() if pygame.display.get_surface() else pygame.Surface(size)
+        self.background.fill(config.COLOR_BOARD_BG)
+        _draw_board_lines(self.background)
+        _draw_palace_diagonals(self.background)
+        self._pieces: dict[int, tuple] = {}  # 칸 -> (종류, 진영, 선택)
+        self._hints: dict[int, bool] = {}  # 칸 -> 포착 표시 여부 (False = 빈 칸 점)
+        self._info_key = None
+        self._full = True
+
+    def invalidate(self) -> None:
+        """다음 render() 에서 전체를 다시 그린다 (창 노출, 폰트 변경 등)."""
+        self._full = True
+
+    def set_font(self, font: pygame.font.Font) -> None:
+        """기물 폰트를 바꾸고 기물 그림을 다시 만든 뒤 전체를 다시 그린다."""
+        self.font = font
+        self.sprites.set_font(font)
+        self.invalidate()
+
+    @staticmethod
+    def square_rect(sq: int) -> pygame.Rect:
+        """칸 하나의 기물·선택 테두리·이동 표시가 들어가는 사각형."""
+        r = config.PIECE_RADIUS + 4
+        x = config.MARGIN_LEFT + (sq % config.BOARD_COLS) * config.CELL_WIDTH
+        y = config.MARGIN_TOP + (sq // config.BOARD_COLS) * config.CELL_HEIGHT
+        return pygame.Rect(x - r, y - r, 2 * r + 1, 2 * r + 1)
+
+    def _snapshot(self, board: Board) -> tuple[dict, dict, tuple]:
+        cols = config.BOARD_COLS
+        pieces = {p.row * cols + p.col: (p.piece_type, p.side, p.selected) for p in board.pieces}
+        hints = {}
+        selected = next((p for p in board.pieces if p.selected), None)
+        if selected is not None:
+            for col, row in board.get_strict_moves(selected):
+                hints[row * cols + col] = board.get_piece_at(col, row) is not None
+        in_check = board.game_over is None and board.is_in_check(board.current_turn)
+        return pieces, hints, (board.game_over, board.current_turn, in_check)
+
+    def render(self, surface: pygame.Surface, board: Board) -> list[pygame.Rect]:
+        """
+        지난 render() 이후 바뀐 부분만 surface 에 다시 그리고, 그린 사각형 목록을 돌려준다.
+        바뀐 것이 없으면 빈 목록.
+        """
+        pieces, hints, info_key = self._snapshot(board)
+        if self.sprites.is_stale():
+            self.sprites.rebuild()
+            self._full = True  # 기물 크기가 바뀌면 칸 사각형도 바뀐다
+        if self._full:
+            rects = [surface.get_rect()]
+        else:
+            changed = {sq for sq in pieces.keys() | self._pieces.keys() if pieces.get(sq) != self._pieces.get(sq)}
+            changed |= {sq for sq in hints.keys() | self._hints.keys() if hints.get(sq) != self._hints.get(sq)}
+            rects = [self.square_rect(sq) for sq in sorted(changed)]
+            if info_key != self._info_key and self.info_rect.height:
+                rects.append(self.info_rect.copy())
+        self._pieces, self._hints, self._info_key = pieces, hints, info_key
+        self._full = False
+        for rect in rects:
+            self.redraw_rect(surface, board, rect)
+        return rects
+
+    def redraw_rect(self, surface: pygame.Surface, board: Board, rect: pygame.Rect) -> None:
+        """rect 안만 다시 그린다: 판 → 안내 → 이동 표시 → 기물 (전체 그리기와 같은 순서)."""
+        old_clip = surface.get_clip()
+        surface.set_clip(rect)
+        surface.blit(self.background, rect, rect)
+        if self.draw_info is not None and rect.colliderect(self.info_rect):
+            self.draw_info(surface, board)
+        cols = config.BOARD_COLS
+        for sq, capture in self._hints.items():
+            if not rect.colliderect(self.square_rect(sq)):
+                continue
+            x, y = board.intersection_to_screen(sq % cols, sq // cols)
+            if capture:
+                pygame.draw.circle(surface, config.COLOR_CAPTURE_HINT, (x, y), config.MOVE_DOT_RADIUS + 2, 2)
+            else:
+                pygame.draw.circle(surface, config.COLOR_MOVE_DOT, (x, y), config.MOVE_DOT_RADIUS)
+        for p in board.pieces:
+            if rect.colliderect(self.square_rect(p.row * cols + p.col)):
+                self.sprites.blit(surface, p)
+        surface.set_clip(old_clip)
+
+
+class PerfOverlay:
+    """
+    화면 아래쪽 한 줄: 마지막 프레임 그리기 시간, 초당 화면 갱신 수, 프로세스 CPU 사용률.
+    값은 interval 초마다 모아서 바꾼다 (켜져 있는 동안 그만큼 자주 깨어나야 한다).
+    """
+
+    def __init__(self, font: pygame.font.Font, rect: pygame.Rect, interval: float = 1.0):
+        self.font = font
+        self.rect = rect
+        self.interval = interval
+        self.enabled = False
+        self.text = ""
+        self._frames = 0
+        self._frame_ms = 0.0
+        self._reset_window()
+
+    def _reset_window(self) -> None:
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self._frames = 0
+
+    def toggle(self) -> None:
+        self.enabled = not self.enabled
+        self.text = ""
+        self._reset_window()
+
+    def record_frame(self, ms: float) -> None:
+        """화면을 한 번 갱신할 때마다: 그리기에 걸린 시간 (ms)."""
+        self._frames += 1
+        self._frame_ms = ms
+
+    def seconds_until_update(self) -> float:
+        return max(0.0, self._wall0 + self.interval - time.perf_counter())
+
+    def update(self) -> bool:
+        """interval 이 지났으면 표시 값을 새로 계산. 글이 바뀌었으면 True."""
+        now = time.perf_counter()
+        wall = now - self._wall0
+        if wall < self.interval:
+            return False
+        cpu = (time.process_time() - self._cpu0) / wall * 100
+        text = f"frame {self._frame_ms:5.2f}ms  updates {self._frames / wall:4.1f}/s  cpu {cpu:4.1f}%"
+        self._reset_window()
+        changed = text != self.text
+        self.text = text
+        return changed
+
+    def draw(self, surface: pygame.Surface) -> None:
+        if self.text:
+            surface.blit(self.font.render(self.text, True, config.COLOR_TEXT), self.rect.topleft)
+
+
+class InstrumentOverlay:
+    """
+    instrument 계측 표를 반투명 패널로 (합계 시간 큰 순 상위 limit 개 + 프레임 시간 요약).
+    PerfOverlay 와 같이 interval 초마다 글을 새로 만든다. 숫자 열은 오른쪽 맞춤 (비례 폭 폰트).
+    """
+
+    HEADER = ("name", "calls", "total ms", "avg us")
+    COLUMN_RIGHTS = (0, 0.62, 0.82, 1.0)  # 숫자 열 오른쪽 끝 (패널 폭 비율). 첫 열은 왼쪽 맞춤
+
+    def __init__(self, font: pygame.font.Font, rect: pygame.Rect, interval: float = 1.0):
+        self.font = font
+        self.rect = rect
+        self.interval = interval
+        self.enabled = False
+        self.rows: list[tuple[str, ...]] = []
+        self.footer = ""
+        self.limit = max(1, rect.height // font.get_linesize() - 2)  # 머리글·프레임 줄 자리 빼고
+        self._next = 0.0
+        self._panel = pygame.Surface(rect.size, pygame.SRCALPHA)
+        self._panel.fill((255, 255, 255, 200))
+
+    def toggle(self) -> None:
+        self.enabled = not self.enabled
+        self.rows = []
+        self.footer = ""
+        self._next = 0.0
+
+    def seconds_until_update(self) -> float:
+        return max(0.0, self._next - time.perf_counter())
+
+    def update(self) -> bool:
+        """interval 이 지났으면 표를 새로 만든다. 글이 바뀌었으면 True."""
+        now = time.perf_counter()
+        if now < self._next:
+            return False
+        self._next = now + self.interval
+        rows = [
+            (row["name"], str(row["calls"]), f"{row['total_ms']:.1f}", f"{row['mean_us']:.2f}")
+            for row in instrument.snapshot()[: self.limit]
+        ]
+        frames = instrument.frame_summary()
+        footer = "" if frames is None else (
+            f"frame x{frames['count']}  mean {frames['mean']:.2f}ms  p95 {frames['p95']:.2f}ms  max {frames['max']:.2f}ms"
+        )
+        changed = (rows, footer) != (self.rows, self.footer)
+        self.rows, self.footer = rows, footer
+        return changed
+
+    def draw(self, surface: pygame.Surface) -> None:
+        surface.blit(self._panel, self.rect.topleft)
+        left = self.rect.x + 4
+        width = self.rect.width - 8
+        y = self.rect.y + 2
+        for cells in [self.HEADER] + self.rows:
+            for i, cell in enumerate(cells):
+                text = self.font.render(cell, True, config.COLOR_TEXT)
+                x = left if i == 0 else left + int(width * self.COLUMN_RIGHTS[i]) - text.get_width()
+                surface.blit(text, (x, y))
+            y += self.font.get_linesize()
+        if self.footer:
+            surface.blit(self.font.render(self.footer, True, config.COLOR_TEXT), (left, y))
+
+
+instrument.register(BoardRenderer, "_snapshot", "draw.snapshot")
+instrument.register(BoardRenderer, "redraw_rect", "draw.rect")
+instrument.register(PieceSprites, "blit", "draw.piece")
+instrument.register(PerfOverlay, "draw", "draw.overlay")
+instrument.register(InstrumentOverlay, "draw", "draw.overlay")
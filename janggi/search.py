@@ -0,0 +1,485 @@
+# -*- coding: utf-8 -*-
+"""
+장기 탐색 엔진 (컴퓨터 상대 / 분석용)
+- negamax + alpha-beta, 반복 심화 (iterative deepening)
+- 정지 탐색 (quiescence): 포착 수만 계속 전개
+- 트랜스포지션 테이블 (tt.TranspositionTable, Board.zobrist_key) 로 같은 국면 재탐색 생략
+- 수 정렬: TT / 이전 반복의 최선 수 → MVV-LVA 포착 → 킬러 수 → 히스토리 점수
+- 노드 수 / 시간 제한. 제한에 걸리면 마지막으로 끝난 반복의 결과를 돌려준다
+- Board.move_piece / Board.undo 로 두고 무른다. 궁을 잡는 수가 있으면 그 국면은 승리로 본다
+- 수 생성은 완전 합법 수 (movement.get_strict_moves): 자기 궁을 내주는 수는 전개하지 않고, 둘 수가 없으면 패배
+- 정석 책 (book.OpeningBook) 을 주면 책에 있는 국면은 탐색하지 않고 책 수를 바로 돌려준다 (SearchResult.book)
+- 엔드게임 테이블 (tablebase.Tablebases) 을 주면 기물이 적은 국면은 더 전개하지 않고 테이블의 승패무·수로 점수를 정한다
+
+수 표현: 내부는 정수 (from_sq << 7 | to_sq), 결과는 ((from_col, from_row), (to_col, to_row))
+
+실행 예:
+    python search.py --time 5
+    python search.py --depth 4 --fen "<FEN>"
+    python search.py --time 5 --book games.jgbk
+    python search.py --depth 8 --tb tb --fen "<FEN>"
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+
+import config
+import movement
+from board import MOVE_ENGINES, Board
+from book import OpeningBook
+from perft import format_move
+from tablebase import DRAW, WIN, Tablebases
+from piece import CODE_TYPE_MASK, TYPE_NAMES, PieceType, piece_code, piece_type_of, side_of
+from tt import BOUND_EXACT, BOUND_LOWER, BOUND_UPPER, TranspositionTable
+
+COLS = config.BOARD_COLS
+NUM_SQUARES = config.BOARD_COLS * config.BOARD_ROWS
+
+# 기물 가치 (궁은 잡히면 게임이 끝나므로 평가에서 제외)
+PIECE_VALUES = {
+    "general": 0,
+    "guard": 300,
+    "horse": 500,
+    "elephant": 300,
+    "chariot": 1300,
+    "cannon": 700,
+    "soldier": 200,
+}
+MATE_SCORE = 100000
+INF = MATE_SCORE + 1
+MATE_BOUND = MATE_SCORE - 1000  # 이 값보다 크면 몇 수 안의 궁 포착
+
+# MVV-LVA 정렬용: 궁 포착은 항상 맨 앞
+_VICTIM_ORDER = dict(PIECE_VALUES, general=100000)
+# 같은 값을 칸 코드의 종류 번호 (code & 7) 로 찾는 튜플
+_VALUE_BY_KIND = tuple(PIECE_VALUES.get(name, 0) for name in TYPE_NAMES)
+_VICTIM_BY_KIND = tuple(_VICTIM_ORDER.get(name, 0) for name in TYPE_NAMES)
+_GENERAL = int(PieceType.GENERAL)
+
+_CHECK_EVERY = 1024  # 노드 몇 개마다 시간·노드 제한 확인
+
+
+def encode_move(from_sq: int, to_sq: int) -> int:
+    return from_sq << 7 | to_sq
+
+
+def decode_move(move: int) -> tuple[tuple[int, int], tuple[int, int]]:
+    """정수 수 -> ((from_col, from_row), (to_col, to_row))."""
+    from_sq, to_sq = move >> 7, move & 127
+    return ((from_sq % COLS, from_sq // COLS), (to_sq % COLS, to_sq // COLS))
+
+
+def _build_piece_square_values() -> dict[str, dict[str, list[int]]]:
+    """PST[side][piece_type][sq]: 기물 가치 + 위치 보정."""
+    table = {}
+    for side in ("cho", "han"):
+        per_type = {}
+        for piece_type, value in PIECE_VALUES.items():
+            values = []
+            for sq in range(NUM_SQUARES):
+                col, row = sq % COLS, sq // COLS
+                advance = row if side == "cho" else config.BOARD_ROWS - 1 - row
+                bonus = 0
+                if piece_type == "soldier":
+                    bonus = max(0, advance - 3) * 15  # 강을 건너 전진할수록 가산
+                elif piece_type in ("horse", "cannon", "chariot"):
+                    bonus = -abs(col - 4) * 4  # 중앙 선호
+                values.append(value + bonus)
+            per_type[piece_type] = values
+        table[side] = per_type
+    return table
+
+
+PST = _build_piece_square_values()
+
+
+def _build_code_table() -> list[list[int]]:
+    """PST_BY_CODE[칸 코드][sq]: board.codes 값으로 바로 찾는 PST. 초 기준 부호 (한 기물은 음수, 빈 칸은 0)."""
+    table = [[0] * NUM_SQUARES for _ in range(16)]
+    for side, sign in (("cho", 1), ("han", -1)):
+        for piece_type, values in PST[side].items():
+            table[piece_code(piece_type_of(piece_type), side_of(side))] = [sign * v for v in values]
+    return table
+
+
+PST_BY_CODE = _build_code_table()
+
+
+def evaluate(board: Board) -> int:
+    """초(楚) 기준 점수 (기물 가치 + 위치). 탐색 중에는 증분으로 갱신한다."""
+    return sum(PST_BY_CODE[p.code][p.row * COLS + p.col] for p in board.pieces)
+
+
+def _score_to_tt(score: int, ply: int) -> int:
+    """궁 포착 점수는 루트 기준 → 현재 노드 기준으로 바꿔 저장."""
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def _score_from_tt(score: int, ply: int) -> int:
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
+
+
+class SearchAborted(Exception):
+    """시간·노드 제한 초과로 탐색 중단."""
+
+
+@dataclass
+class SearchResult:
+    """탐색 결과. move 는 둘 수 없으면 None. score 는 둘 차례 기준 (1/100 졸 단위). book 이면 책 수 (depth 0, score 0)."""
+    move: tuple[tuple[int, int], tuple[int, int]] | None
+    score: int
+    depth: int
+    pv: list[tuple[tuple[int, int], tuple[int, int]]] = field(default_factory=list)
+    nodes: int = 0
+    elapsed: float = 0.0
+    book: bool = False
+
+
+class Searcher:
+    """
+    한 Board 위에서 반복 심화 alpha-beta 탐색.
+    탐색이 끝나면(중단되어도) board 는 시작 국면으로 돌아간다.
+    """
+
+    def __init__(
+        self,
+        board: Board,
+        max_depth: int = 64,
+        time_limit: float | None = None,
+        node_limit: int | None = None,
+        info=None,
+        tt: TranspositionTable | None = None,
+        stop_event=None,
+        start_depth: int = 1,
+        history_seed: int | None = None,
+        book: OpeningBook | None = None,
+        book_rng: random.Random | None = None,
+        tablebases: Tablebases | None = None,
+    ):
+        """
+        Args:
+            max_depth: 최대 반복 깊이
+            time_limit: 초 단위 제한 (None 이면 없음)
+            node_limit: 노드 수 제한 (None 이면 없음)
+            info: 반복이 끝날 때마다 SearchResult 로 불리는 콜백 (진행 출력용)
+            tt: 트랜스포지션 테이블 (None 이면 config.TT_SIZE_MB 크기로 새로 만듦)
+            stop_event: is_set() 이 참이 되면 탐색 중단 (병렬 탐색에서 주 워커가 끝났을 때)
+            start_depth: 반복 심화 시작 깊이 (병렬 탐색 보조 워커는 어긋나게 시작)
+            history_seed: 주어지면 히스토리 점수를 작은 난수로 채워 조용한 수 정렬 순서를 바꾼다
+            book: 정석 책 (있으면 책에 있는 국면은 탐색하지 않음)
+            book_rng: 책 수 고르기 난수 (None 이면 가장 많이 둔 수, 있으면 대국 수 비례 무작위)
+            tablebases: 엔드게임 테이블 (있으면 테이블에 있는 국면은 루트 아래에서 찾아 쓴다)
+        """
+        self.board = board
+        self.tt = tt if tt is not None else TranspositionTable(config.TT_SIZE_MB)
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.info = info
+        self.stop_event = stop_event
+        self.start_depth = max(1, start_depth)
+        self.history_seed = history_seed
+        self.book = book
+        self.book_rng = book_rng
+        self.tablebases = tablebases
+        self._tb_pieces = tablebases.max_pieces if tablebases is not None else 0
+        self.tb_hits = 0
+        self._generate = MOVE_ENGINES[board.engine]
+        self.nodes = 0
+        self._deadline = None
+        self._next_check = _CHECK_EVERY
+        self._score = 0  # 초 기준 증분 평가
+        self._killers: list[list[int]] = []
+        self._history = [0] * (NUM_SQUARES << 7)
+        self._pv: list[list[int]] = []
+        self._root_pv: list[int] = []
+
+    # --- 두기 / 무르기 ---
+
+    def _make(self, move: int) -> int:
+        """수를 두고 평가 변화량(초 기준)을 돌려준다."""
+        board = self.board
+        from_sq, to_sq = move >> 7, move & 127
+        codes = board.codes
+        values = PST_BY_CODE[codes[from_sq]]
+        delta = values[to_sq] - values[from_sq] - PST_BY_CODE[codes[to_sq]][to_sq]  # 빈 칸 코드 0 은 전부 0
+        board.move_piece(board.squares[from_sq], to_sq % COLS, to_sq // COLS)
+        if board.game_over is None:
+            board.switch_turn()
+        self._score += delta
+        return delta
+
+    def _unmake(self, delta: int) -> None:
+        self.board.undo()
+        self._score -= delta
+
+    # --- 수 생성 / 정렬 ---
+
+    def _generate_moves(self, side: str) -> list[int]:
+        """완전 합법 수만 (자기 궁을 장군 상태로 두는 수는 전개하지 않는다)."""
+        return [
+            (p.row * COLS + p.col) << 7 | (row * COLS + col)
+            for p, (col, row) in movement.get_strict_moves(self.board, side, self._generate)
+        ]
+
+    def _order_moves(self, moves: list[int], ply: int, best_first: int | None) -> list[int]:
+        codes = self.board.codes
+        killers = self._killers[ply] if ply < len(self._killers) else ()
+        history = self._history
+        scored = []
+        for m in moves:
+            victim = codes[m & 127]
+            if m == best_first:
+                key = 1 << 40
+            elif victim:
+                attacker = codes[m >> 7]
+                key = (1 << 30) + _VICTIM_BY_KIND[victim & CODE_TYPE_MASK] * 16 - _VALUE_BY_KIND[attacker & CODE_TYPE_MASK] // 100
+            elif m in killers:
+                key = (1 << 29) - killers.index(m)
+            else:
+                key = history[m]
+            scored.append((key, m))
+        scored.sort(reverse=True)
+        return [m for _, m in scored]
+
+    def _store_killer(self, move: int, ply: int) -> None:
+        killers = self._killers[ply]
+        if killers and killers[0] == move:
+            return
+        killers.insert(0, move)
+        del killers[2:]
+
+    # --- 탐색 ---
+
+    def _check_limits(self) -> None:
+        self._next_check = self.nodes + _CHECK_EVERY
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            raise SearchAborted
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise SearchAborted
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise SearchAborted
+
+    def _evaluate_side(self) -> int:
+        return self._score if self.board.current_turn == "cho" else -self._score
+
+    def _quiesce(self, alpha: int, beta: int, ply: int) -> int:
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._check_limits()
+        stand = self._evaluate_side()
+        if stand >= beta:
+            return stand
+        if stand > alpha:
+            alpha = stand
+        board = self.board
+        codes = board.codes
+        captures = [m for m in self._generate_moves(board.current_turn) if codes[m & 127]]
+        for m in self._order_moves(captures, ply, None):
+            if codes[m & 127] & CODE_TYPE_MASK == _GENERAL:
+                return MATE_SCORE - ply
+            delta = self._make(m)
+            score = -self._quiesce(-beta, -alpha, ply + 1)
+            self._unmake(delta)
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+
+    def _negamax(self, depth: int, alpha: int, beta: int, ply: int) -> int:
+        board = self.board
+        self._pv[ply] = []
+        if ply > 0 and board.repetition_count() > 0:
+            return 0  # 반복 국면은 비김으로 본다
+        if ply > 0 and len(board.pieces) <= self._tb_pieces:
+            hit = self.tablebases.probe(board)
+            if hit is not None:
+                self.tb_hits += 1
+                result, dtm = hit
+                if result == DRAW:
+                    return 0
+                mate = MATE_SCORE - (ply + dtm)  # dtm = 궁을 잡을 때(승) / 둘 수 없을 때(패)까지 수
+                return mate if result == WIN else -mate
+        if depth <= 0:
+            return self._quiesce(alpha, beta, ply)
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._check_limits()
+
+        key = board.zobrist_key
+        entry = self.tt.probe(key)
+        tt_move = 0
+        if entry is not None:
+            tt_move, tt_score, tt_depth, tt_bound = entry
+            if ply > 0 and tt_depth >= depth:
+                tt_score = _score_from_tt(tt_score, ply)
+                if (
+                    tt_bound == BOUND_EXACT
+                    or (tt_bound == BOUND_LOWER and tt_score >= beta)
+                    or (tt_bound == BOUND_UPPER and tt_score <= alpha)
+                ):
+                    return tt_score
+
+        codes = board.codes
+        moves = self._generate_moves(board.current_turn)
+        if not moves:
+            return -(MATE_SCORE - ply)  # 둘 수 없으면 패배
+        for m in moves:
+            if codes[m & 127] & CODE_TYPE_MASK == _GENERAL:
+                self._pv[ply] = [m]
+                return MATE_SCORE - ply
+
+        if not tt_move and ply < len(self._root_pv):
+            tt_move = self._root_pv[ply]
+        alpha_orig = alpha
+        best = -INF
+        best_move = 0
+        for m in self._order_moves(moves, ply, tt_move):
+            is_capture = codes[m & 127] != 0
+            delta = self._make(m)
+            score = -self._negamax(depth - 1, -beta, -alpha, ply + 1)
+            self._unmake(delta)
+            if score > best:
+                best = score
+                best_move = m
+                if score > alpha:
+                    alpha = score
+                    self._pv[ply] = [m] + self._pv[ply + 1]
+                    if score >= beta:
+                        if not is_capture:
+                            self._store_killer(m, ply)
+                            self._history[m] += depth * depth
+                        break
+        if best <= alpha_orig:
+            bound = BOUND_UPPER
+        elif best >= beta:
+            bound = BOUND_LOWER
+        else:
+            bound = BOUND_EXACT
+        self.tt.store(key, depth, _score_to_tt(best, ply), bound, best_move)
+        return best
+
+    def search(self) -> SearchResult:
+        """반복 심화 탐색. 끝나거나 제한에 걸리면 마지막으로 끝난 깊이의 결과."""
+        board = self.board
+        start = time.perf_counter()
+        self._deadline = start + self.time_limit if self.time_limit is not None else None
+        self.nodes = 0
+        self.tb_hits = 0
+        self._next_check = _CHECK_EVERY
+        self._score = evaluate(board)
+        max_ply = self.max_depth + 64
+        self._killers = [[] for _ in range(max_ply)]
+        self._pv = [[] for _ in range(max_ply + 1)]
+        self._root_pv = []
+        self.tt.new_search()
+        start_ply = board.ply
+
+        result = SearchResult(move=None, score=0, depth=0)
+        if board.game_over is not None:
+            return result
+        if self.book is not None:
+            choice = self.book.choose(board, self.book_rng)
+            if choice is not None:
+                return SearchResult(
+                    move=choice.move, score=0, depth=0, pv=[choice.move],
+                    elapsed=time.perf_counter() - start, book=True,
+                )
+        if self.history_seed is not None:
+            rng = random.Random(self.history_seed)
+            self._history = [rng.randrange(8) for _ in range(NUM_SQUARES << 7)]
+        for depth in range(min(self.start_depth, self.max_depth), self.max_depth + 1):
+            try:
+                score = self._negamax(depth, -INF, INF, 0)
+            except SearchAborted:
+                while board.ply > start_ply:
+                    board.undo()
+                break
+            pv = self._pv[0]
+            if not pv:
+                break
+            self._root_pv = list(pv)
+            result = SearchResult(
+                move=decode_move(pv[0]),
+                score=score,
+                depth=depth,
+                pv=[decode_move(m) for m in pv],
+                nodes=self.nodes,
+                elapsed=time.perf_counter() - start,
+            )
+            if self.info is not None:
+                self.info(result)
+            if abs(score) >= MATE_BOUND:
+                break  # 궁 포착까지 수순을 찾음
+        result.nodes = self.nodes
+        result.elapsed = time.perf_counter() - start
+        return result
+
+
+def search(
+    board: Board,
+    max_depth: int = 64,
+    time_limit: float | None = None,
+    node_limit: int | None = None,
+) -> SearchResult:
+    """Searcher 를 만들어 한 번 탐색."""
+    return Searcher(board, max_depth=max_depth, time_limit=time_limit, node_limit=node_limit).search()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Janggi alpha-beta search")
+    parser.add_argument("--fen", help="시작 국면 (기본: 초기 배치)")
+    parser.add_argument("--depth", type=int, default=64, help="최대 깊이")
+    parser.add_argument("--time", type=float, default=None, help="제한 시간 (초)")
+    parser.add_argument("--nodes", type=int, default=None, help="노드 수 제한")
+    parser.add_argument("--engine", choices=sorted(MOVE_ENGINES), default=config.MOVE_ENGINE)
+    parser.add_argument("--hash", type=float, default=config.TT_SIZE_MB, help="트랜스포지션 테이블 크기 (MB)")
+    parser.add_argument("--book", help="정석 책 파일 (book.py build 로 만든 것)")
+    parser.add_argument("--tb", help="엔드게임 테이블 디렉터리 (tablebase.py generate 로 만든 것)")
+    args = parser.parse_args(argv)
+    if args.time is None and args.nodes is None and args.depth == 64:
+        args.time = 5.0
+
+    board = Board.from_fen(args.fen, engine=args.engine) if args.fen else Board(engine=args.engine)
+
+    def info(r: SearchResult) -> None:
+        nps = r.nodes / max(r.elapsed, 1e-9)
+        pv = " ".join(format_move(m) for m in r.pv)
+        print(f"depth {r.depth:2d}  score {r.score:6d}  nodes {r.nodes:9d}  time {r.elapsed:7.2f}s  nps {nps:8.0f}  pv {pv}")
+
+    searcher = Searcher(
+        board, max_depth=args.depth, time_limit=args.time, node_limit=args.nodes, info=info,
+        tt=TranspositionTable(args.hash), book=OpeningBook(args.book) if args.book else None,
+        tablebases=Tablebases(args.tb) if args.tb else None,
+    )
+    result = searcher.search()
+    if result.book:
+        print(f"bookmove {format_move(result.move)}  time {result.elapsed * 1e6:.0f}us")
+        return 0
+    st = searcher.tt.stats()
+    print(f"tt  {st['size_mb']:.1f}MB  hit rate {st['hit_rate']:.1%}  fill {st['fill_rate']:.1%}  stores {st['stores']}")
+    if searcher.tablebases is not None:
+        print(f"tb  tables {len(searcher.tablebases.tables)}  hits {searcher.tb_hits}")
+    if result.move is None:
+        print("bestmove (none)")
+        return 1
+    print(f"bestmove {format_move(result.move)}  score {result.score}  depth {result.depth}  nodes {result.nodes}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+"""
+장기 자가 대국 생성기 (학습·시험 데이터용)
+- 여러 대국을 워커 프로세스(ProcessPoolExecutor)에서 동시에 두고, 끝난 대국을 부모가 받는 즉시 파일에 추가
+- 시작 국면: config.INITIAL_SETUP, 또는 상·마 배치 무작위(--random-setup) + 처음 몇 수 무작위(--opening-plies)
+- 수 고르기(picker): "random" | "greedy" (가장 비싼 기물 포착) | "search" (search.Searcher, 노드·깊이 제한)
+- 규칙은 Board.move_piece / switch_turn 그대로. 모든 picker 와 처음 무작위 수는 완전 합법 수
+  (movement.get_strict_moves, 탐색·화면과 같은 규칙) 에서 고른다. 궁 포착 = 승, 둘 수 없음 = 패,
+  같은 국면 3번 = 무승부, --max-plies 초과 = 무승부
+- 대국마다 씨앗 = (--seed, 대국 번호) 로 정해져서 어느 워커가 두든 같은 대국이 나온다
+- 워커가 죽으면 (BrokenProcessPool) 풀을 새로 만들고 끝나지 않은 대국을 다시 맡긴다
+- 이어하기: 출력 파일에 이미 있는 대국 번호는 건너뛴다 (마지막 기록이 잘렸으면 잘라 낸다)
+
+출력: 대국 데이터베이스 (gamerecord.py, 수마다 2바이트 + mmap 색인). 이름이 .jsonl 로 끝나면 JSON Lines,
+    한 줄 = 한 대국 {"game": 번호, "seed": 씨앗, "fen": 시작 국면, "moves": [[from_sq, to_sq], ...],
+     "result": "cho" | "han" | "draw", "reason": 끝난 이유, "plies": 수 개수}
+    칸 번호 sq = row * 9 + col
+
+실행 예:
+    python selfplay.py --games 1000 --out games.jgdb --picker greedy --workers 4
+    python selfplay.py --games 100 --out games.jsonl --picker search --nodes 2000 --random-setup --opening-plies 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import config
+import gamerecord
+import movement
+from board import MOVE_ENGINES, Board
+from search import MATE_SCORE, PIECE_VALUES, Searcher
+from tt import TranspositionTable
+
+COLS = config.BOARD_COLS
+
+# 상·마 배치: 왼쪽(col 1, 2) / 오른쪽(col 6, 7) 각각 "마상" 또는 "상마"
+SETUP_VARIATIONS = [
+    (("horse", "elephant"), ("elephant", "horse")),  # 마상상마 (기본)
+    (("elephant", "horse"), ("horse", "elephant")),  # 상마마상
+    (("horse", "elephant"), ("horse", "elephant")),  # 마상마상
+    (("elephant", "horse"), ("elephant", "horse")),  # 상마상마
+]
+
+# greedy 에서 포착 기물 가치 (궁 포착이 항상 최우선)
+_CAPTURE_VALUES = dict(PIECE_VALUES, general=MATE_SCORE)
+
+
+def make_setup(cho_variation: int = 0, han_variation: int = 0) -> list:
+    """config.INITIAL_SETUP 에서 양쪽 상·마 자리를 SETUP_VARIATIONS[번호] 로 바꾼 배치."""
+    variations = {"cho": SETUP_VARIATIONS[cho_variation], "han": SETUP_VARIATIONS[han_variation]}
+    setup = []
+    for (col, row), (piece_type, side) in config.INITIAL_SETUP:
+        if piece_type in ("horse", "elephant"):
+            left, right = variations[side]
+            if col in (1, 2):
+                piece_type = left[col - 1]
+            elif col in (6, 7):
+                piece_type = right[col - 6]
+        setup.append(((col, row), (piece_type, side)))
+    return setup
+
+
+# --- 수 고르기: PICKERS[이름](options) -> pick(board, rng) -> (piece, (col, row)) | None ---
+
+def _strict_moves(board: Board) -> list:
+    """둘 차례의 완전 합법 수 [(기물, (col, row)), ...] (자기 궁을 내주는 수 제외)."""
+    return movement.get_strict_moves(board, board.current_turn, MOVE_ENGINES[board.engine])
+
+
+def _pick_random(board: Board, rng: random.Random):
+    moves = _strict_moves(board)
+    return rng.choice(moves) if moves else None
+
+
+def _pick_greedy(board: Board, rng: random.Random):
+    """가장 비싼 기물을 잡는 수, 없으면 무작위."""
+    moves = _strict_moves(board)
+    if not moves:
+        return None
+    best_value = -1
+    best = []
+    for piece, (col, row) in moves:
+        target = board.squares[row * COLS + col]
+        value = _CAPTURE_VALUES[target.piece_type] if target is not None else 0
+        if value > best_value:
+            best_value = value
+            best = [(piece, (col, row))]
+        elif value == best_value:
+            best.append((piece, (col, row)))
+    return rng.choice(best)
+
+
+def _make_search_picker(depth: int, nodes: int | None, hash_mb: float):
+    """search.Searcher 로 고르는 picker. TT 는 워커 안에서 재사용하되 대국마다 비워 결과를 재현 가능하게 한다."""
+    tt = TranspositionTable(hash_mb)
+    last_game = [None]
+
+    def pick(board: Board, rng: random.Random):
+        if last_game[0] is not rng:
+            tt.clear()
+            last_game[0] = rng
+        result = Searcher(board, max_depth=depth, node_limit=nodes, tt=tt).search()
+        if result.move is None:
+            return _pick_random(board, rng)
+        (fc, fr), (tc, tr) = result.move
+        return board.squares[fr * COLS + fc], (tc, tr)
+
+    return pick
+
+
+PICKERS = {
+    "random": lambda options: _pick_random,
+    "greedy": lambda options: _pick_greedy,
+    "search": lambda options: _make_search_picker(
+        options.get("depth", 3), options.get("nodes"), options.get("hash_mb", 4)
+    ),
+}
+
+
+# --- 한 대국 ---
+
+def game_seed(base_seed: int, game_id: int) -> int:
+    """(기본 씨앗, 대국 번호) -> 대국 씨앗. 워커·실행 순서와 상관없이 같다."""
+    return (base_seed * 0x9E3779B1 + game_id * 0x85EBCA77) & 0xFFFFFFFFFFFF
+
+
+def play_game(
+    game_id: int,
+    seed: int,
+    pick,
+    random_setup: bool = False,
+    opening_plies: int = 0,
+    max_plies: int = 300,
+    engine: str | None = None,
+) -> dict:
+    """한 대국을 끝까지 두고 기록(dict)을 돌려준다. pick 은 PICKERS[이름](options) 결과."""
+    rng = random.Random(seed)
+    setup = make_setup(rng.randrange(len(SETUP_VARIATIONS)), rng.randrange(len(SETUP_VARIATIONS))) if random_setup else None
+    board = Board(engine=engine, setup=setup)
+    start_fen = board.to_fen()
+    moves = []
+    result, reason = "draw", "max_plies"
+    while len(moves) < max_plies:
+        if board.repetition_count() >= 2:
+            result, reason = "draw", "repetition"
+            break
+        choice = _pick_random(board, rng) if len(moves) < opening_plies else pick(board, rng)
+        if choice is None:
+            result = "han" if board.current_turn == "cho" else "cho"
+            reason = "no_moves"
+            break
+        piece, (col, row) = choice
+        moves.append([piece.row * COLS + piece.col, row * COLS + col])
+        board.move_piece(piece, col, row)
+        if board.game_over is not None:
+            result, reason = board.game_over, "capture"
+            break
+        board.switch_turn()
+    return {
+        "game": game_id,
+        "seed": seed,
+        "fen": start_fen,
+        "moves": moves,
+        "result": result,
+        "reason": reason,
+        "plies": len(moves),
+    }
+
+
+# --- 워커 ---
+
+_picker = None  # 워커 프로세스마다 한 번 만든 picker
+
+
+def _init_worker(picker: str, options: dict) -> None:
+    global _picker
+    _picker = PICKERS[picker](options)
+
+
+def _play_task(game_id: int, seed: int, options: dict) -> dict:
+    return play_game(
+        game_id,
+        seed,
+        _picker,
+        random_setup=options.get("random_setup", False),
+        opening_plies=options.get("opening_plies", 0),
+        max_plies=options.get("max_plies", 300),
+        engine=options.get("engine"),
+    )
+
+
+# --- 출력 / 이어하기 ---
+
+def load_done_ids(path: str) -> set[int]:
+    """출력 파일에서 이미 끝난 대국 번호. 마지막 줄이 잘려 있으면 그 부분을 파일에서 잘라 낸다."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    good_size = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                done.add(json.loads(line)["game"])
+            except (ValueError, KeyError):
+                break
+            good_size += len(line)
+    if good_size != os.path.getsize(path):
+        with open(path, "r+b") as f:
+            f.truncate(good_size)
+    return done
+
+
+class JsonlGameWriter:
+    """끝난 대국을 한 줄씩 추가 (줄마다 flush 해서 중간에 멈춰도 이어하기 가능)."""
+
+    def __init__(self, path: str):
+        self._f = open(path, "a", encoding="utf-8")
+
+    def write(self, record: dict) -> None:
+        self._f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._f.flush()
+
+    def close(self) -> None:
+        self._f.close()
+
+
+def run_selfplay(
+    games: int,
+    writer,
+    done: set[int] | None = None,
+    workers: int | None = None,
+    picker: str = "random",
+    seed: int = 0,
+    options: dict | None = None,
+    max_retries: int = 3,
+    progress=None,
+) -> dict:
+    """
+    대국 0 ~ games-1 중 done 에 없는 것을 워커들로 두고, 끝나는 대로 writer.write(record).
+    워커가 죽으면 풀을 다시 만들어 끝나지 않은 대국을 다시 맡긴다 (대국당 max_retries 번까지).
+
+    Returns:
+        {"played", "skipped", "failed", "restarts", "elapsed"}
+    """
+    options = dict(options or {})
+    done = done or set()
+    workers = workers or os.cpu_count() or 1
+    todo = [g for g in range(games) if g not in done]
+    todo.reverse()  # pop() 으로 작은 번호부터
+    retries: dict[int, int] = {}
+    stats = {"played": 0, "skipped": games - len(todo), "failed": 0, "restarts": 0}
+    start = time.perf_counter()
+    max_in_flight = workers * 2
+
+    while todo:
+        executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(picker, options))
+        in_flight = {}
+        try:
+            while todo or in_flight:
+                while todo and len(in_flight) < max_in_flight:
+                    g = todo.pop()
+                    in_flight[executor.submit(_play_task, g, game_seed(seed, g), options)] = g
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    writer.write(fut.result())
+                    del in_flight[fut]
+                    stats["played"] += 1
+                    if progress is not None:
+                        progress(stats)
+        except BrokenProcessPool:
+            # 끝나지 않은 대국을 다시 맡긴다 (이미 결과가 나온 future 는 마저 쓴다)
+            stats["restarts"] += 1
+            for fut, g in in_flight.items():
+                if fut.done() and fut.exception() is None:
+                    writer.write(fut.result())
+                    stats["played"] += 1
+                    continue
+                retries[g] = retries.get(g, 0) + 1
+                if retries[g] > max_retries:
+                    stats["failed"] += 1
+                    print(f"game {g}: gave up after {max_retries} retries", file=sys.stderr)
+                else:
+                    todo.append(g)
+            todo.sort(reverse=True)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    stats["elapsed"] = time.perf_counter() - start
+    return stats
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Janggi batched self-play generator")
+    parser.add_argument("--games", type=int, required=True, help="대국 수 (번호 0 ~ games-1)")
+    parser.add_argument("--out", required=True, help="출력 파일 (있으면 이어서)")
+    parser.add_argument("--format", choices=["db", "jsonl"], default=None, help="기본: .jsonl 이면 jsonl, 아니면 db")
+    parser.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--picker", choices=sorted(PICKERS), default="random")
+    parser.add_argument("--depth", type=int, default=3, help="search picker 최대 깊이")
+    parser.add_argument("--nodes", type=int, default=None, help="search picker 노드 제한")
+    parser.add_argument("--hash", type=float, default=4, help="search picker TT 크기 (MB, 워커마다)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--random-setup", action="store_true", help="양쪽 상·마 배치 무작위")
+    parser.add_argument("--opening-plies", type=int, default=0, help="처음 몇 수를 무작위로")
+    parser.add_argument("--max-plies", type=int, default=300, help="이 수를 넘기면 무승부")
+    parser.add_argument("--engine", default=None, help="이동 생성 엔진 (기본: config.MOVE_ENGINE)")
+    args = parser.parse_args(argv)
+
+    options = {
+        "depth": args.depth,
+        "nodes": args.nodes,
+        "hash_mb": args.hash,
+        "random_setup": args.random_setup,
+        "opening_plies": args.opening_plies,
+        "max_plies": args.max_plies,
+        "engine": args.engine,
+    }
+    fmt = args.format or ("jsonl" if args.out.endswith(".jsonl") else "db")
+    if fmt == "jsonl":
+        done = load_done_ids(args.out)
+        writer = JsonlGameWriter(args.out)
+    else:
+        done = gamerecord.load_done_ids(args.out)
+        writer = gamerecord.GameWriter(args.out)
+    last_report = [time.perf_counter()]
+
+    def progress(stats: dict) -> None:
+        now = time.perf_counter()
+        if now - last_report[0] >= 5:
+            last_report[0] = now
+            print(f"played {stats['played']}  restarts {stats['restarts']}", file=sys.stderr)
+
+    try:
+        stats = run_selfplay(
+            args.games, writer, done=done, workers=args.workers, picker=args.picker,
+            seed=args.seed, options=options, progress=progress,
+        )
+    finally:
+        writer.close()
+    rate = stats["played"] / max(stats["elapsed"], 1e-9)
+    print(
+        f"played {stats['played']}  skipped {stats['skipped']}  failed {stats['failed']}  "
+        f"restarts {stats['restarts']}  time {stats['elapsed']:.1f}s  games/s {rate:.1f}"
+    )
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,613 @@
+# -*- coding: utf-8 -*-
+"""
+장기 엔드게임 테이블베이스 (기물 몇 개 남은 국면의 승·패·무와 끝날 때까지 수)
+- 재료 이름: 초 기물 글자 + "-" + 한 기물 글자 (config.PIECE_LETTERS, 궁 k 포함), 예: "kr-kaa" = 초 궁·차 / 한 궁·사 둘
+- 국면 번호: 기물 묶음 (진영·종류가 같은 기물들) 마다의 자리 번호를 혼합 진법으로 이은 값 × 2 + 둘 차례 (초 0 / 한 1)
+  놓일 수 있는 칸 = 궁·사는 자기 궁성 9칸, 나머지는 90칸. 한 기물이면 그 칸의 순번,
+  같은 기물이 k 개면 k 칸 조합의 colex 순위 (순서 없이 한 번만: 차 둘 = C(90, 2) 자리). 다른 묶음끼리 겹치는 배치는 INVALID
+- 만들기 (역행 분석):
+    1) 워커 프로세스들이 번호 구간을 나눠 국면마다 movement 규칙으로 완전 합법 수를 만들고
+       같은 재료 안의 다음 국면 번호, 기물을 잡아 재료가 줄어드는 수의 결과 (이미 만든 작은 테이블) 를 돌려준다
+    2) 부모가 다음 국면 목록을 뒤집어 이전 국면 목록을 만들고, 남은 다음 국면 수 (카운터) 와 수 단위 버킷으로 BFS:
+       궁을 잡을 수 있으면 승 0, 둘 수 없으면 패 0 (게임과 같은 규칙), 패 d 로 가는 수가 있으면 승 d+1,
+       모든 수가 승으로 가면 패 1+max. 끝까지 정해지지 않은 국면은 무 (반복)
+    3) 필요한 작은 재료 (초·한 중 한 기물을 뺀 것) 는 먼저 만든다 (뒤집은 재료 파일이 있으면 그것을 쓴다)
+- 파일 (재료 이름.jgtb): 헤더 | 승패무 2비트씩 (한 바이트에 4국면) | 끝날 때까지 수 (1 또는 2바이트). mmap 으로 연다
+- 찾기: 초·한을 바꾸고 위아래를 뒤집은 국면도 같은 테이블로 찾는다. search.Searcher(tablebases=...) 가 탐색 중에 찾아 쓴다
+- 빅장 규칙 (config.FACING_GENERALS_ILLEGAL) 은 만들 때 값이 헤더에 들어가고, 다르면 찾지 않는다
+
+실행 예:
+    python tablebase.py generate kr-k --dir tb
+    python tablebase.py generate kc-ka --dir tb --workers 4
+    python tablebase.py probe --dir tb --fen "<FEN>"
+    python tablebase.py info --dir tb
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import itertools
+import math
+import mmap
+import multiprocessing as mp
+import os
+import struct
+import sys
+import time
+from array import array
+
+import config
+import movement
+from board import MOVE_ENGINES, Board
+from piece import SIDE_NAMES, Piece, PieceType
+
+COLS = config.BOARD_COLS
+ROWS = config.BOARD_ROWS
+NUM_SQUARES = COLS * ROWS
+
+MAGIC = b"JGTB"
+VERSION = 2  # 2: 같은 기물 묶음을 조합 순위로
+FILE_HEADER = struct.Struct("<4sHHQH14s")  # magic, 버전, 플래그, 국면 수, 수 바이트 수, 재료 이름
+FLAG_FACING = 1  # config.FACING_GENERALS_ILLEGAL 로 만든 테이블
+EXTENSION = ".jgtb"
+
+# 승패무 (둘 차례 기준)
+DRAW, WIN, LOSS, INVALID = 0, 1, 2, 3
+RESULT_NAMES = ("draw", "win", "loss", None)
+
+_NONE = 0xFFFF  # 워커 결과: 잡는 수로 이기는 경우 없음
+_STATUS_NORMAL, _STATUS_WIN0, _STATUS_LOSS0, _STATUS_INVALID = 0, 1, 2, 3
+
+_LETTER_KINDS = {letter: int(PieceType[name.upper()]) for name, letter in config.PIECE_LETTERS.items()}
+_KIND_LETTERS = {kind: letter for letter, kind in _LETTER_KINDS.items()}
+_GENERAL = int(PieceType.GENERAL)
+_GUARD = int(PieceType.GUARD)
+PALACE_SQUARES = (
+    tuple(row * COLS + col for row in config.PALACE_TOP_ROWS for col in config.PALACE_COLS),
+    tuple(row * COLS + col for row in config.PALACE_BOTTOM_ROWS for col in config.PALACE_COLS),
+)
+
+
+# --- 재료 ---
+
+def parse_material(name: str) -> tuple[tuple[int, ...], tuple[int, ...]]:
+    """"kr-kaa" -> (초 종류 번호들, 한 종류 번호들). 양쪽에 궁(k)이 정확히 하나씩."""
+    try:
+        cho, han = name.lower().split("-")
+        sides = tuple(tuple(sorted(_LETTER_KINDS[c] for c in part)) for part in (cho, han))
+    except (ValueError, KeyError):
+        raise ValueError(f"bad material name: {name!r}") from None
+    for kinds in sides:
+        if kinds.count(_GENERAL) != 1:
+            raise ValueError(f"each side needs exactly one general: {name!r}")
+    return sides
+
+
+def material_name(cho: tuple[int, ...], han: tuple[int, ...]) -> str:
+    return "-".join("".join(_KIND_LETTERS[k] for k in sorted(kinds)) for kinds in (cho, han))
+
+
+def mirror_name(name: str) -> str:
+    """초·한을 바꾼 재료 이름."""
+    cho, han = name.split("-")
+    return f"{han}-{cho}"
+
+
+def sub_materials(cho: tuple[int, ...], han: tuple[int, ...]) -> list[tuple[tuple[int, ...], tuple[int, ...]]]:
+    """궁이 아닌 기물 하나를 잡혔을 때의 재료들 (중복 없이)."""
+    out = []
+    for side in (0, 1):
+        kinds = (cho, han)[side]
+        for k in sorted(set(kinds) - {_GENERAL}):
+            rest = list(kinds)
+            rest.remove(k)
+            sub = (tuple(rest), han) if side == 0 else (cho, tuple(rest))
+            if sub not in out:
+                out.append(sub)
+    return out
+
+
+def mirror_square(sq: int) -> int:
+    return (ROWS - 1 - sq // COLS) * COLS + sq % COLS
+
+
+def colex_rank(places: list[int]) -> int:
+    """서로 다른 자리 번호 조합 (오름차순) -> colex 순위 (0 ~ C(n, k) - 1)."""
+    return sum(math.comb(p, i + 1) for i, p in enumerate(places))
+
+
+class Layout:
+    """
+    재료 하나의 국면 번호 매기기. pieces = 기물 (진영, 종류) 순서 (같은 기물은 이웃),
+    groups = 같은 기물 묶음 [(첫 기물 번호, 개수)] 과 묶음마다 놓일 수 있는 칸·자리 번호·자릿값.
+    """
+
+    def __init__(self, cho: tuple[int, ...], han: tuple[int, ...]):
+        self.cho, self.han = tuple(sorted(cho)), tuple(sorted(han))
+        self.name = material_name(self.cho, self.han)
+        self.pieces = [(0, k) for k in self.cho] + [(1, k) for k in self.han]  # (진영, 종류), 번호 순서
+        self.groups: list[tuple[int, int]] = []
+        self.group_of: list[int] = []  # [기물] -> 묶음 번호
+        self.domains: list[tuple[int, ...]] = []
+        self.places: list[list[int]] = []  # [묶음][칸] -> 자리 번호 (놓일 수 없으면 -1)
+        self.combos: list[list[tuple[int, ...]] | None] = []  # [묶음][순위] -> 자리 번호 조합 (한 기물이면 None)
+        self.sizes: list[int] = []
+        self.mults: list[int] = []
+        mult = 1
+        for (color, kind), members in itertools.groupby(self.pieces):
+            count = len(list(members))
+            domain = PALACE_SQUARES[color] if kind in (_GENERAL, _GUARD) else tuple(range(NUM_SQUARES))
+            place = [-1] * NUM_SQUARES
+            for i, sq in enumerate(domain):
+                place[sq] = i
+            combos = None
+            if count > 1:
+                combos = sorted(itertools.combinations(range(len(domain)), count), key=lambda c: c[::-1])
+            size = math.comb(len(domain), count)
+            self.group_of += [len(self.groups)] * count
+            self.groups.append((len(self.group_of) - count, count))
+            self.domains.append(domain)
+            self.places.append(place)
+            self.combos.append(combos)
+            self.sizes.append(size)
+            self.mults.append(mult)
+            mult *= size
+        self.placements = mult
+        self.size = mult * 2  # 둘 차례까지
+
+    def index(self, squares: list[int], turn: int) -> int | None:
+        """
+        기물 순서대로의 칸 목록 + 둘 차례 (0 초 / 1 한) -> 국면 번호.
+        같은 묶음 안의 순서는 상관없다. 놓일 수 없는 칸이나 같은 묶음 안에서 겹치는 칸이 있으면 None.
+        """
+        idx = 0
+        for (start, count), place, mult in zip(self.groups, self.places, self.mults):
+            if count == 1:
+                i = place[squares[start]]
+                if i < 0:
+                    return None
+            else:
+                ps = sorted(place[sq] for sq in squares[start: start + count])
+                if ps[0] < 0 or len(set(ps)) != count:
+                    return None
+                i = colex_rank(ps)
+            idx += i * mult
+        return idx << 1 | turn
+
+    def squares(self, index: int) -> list[int]:
+        """국면 번호 -> 기물 순서대로의 칸 목록 (같은 묶음은 칸 번호 오름차순, 둘 차례는 index & 1)."""
+        rest = index >> 1
+        out = []
+        for domain, combos, size in zip(self.domains, self.combos, self.sizes):
+            rest, i = divmod(rest, size)
+            if combos is None:
+                out.append(domain[i])
+            else:
+                out.extend(domain[p] for p in combos[i])
+        return out
+
+
+def _sorted_entries(entries: list[tuple[int, int, int]]) -> tuple[tuple[int, ...], tuple[int, ...], list[int]]:
+    """[(진영, 종류, 칸), ...] -> (초 종류들, 한 종류들, Layout 순서 칸 목록)."""
+    entries = sorted(entries)
+    cho = tuple(k for c, k, _ in entries if c == 0)
+    han = tuple(k for c, k, _ in entries if c == 1)
+    return cho, han, [sq for _, _, sq in entries]
+
+
+# --- 찾기 ---
+
+class Table:
+    """mmap 으로 연 재료 하나의 테이블 (읽기 전용)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, flags, count, dtm_bytes, name = FILE_HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"not a tablebase file: {path!r}")
+        if version != VERSION:
+            raise ValueError(f"unsupported tablebase version {version}: {path!r}")
+        self.name = name.rstrip(b"\0").decode("ascii")
+        self.layout = Layout(*parse_material(self.name))
+        if count != self.layout.size:
+            raise ValueError(f"tablebase size mismatch: {path!r}")
+        self.facing = bool(flags & FLAG_FACING)
+        self.count = count
+        self._dtm = FILE_HEADER.size + (count + 3) // 4
+        self._dtm_format = struct.Struct("<B" if dtm_bytes == 1 else "<H")
+
+    def result(self, index: int) -> int:
+        """국면 번호 -> DRAW | WIN | LOSS | INVALID (둘 차례 기준)."""
+        return self._data[FILE_HEADER.size + (index >> 2)] >> ((index & 3) << 1) & 3
+
+    def dtm(self, index: int) -> int:
+        """끝날 때까지 수 (ply). 무·INVALID 는 0."""
+        return self._dtm_format.unpack_from(self._data, self._dtm + index * self._dtm_format.size)[0]
+
+    def close(self) -> None:
+        self._data.close()
+        self._file.close()
+
+
+class Tablebases:
+    """디렉터리의 *.jgtb 테이블들. probe(board) 로 찾는다."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.tables: dict[str, Table] = {}
+        self.max_pieces = 0
+        self.reload()
+
+    def reload(self) -> None:
+        """디렉터리를 다시 읽어 새로 생긴 테이블을 연다."""
+        for path in sorted(glob.glob(os.path.join(self.directory, "*" + EXTENSION))):
+            name = os.path.basename(path)[: -len(EXTENSION)]
+            if name not in self.tables:
+                table = Table(path)
+                self.tables[table.name] = table
+                self.max_pieces = max(self.max_pieces, len(table.layout.pieces))
+
+    def stale(self, cho: tuple[int, ...], han: tuple[int, ...]) -> list[Table]:
+        """재료 (뒤집은 재료 포함) 의 테이블 중 빅장 규칙이 지금 config 와 달라 찾기에 못 쓰는 것."""
+        name = material_name(cho, han)
+        return [
+            self.tables[n] for n in dict.fromkeys((name, mirror_name(name)))
+            if n in self.tables and self.tables[n].facing != config.FACING_GENERALS_ILLEGAL
+        ]
+
+    def has(self, cho: tuple[int, ...], han: tuple[int, ...]) -> bool:
+        """찾기에 쓸 수 있는 테이블 (뒤집은 재료 포함, 빅장 규칙이 지금 config 와 같은 것) 이 있는지."""
+        name = material_name(cho, han)
+        return any(
+            n in self.tables and self.tables[n].facing == config.FACING_GENERALS_ILLEGAL
+            for n in (name, mirror_name(name))
+        )
+
+    def probe_entries(self, entries: list[tuple[int, int, int]], turn: int) -> tuple[int, int] | None:
+        """[(진영, 종류, 칸), ...] + 둘 차례 -> (결과, 끝날 때까지 수). 테이블이 없으면 None."""
+        cho, han, squares = _sorted_entries(entries)
+        facing = config.FACING_GENERALS_ILLEGAL
+        table = self.tables.get(material_name(cho, han))
+        if table is None or table.facing != facing:
+            table = self.tables.get(material_name(han, cho))
+            if table is None or table.facing != facing:
+                return None
+            cho, han, squares = _sorted_entries([(c ^ 1, k, mirror_square(sq)) for c, k, sq in entries])
+            turn ^= 1
+        index = table.layout.index(squares, turn)
+        if index is None:
+            return None
+        result = table.result(index)
+        if result == INVALID:
+            return None
+        return result, table.dtm(index)
+
+    def probe(self, board: Board) -> tuple[int, int] | None:
+        """board 국면 -> (DRAW | WIN | LOSS, 끝날 때까지 수) (둘 차례 기준). 테이블이 없으면 None."""
+        if len(board.pieces) > self.max_pieces or board.game_over is not None:
+            return None
+        entries = [(p.color, p.kind, p.row * COLS + p.col) for p in board.pieces]
+        return self.probe_entries(entries, 0 if board.current_turn == "cho" else 1)
+
+    def close(self) -> None:
+        for table in self.tables.values():
+            table.close()
+        self.tables.clear()
+
+    def __enter__(self) -> "Tablebases":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# --- 만들기: 워커 (다음 국면 계산) ---
+
+_layout: Layout | None = None
+_tables: Tablebases | None = None
+_board: Board | None = None
+_pieces: list[Piece] = []
+
+
+def _init_worker(name: str, directory: str) -> None:
+    global _layout, _tables, _board, _pieces
+    _layout = Layout(*parse_material(name))
+    _tables = Tablebases(directory)
+    _board = Board(setup=[])
+    _pieces = [Piece(kind, SIDE_NAMES[color], 0, 0) for color, kind in _layout.pieces]
+
+
+def _successors(span: tuple[int, int]) -> tuple[bytes, ...]:
+    """
+    번호 구간 [start, end) 의 국면마다: 상태, 같은 재료 다음 국면 수·번호들,
+    잡는 수로 가는 작은 재료 결과 (이기는 가장 짧은 수, 지는 가장 긴 수, 비기는 수가 있는지).
+    """
+    start, end = span
+    layout, tables, board, pieces = _layout, _tables, _board, _pieces
+    generate = MOVE_ENGINES[board.engine]
+    order = {p: i for i, p in enumerate(pieces)}
+    groups, group_of, places, mults = layout.groups, layout.group_of, layout.places, layout.mults
+    status = array("B")
+    counts = array("H")
+    succ = array("I")
+    exit_win = array("H")
+    exit_loss = array("H")
+    exit_draw = array("B")
+    for index in range(start, end):
+        turn = index & 1
+        squares = layout.squares(index)
+        if len(set(squares)) != len(squares):
+            status.append(_STATUS_INVALID)
+            counts.append(0)
+            exit_win.append(_NONE)
+            exit_loss.append(0)
+            exit_draw.append(0)
+            continue
+        for p, sq in zip(pieces, squares):
+            p.col, p.row = sq % COLS, sq // COLS
+        board.pieces = list(pieces)
+        board.current_turn = SIDE_NAMES[turn]
+        board.game_over = None
+        board._index_pieces()
+        state = _STATUS_NORMAL
+        n = 0
+        win, loss, draw = _NONE, 0, 0
+        moves = movement.get_strict_moves(board, board.current_turn, generate)
+        if not moves:
+            state = _STATUS_LOSS0
+        base = index ^ 1  # 둘 차례를 바꾼 같은 배치
+        for p, (col, row) in moves:
+            i = order[p]
+            from_sq = squares[i]
+            to_sq = row * COLS + col
+            target = board.squares[to_sq]
+            if target is None:
+                g = group_of[i]
+                place = places[g]
+                first, count = groups[g]
+                if count == 1:
+                    delta = place[to_sq] - place[from_sq]
+                else:
+                    old = [place[sq] for sq in squares[first: first + count]]
+                    new = sorted(place[to_sq] if sq == from_sq else place[sq] for sq in squares[first: first + count])
+                    delta = colex_rank(new) - colex_rank(old)
+                succ.append(base + (delta * mults[g] << 1))
+                n += 1
+                continue
+            if target.kind == _GENERAL:
+                state = _STATUS_WIN0
+                break
+            entries = [
+                (q.color, q.kind, to_sq if q is p else squares[j])
+                for j, q in enumerate(pieces) if q is not target
+            ]
+            hit = tables.probe_entries(entries, turn ^ 1)
+            if hit is None:
+                sub = material_name(*_sorted_entries(entries)[:2])
+                raise RuntimeError(f"{layout.name}: no usable sub-table {sub} in {tables.directory} (missing or other facing rule)")
+            result, dtm = hit
+            if result == LOSS:
+                win = min(win, dtm + 1)
+            elif result == WIN:
+                loss = max(loss, dtm + 1)
+            else:
+                draw = 1
+        if state != _STATUS_NORMAL:
+            del succ[len(succ) - n:]
+            n = 0
+        status.append(state)
+        counts.append(n)
+        exit_win.append(win)
+        exit_loss.append(loss)
+        exit_draw.append(draw)
+    return tuple(a.tobytes() for a in (status, counts, succ, exit_win, exit_loss, exit_draw))
+
+
+# --- 만들기: 역행 분석 ---
+
+def _retrograde(size: int, status, counts, succ, exit_win, exit_loss, exit_draw) -> tuple[bytearray, array]:
+    """다음 국면 목록과 잡는 수 결과로 (결과 바이트 배열, 끝날 때까지 수 배열)."""
+    # 다음 국면 목록 (국면별 구간) 을 뒤집어 이전 국면 목록 (CSR) 을 만든다
+    pred_start = array("I", bytes(4 * (size + 1)))
+    for t in succ:
+        pred_start[t + 1] += 1
+    for i in range(size):
+        pred_start[i + 1] += pred_start[i]
+    fill = array("I", pred_start)
+    preds = array("I", bytes(4 * len(succ)))
+    pos = 0
+    for src in range(size):
+        for _ in range(counts[src]):
+            t = succ[pos]
+            preds[fill[t]] = src
+            fill[t] += 1
+            pos += 1
+    del fill
+
+    result = bytearray(size)  # 0 = 아직 모름 (끝까지 모르면 무)
+    dtm = array("H", bytes(2 * size))
+    remaining = array("H", counts)
+    buckets: list[list[int]] = [[]]  # [수] -> 후보 (국면 << 1 | 승이면 1)
+
+    def push(d: int, item: int) -> None:
+        while len(buckets) <= d:
+            buckets.append([])
+        buckets[d].append(item)
+
+    for i in range(size):
+        s = status[i]
+        if s == _STATUS_INVALID:
+            result[i] = INVALID
+        elif s == _STATUS_WIN0:
+            push(0, i << 1 | 1)
+        elif s == _STATUS_LOSS0:
+            push(0, i << 1)
+        else:
+            if exit_win[i] != _NONE:
+                push(exit_win[i], i << 1 | 1)
+            elif remaining[i] == 0 and not exit_draw[i]:
+                push(exit_loss[i], i << 1)
+
+    d = 0
+    while d < len(buckets):
+        for item in buckets[d]:
+            i = item >> 1
+            if result[i]:
+                continue
+            won = item & 1
+            result[i] = WIN if won else LOSS
+            dtm[i] = d
+            for k in range(pred_start[i], pred_start[i + 1]):
+                q = preds[k]
+                if result[q]:
+                    continue
+                if not won:
+                    push(d + 1, q << 1 | 1)
+                    continue
+                remaining[q] -= 1
+                if remaining[q] == 0 and exit_win[q] == _NONE and not exit_draw[q]:
+                    push(max(d + 1, exit_loss[q]), q << 1)
+        buckets[d] = []
+        d += 1
+    return result, dtm
+
+
+def _write_table(path: str, name: str, result: bytearray, dtm: array) -> None:
+    size = len(result)
+    packed = bytearray((size + 3) // 4)
+    for i in range(0, size, 4):
+        b = 0
+        for j, r in enumerate(result[i: i + 4]):
+            b |= r << (j << 1)
+        packed[i >> 2] = b
+    wide = max(dtm, default=0) > 0xFF
+    flags = FLAG_FACING if config.FACING_GENERALS_ILLEGAL else 0
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(FILE_HEADER.pack(MAGIC, VERSION, flags, size, 2 if wide else 1, name.encode("ascii")))
+        f.write(packed)
+        f.write(dtm.tobytes() if wide else bytes(dtm.tolist()))
+    os.replace(tmp, path)
+
+
+def generate(
+    name: str,
+    directory: str,
+    workers: int | None = None,
+    chunk: int = 4096,
+    log=print,
+) -> list[str]:
+    """
+    재료 name 의 테이블을 directory 에 만든다 (필요한 작은 재료부터). 새로 만든 재료 이름 목록.
+    이미 있는 재료 (뒤집은 재료 포함) 는 건너뛴다. 작은 재료도 같은 디렉터리에 만든다.
+    빅장 규칙이 지금 config 와 다르게 만들어진 파일은 알리고 지운 뒤 다시 만든다.
+    """
+    cho, han = parse_material(name)
+    name = material_name(cho, han)
+    os.makedirs(directory, exist_ok=True)
+    made: list[str] = []
+    with Tablebases(directory) as tables:
+        if tables.has(cho, han):
+            return made
+        stale = [table.path for table in tables.stale(cho, han)]
+        needed = [sub for sub in sub_materials(cho, han) if not tables.has(*sub)]
+    for path in stale:
+        log(
+            f"{name}: {path} was built with FACING_GENERALS_ILLEGAL={not config.FACING_GENERALS_ILLEGAL}"
+            f", config has {config.FACING_GENERALS_ILLEGAL}; rebuilding"
+        )
+        os.remove(path)
+    for sub in needed:
+        made += generate(material_name(*sub), directory, workers, chunk, log)
+    layout = Layout(cho, han)
+    size = layout.size
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    status, counts, succ = array("B"), array("H"), array("I")
+    exit_win, exit_loss, exit_draw = array("H"), array("H"), array("B")
+    spans = [(i, min(i + chunk, size)) for i in range(0, size, chunk)]
+    with mp.Pool(workers, initializer=_init_worker, initargs=(name, directory)) as pool:
+        for parts in pool.imap(_successors, spans):
+            for arr, data in zip((status, counts, succ, exit_win, exit_loss, exit_draw), parts):
+                arr.frombytes(data)
+    moves_time = time.perf_counter() - start
+    result, dtm = _retrograde(size, status, counts, succ, exit_win, exit_loss, exit_draw)
+    path = os.path.join(directory, name + EXTENSION)
+    _write_table(path, name, result, dtm)
+    elapsed = time.perf_counter() - start
+    wins, losses = result.count(WIN), result.count(LOSS)
+    invalid = result.count(INVALID)
+    log(
+        f"{name}: positions {size}  win {wins}  loss {losses}  draw {size - wins - losses - invalid}"
+        f"  max dtm {max(dtm, default=0)}  moves {moves_time:.1f}s  total {elapsed:.1f}s  ({workers} workers)"
+    )
+    made.append(name)
+    return made
+
+
+# --- 명령줄 ---
+
+def _format_result(hit: tuple[int, int] | None) -> str:
+    if hit is None:
+        return "(not in tablebase)"
+    result, dtm = hit
+    return "draw" if result == DRAW else f"{RESULT_NAMES[result]} in {dtm}"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Janggi endgame tablebase (retrograde analysis)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("generate", help="재료 테이블 만들기 (필요한 작은 재료 포함)")
+    p.add_argument("materials", nargs="+", help="예: kr-k kc-ka")
+    p.add_argument("--dir", default="tb", help="테이블 디렉터리 (기본 tb)")
+    p.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본: CPU 수)")
+    p = sub.add_parser("probe", help="국면과 수마다의 결과")
+    p.add_argument("--dir", default="tb")
+    p.add_argument("--fen", required=True)
+    p = sub.add_parser("info", help="테이블 목록")
+    p.add_argument("--dir", default="tb")
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        for name in args.materials:
+            try:
+                parse_material(name)
+            except ValueError as e:
+                letters = ", ".join(f"{letter}={kind}" for kind, letter in config.PIECE_LETTERS.items())
+                parser.error(f"{e} (기물 글자: {letters})")
+        for name in args.materials:
+            generate(name, args.dir, args.workers)
+        return 0
+
+    with Tablebases(args.dir) as tables:
+        if args.command == "info":
+            for name, table in sorted(tables.tables.items()):
+                print(f"{name:10s} positions {table.count:10d}  facing {table.facing}  {os.path.getsize(table.path)} bytes")
+            return 0
+        from perft import format_move
+
+        board = Board.from_fen(args.fen)
+        start = time.perf_counter()
+        hit = tables.probe(board)
+        elapsed = time.perf_counter() - start
+        print(f"{_format_result(hit)}  probe {elapsed * 1e6:.1f}us")
+        if hit is None:
+            return 1
+        for piece, (col, row) in movement.get_strict_moves(board, board.current_turn, MOVE_ENGINES[board.engine]):
+            move = ((piece.col, piece.row), (col, row))
+            board.move_piece(piece, col, row)
+            if board.game_over is not None:
+                line = "captures the general"
+            else:
+                board.switch_turn()
+                line = "opponent " + _format_result(tables.probe(board))
+            board.undo()
+            print(f"{format_move(move)}  {line}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
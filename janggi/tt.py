@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+고정 크기 트랜스포지션 테이블 (탐색용)
+- 메모리 예산(MB)으로 크기를 정하고 한 번에 할당한 64비트 정수 배열에 저장 (dict·객체 없음)
+- 항목 = 2워드: [키 ^ 데이터, 데이터]. 데이터 = 수(16) | 점수(20) | 깊이(8) | 경계(2) | 세대(6)
+  키 워드를 데이터와 XOR 해 두므로 읽을 때 두 워드가 어긋나면 (다른 프로세스가 쓰는 중이면) 그냥 실패로 본다
+- 버킷마다 2칸: 0번 = 깊이 우선 (더 깊거나 같은 깊이, 또는 이전 세대 항목만 교체), 1번 = 항상 교체
+- 세대(age): 탐색마다 new_search() 로 올린다. 이전 세대 항목은 깊이와 상관없이 먼저 교체
+- 키는 Board.zobrist_key
+"""
+
+from __future__ import annotations
+
+# 경계 종류
+BOUND_NONE = 0
+BOUND_EXACT = 1
+BOUND_LOWER = 2  # 점수 >= 저장값 (beta 컷)
+BOUND_UPPER = 3  # 점수 <= 저장값 (alpha 미달)
+
+ENTRY_BYTES = 16
+_SCORE_BIAS = 1 << 19
+_MASK64 = (1 << 64) - 1
+
+
+def _pack(move: int, score: int, depth: int, bound: int, age: int) -> int:
+    return (
+        move
+        | (score + _SCORE_BIAS) << 16
+        | depth << 36
+        | bound << 44
+        | age << 46
+    )
+
+
+def _buckets_for(nbytes: int) -> int:
+    """nbytes 안에 들어가는 가장 큰 2의 거듭제곱 버킷 수 (최소 1)."""
+    buckets = 1
+    while buckets * 4 * ENTRY_BYTES <= nbytes:
+        buckets *= 2
+    return buckets
+
+
+class TranspositionTable:
+    """2칸 버킷, 락 없는 XOR 검증 방식의 트랜스포지션 테이블."""
+
+    def __init__(self, size_mb: float = 16, buffer=None):
+        """
+        Args:
+            size_mb: 메모리 예산 (MB). 버킷 수는 예산 안의 가장 큰 2의 거듭제곱
+            buffer: 미리 할당한 버퍼 (예: 공유 메모리). 주어지면 size_mb 대신 그 크기를 쓴다
+        """
+        if buffer is None:
+            buffer = bytearray(self.bytes_for(size_mb))
+        buckets = _buckets_for(len(buffer))
+        self._buffer = buffer
+        self._words = memoryview(buffer).cast("B")[: buckets * 2 * ENTRY_BYTES].cast("Q")
+        self.num_buckets = buckets
+        self.num_entries = buckets * 2
+        self._mask = buckets - 1
+        self.age = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.replacements = 0
+
+    @staticmethod
+    def bytes_for(size_mb: float) -> int:
+        """size_mb 예산일 때 실제로 쓰는 바이트 수 (공유 메모리 할당용)."""
+        return _buckets_for(int(size_mb * (1 << 20))) * 2 * ENTRY_BYTES
+
+    @property
+    def size_bytes(self) -> int:
+        return self.num_entries * ENTRY_BYTES
+
+    def new_search(self) -> None:
+        """새 탐색 시작: 세대를 올려 이전 탐색의 항목이 먼저 교체되게 한다."""
+        self.age = (self.age + 1) & 63
+
+    def clear(self) -> None:
+        raw = self._words.cast("B")
+        raw[:] = bytes(len(raw))
+        self.age = 0
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.replacements = 0
+
+    def probe(self, key: int) -> tuple[int, int, int, int] | None:
+        """(수, 점수, 깊이, 경계) 또는 None. 수 0 = 최선 수 없음."""
+        self.probes += 1
+        words = self._words
+        i = (key & self._mask) << 2
+        for j in (i, i + 2):
+            data = words[j + 1]
+            if data and words[j] ^ data == key:
+                self.hits += 1
+                return (
+                    data & 0xFFFF,
+                    ((data >> 16) & 0xFFFFF) - _SCORE_BIAS,
+                    (data >> 36) & 0xFF,
+                    (data >> 44) & 3,
+                )
+        return None
+
+    def store(self, key: int, depth: int, score: int, bound: int, move: int) -> None:
+        """
+        저장. 깊이 우선 칸은 같은 국면이거나, 비었거나, 이전 세대이거나, 더 깊을 때만 덮어쓰고,
+        아니면 항상 교체 칸에 쓴다.
+        """
+        self.stores += 1
+        words = self._words
+        key &= _MASK64
+        i = (key & self._mask) << 2
+        old = words[i + 1]
+        same = old and words[i] ^ old == key
+        if same and not move:
+            move = old & 0xFFFF  # 최선 수 없는 갱신이면 이전 수 유지
+        if (
+            not old
+            or same
+            or (old >> 46) & 63 != self.age
+            or depth >= (old >> 36) & 0xFF
+        ):
+            j = i
+        else:
+            j = i + 2
+        if words[j + 1] and not (j == i and same):
+            self.replacements += 1
+        data = _pack(move, score, min(depth, 255), bound, self.age)
+        words[j] = key ^ data
+        words[j + 1] = data
+
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+    def fill_rate(self, sample: int | None = 1000) -> float:
+        """사용 중인 칸 비율. sample 개 칸만 세어 추정 (None 이면 전체)."""
+        words = self._words
+        n = self.num_entries if sample is None else min(sample, self.num_entries)
+        used = 0
+        for e in range(n):
+            if words[2 * e + 1]:
+                used += 1
+        return used / n
+
+    def stats(self) -> dict:
+        return {
+            "size_mb": self.size_bytes / (1 << 20),
+            "entries": self.num_entries,
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": self.hit_rate(),
+            "stores": self.stores,
+            "replacements": self.replacements,
+            "fill_rate": self.fill_rate(),
+        }
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+장기 국면 Zobrist 해시
+- (진영, 기물 종류, 칸)마다 고정 64비트 난수, 한(漢) 차례일 때 XOR 하는 차례 키
+- 시드가 고정이라 실행·프로세스가 달라도 같은 국면은 같은 키 (캐시, 오프닝북 파일에 저장 가능)
+- Board 는 move_piece / undo / switch_turn 에서 키를 XOR 로 증분 갱신한다
+"""
+
+from __future__ import annotations
+
+import random
+
+import config
+from piece import SIDE_NAMES, TYPE_NAMES, piece_code, piece_type_of, side_of
+
+NUM_SQUARES = config.BOARD_COLS * config.BOARD_ROWS
+
+_rng = random.Random(0x4A414E474749)  # "JANGGI"
+
+# PIECE_KEYS[side][piece_type][sq]
+PIECE_KEYS: dict[str, dict[str, list[int]]] = {
+    side: {t: [_rng.getrandbits(64) for _ in range(NUM_SQUARES)] for t in TYPE_NAMES[1:]}
+    for side in SIDE_NAMES
+}
+
+# CODE_KEYS[칸 코드][sq]: Board.codes 의 칸 코드 (Piece.code) 로 바로 찾는 같은 키 목록. 빈 칸 코드는 None
+_KEYS_BY_CODE = {
+    piece_code(piece_type_of(t), side_of(side)): PIECE_KEYS[side][t] for side in SIDE_NAMES for t in TYPE_NAMES[1:]
+}
+CODE_KEYS: list[list[int] | None] = [_KEYS_BY_CODE.get(code) for code in range(16)]
+
+# 둘 차례가 한(漢)일 때 XOR (초가 선이므로 초 차례 = 0)
+SIDE_KEY: int = _rng.getrandbits(64)
+
+
+def compute_key(pieces, current_turn: str) -> int:
+    """기물 목록과 둘 차례로 키를 처음부터 계산 (초기화·검증용)."""
+    key = SIDE_KEY if current_turn == "han" else 0
+    for p in pieces:
+        key ^= CODE_KEYS[p.code][p.row * config.BOARD_COLS + p.col]
+    return key